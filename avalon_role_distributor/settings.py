@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,7 +58,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'game.middleware.WhiteNoiseMiddleware',
+    'game.metrics.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,7 +72,8 @@ ROOT_URLCONF = 'avalon_role_distributor.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # 렌더 시간을 재는 DjangoTemplates (game.metrics)
+        'BACKEND': 'game.metrics.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -103,6 +106,9 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # 테스트 DB도 파일 - 공유 캐시 메모리 DB는 동시 쓰기를 기다리지 않고 바로 잠금 오류를 내서 동시성 테스트를 못 함
+            # 이름에 pid를 붙여 동시에 도는 test / loadtest 실행이 서로의 DB를 지우지 않게 함
+            'TEST': {'NAME': os.path.join(tempfile.gettempdir(), f'avalon_test_db_{os.getpid()}.sqlite3')},
         }
     }
 
@@ -152,6 +158,62 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 캐시 (세션 스냅샷, 상태 버전, 역할 메시지)
+# 기본은 프로세스 메모리 - 워커 여러 개가 공유하려면 파일 또는 DB 캐시 사용
+#   CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache CACHE_LOCATION=/var/tmp/avalon-cache
+#   CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache CACHE_LOCATION=avalon_cache (manage.py createcachetable 필요)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'avalon'),
+    }
+}
+
+# 역할 메시지/이미지를 Player 행에 저장할지 여부
+# False면 역할 배정만 저장하고 메시지는 role/ended 뷰에서 읽을 때 생성
+AVALON_STORE_ROLE_MESSAGES = os.environ.get('AVALON_STORE_ROLE_MESSAGES', 'False') == 'True'
+
+# 플레이어 서명 토큰 유효 기간 (초)
+AVALON_TOKEN_MAX_AGE = int(os.environ.get('AVALON_TOKEN_MAX_AGE', 60 * 60 * 24))
+
+# 토큰 도입 전 링크(?nickname=&pin=)의 PIN 평문 인증 허용 여부 - 이전 기간에만 켜고 기본은 꺼 둠
+AVALON_LEGACY_PIN_AUTH = os.environ.get('AVALON_LEGACY_PIN_AUTH', 'False') == 'True'
+
+# async 뷰에서 PIN 해시 확인에 쓰는 스레드 수 (game.auth.password_executor)
+AVALON_PASSWORD_WORKERS = int(os.environ.get('AVALON_PASSWORD_WORKERS', 4))
+
+# 로비 SSE 연결 최대 유지 시간 (초, 지나면 클라이언트가 재연결)
+AVALON_SSE_MAX_AGE = int(os.environ.get('AVALON_SSE_MAX_AGE', 60 * 5))
+
+# 세션 이벤트 브로커 (game.events)
+# InMemoryBroker는 프로세스 하나 안에서만 전달 - 워커가 여러 개면 다른 백엔드 사용
+# 예: AVALON_EVENT_BROKER=game.events.SQLiteBroker AVALON_EVENT_BROKER_PATH=/var/tmp/avalon-events.sqlite3
+AVALON_EVENT_BROKER = {
+    'BACKEND': os.environ.get('AVALON_EVENT_BROKER', 'game.events.InMemoryBroker'),
+    'OPTIONS': {'path': os.environ['AVALON_EVENT_BROKER_PATH']} if os.environ.get('AVALON_EVENT_BROKER_PATH') else {},
+}
+
+# 보존 기간 정리 (game.retention, manage.py purge_sessions) - 초, 0이면 그 종류는 정리 안 함
+AVALON_ENDED_SESSION_MAX_AGE = int(os.environ.get('AVALON_ENDED_SESSION_MAX_AGE', 60 * 60 * 24))
+# 종료되지 않고 방치된 로비/게임
+AVALON_STALE_SESSION_MAX_AGE = int(os.environ.get('AVALON_STALE_SESSION_MAX_AGE', 60 * 60 * 24 * 7))
+# 트랜잭션 하나에 지울 세션 수
+AVALON_PURGE_BATCH_SIZE = int(os.environ.get('AVALON_PURGE_BATCH_SIZE', 500))
+# 0보다 크면 서버 프로세스가 이 간격(초)마다 직접 정리 - 워커마다 돌므로 cron으로 명령을 돌린다면 0
+AVALON_PURGE_INTERVAL = int(os.environ.get('AVALON_PURGE_INTERVAL', 0))
+
+# 종료된 세션을 압축 보관본(game.archive, manage.py archive_sessions)으로 옮기기까지의 시간 (생성 후 초)
+# 정리 스케줄러(AVALON_PURGE_INTERVAL)가 돌면 정리 전에 보관도 함
+AVALON_ARCHIVE_AFTER = int(os.environ.get('AVALON_ARCHIVE_AFTER', 60 * 60))
+# 프로세스마다 풀어 둘 보관 스냅샷 수 (종료 화면 읽기 캐시)
+AVALON_ARCHIVE_CACHE_SIZE = int(os.environ.get('AVALON_ARCHIVE_CACHE_SIZE', 256))
+
+# 뷰별 지연/쿼리/PIN 해시/템플릿 시간 수집 (game.metrics.MetricsMiddleware)과 /metrics 노출
+# 값은 워커 프로세스마다 따로 - 워커별로 수집
+AVALON_METRICS_ENABLED = os.environ.get('AVALON_METRICS_ENABLED', 'False') == 'True'
+# 설정하면 /metrics 요청에 'Authorization: Bearer <토큰>' 필요
+AVALON_METRICS_TOKEN = os.environ.get('AVALON_METRICS_TOKEN', '')
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -19,10 +19,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import redirect
+from game import views as game_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('game/', include('game.urls')),
+    path('metrics', game_views.metrics, name='metrics'),
     path('', lambda request: redirect('game/'))
 ]
 
@@ -0,0 +1,34 @@
+# 벤치마크용 Django 초기화 (임시 SQLite DB + 마이그레이션)
+import os
+import sys
+import tempfile
+
+current_file_path = os.path.abspath(__file__)
+parent_dir = os.path.dirname(current_file_path)
+grandparent_dir = os.path.dirname(parent_dir)
+sys.path.append(grandparent_dir)
+
+# 벤치마크에서는 PIN 해시 비용을 빼고 측정
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def setup_django(db_path=None, fast_hashers=True):
+    """임시 SQLite DB로 Django를 띄우고 DB 파일 경로 반환"""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='avalon-bench-'), 'bench.sqlite3')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'avalon_role_distributor.settings')
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-only-secret-key')
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    if fast_hashers:
+        settings.PASSWORD_HASHERS = FAST_HASHERS
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    return db_path
@@ -0,0 +1,70 @@
+# 벤치마크용 캐시: 네트워크 캐시 서버처럼 읽기/쓰기마다 지연을 넣은 locmem 캐시
+# sync API는 스레드를 붙잡고(time.sleep), async API는 이벤트 루프에 양보(asyncio.sleep)한다
+import os
+import time
+import asyncio
+import threading
+
+from django.core.cache.backends.locmem import LocMemCache
+
+LATENCY = float(os.environ.get('BENCH_CACHE_LATENCY', 0.005))
+
+
+class LatencyCache(LocMemCache):
+    in_flight = 0
+    peak_in_flight = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _enter(cls):
+        with cls._lock:
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+
+    @classmethod
+    def _exit(cls):
+        with cls._lock:
+            cls.in_flight -= 1
+
+    @classmethod
+    def reset_peak(cls):
+        with cls._lock:
+            cls.peak_in_flight = cls.in_flight
+
+    def _wait(self):
+        self._enter()
+        try:
+            time.sleep(LATENCY)
+        finally:
+            self._exit()
+
+    async def _await(self):
+        self._enter()
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self._exit()
+
+    def get(self, *args, **kwargs):
+        self._wait()
+        return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._wait()
+        return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        self._wait()
+        return super().add(*args, **kwargs)
+
+    async def aget(self, *args, **kwargs):
+        await self._await()
+        return super().get(*args, **kwargs)
+
+    async def aset(self, *args, **kwargs):
+        await self._await()
+        return super().set(*args, **kwargs)
+
+    async def aadd(self, *args, **kwargs):
+        await self._await()
+        return super().add(*args, **kwargs)
@@ -0,0 +1,114 @@
+# 프로세스 하나의 get_state 폴링 처리량: WSGI(gthread 스레드 4개, gunicorn.conf.py 기본) vs ASGI(uvicorn 루프 하나)
+# 기본은 배포 기본값과 같은 캐시(LocMemCache, I/O 대기 없음)에서 초당 완료 요청 수와 요청당 지연을 잰다.
+# ASGI는 Django 미들웨어 훅과 요청 시작/종료 신호마다 스레드를 오가므로 이 조건에서는 WSGI보다 느리다.
+# --cache-latency를 주면 캐시 접근마다 지연을 넣어 네트워크 캐시 서버를 흉내 내고 동시 대기 수도 출력한다.
+#
+#   python benchmarks/bench_async_views.py                        # 기본 캐시
+#   python benchmarks/bench_async_views.py --cache-latency 0.005  # 5ms 네트워크 캐시 흉내
+import os
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def run_wsgi(urls, etags, clients, threads, seconds):
+    """gunicorn gthread 워커 하나 (threads개 스레드) - 요청 하나가 끝날 때까지 스레드를 점유"""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    deadline = time.perf_counter() + seconds
+    handled = [0] * clients
+
+    def handle(url):
+        request = factory.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        response = handler.get_response(request)
+        assert response.status_code == 304, response.status_code
+
+    def client(index):
+        url = urls[index % len(urls)]
+        while time.perf_counter() < deadline:
+            # 스레드 풀 크기가 곧 동시 처리 한도
+            pool.submit(handle, url).result()
+            handled[index] += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as pool, ThreadPoolExecutor(max_workers=clients) as load:
+        started = time.perf_counter()
+        list(load.map(client, range(clients)))
+        elapsed = time.perf_counter() - started
+    return sum(handled), elapsed
+
+
+async def run_asgi(application, urls, etags, clients, seconds):
+    """uvicorn 워커 하나 - 이벤트 루프 하나에서 async 뷰"""
+    from bench_lobby_sse import Connection
+
+    deadline = time.perf_counter() + seconds
+    handled = [0] * clients
+
+    async def client(index):
+        url = urls[index % len(urls)]
+        while time.perf_counter() < deadline:
+            connection = Connection(application, url, [(b'if-none-match', etags[url].encode())])
+            await connection.task
+            assert connection.status == 304, connection.status
+            handled[index] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return sum(handled), time.perf_counter() - started
+
+
+def run(clients, threads, seconds, lobbies, cache_latency):
+    if cache_latency:
+        os.environ['CACHE_BACKEND'] = '_latency_cache.LatencyCache'
+        os.environ['BENCH_CACHE_LATENCY'] = str(cache_latency)
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+    from avalon_role_distributor.asgi import application
+    from game.models import GameSession, Player
+    from _latency_cache import LatencyCache
+
+    session_ids = []
+    for _ in range(lobbies):
+        game_session = GameSession.objects.create(role_groups=[['assassin']], host_nickname='player_0')
+        Player.objects.bulk_create([Player(game_session=game_session, nickname=f'player_{i}', pin='-') for i in range(10)])
+        session_ids.append(game_session.session_id)
+    urls = [reverse('get_state', args=[sid]) for sid in session_ids]
+    etags = {url: Client().get(url)['ETag'] for url in urls}
+
+    backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+    latency = f", +{cache_latency * 1e3:.0f} ms per access" if cache_latency else ''
+    print(f"{clients} concurrent clients, cache {backend}{latency}, If-None-Match polling")
+    servers = [
+        (f'WSGI ({threads} threads)', lambda: run_wsgi(urls, etags, clients, threads, seconds)),
+        ('ASGI (1 loop)', lambda: asyncio.run(run_asgi(application, urls, etags, clients, seconds))),
+    ]
+    for label, serve in servers:
+        LatencyCache.reset_peak()
+        handled, elapsed = serve()
+        # 클라이언트 수가 고정이므로 완료 요청당 평균 응답 시간 = 클라이언트 수 / 처리량
+        line = f"  {label:<28} {handled / elapsed:8.0f} req/s  {clients * elapsed / handled * 1e3:7.1f} ms/request"
+        if cache_latency:
+            line += f"  peak in-flight {LatencyCache.peak_in_flight}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=4, help='비교할 WSGI 워커의 스레드 수 (gunicorn --threads)')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--lobbies', type=int, default=20)
+    parser.add_argument('--cache-latency', type=float, default=0,
+                        help='캐시 접근마다 넣을 지연 (초, 0이면 설정 기본 캐시 그대로)')
+    args = parser.parse_args()
+    run(args.clients, args.threads, args.seconds, args.lobbies, args.cache_latency)
@@ -0,0 +1,55 @@
+# 요청당 인증 CPU 비용: 매 요청 PIN 해시 확인(PBKDF2) vs 서명 토큰
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def measure(label, requests, threads, make_request):
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for status in pool.map(lambda _: make_request(), range(requests)):
+            assert status == 200, status
+    cpu = (time.process_time() - cpu_started) / requests * 1e3
+    wall = time.perf_counter() - wall_started
+    print(f"{label:<22} {cpu:8.3f} ms CPU/request  {requests / wall:8.1f} req/s")
+    return cpu
+
+
+def run(requests, threads):
+    # 기본 PBKDF2 해셔 그대로 측정
+    setup_django(fast_hashers=False)
+    from django.test import Client
+    from django.urls import reverse
+    from game.models import GameSession
+
+    game_session = GameSession.objects.create(role_groups=[['assassin']])
+    lobby_url = reverse('lobby', args=[game_session.session_id])
+    join_client = Client()
+    join_client.post(reverse('join', args=[game_session.session_id]), {'nickname': 'host', 'pin': '1234'})
+    cookies = join_client.cookies
+
+    def with_pin():
+        return Client().get(lobby_url, {'nickname': 'host', 'pin': '1234'}).status_code
+
+    def with_token():
+        client = Client()
+        client.cookies = cookies
+        return client.get(lobby_url).status_code
+
+    before = measure('PIN check (PBKDF2)', requests, threads, with_pin)
+    after = measure('signed token', requests, threads, with_token)
+    print(f"{'CPU reduction':<22} {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+    run(args.requests, args.threads)
@@ -0,0 +1,104 @@
+# 종료 화면 새로고침 부하: 게임이 끝난 뒤 플레이어 전원이 ended 페이지를 반복해서 새로고침할 때
+# 캐시 없음 / 매번 렌더링(스냅샷 캐시만) / 캐시된 페이지 / 브라우저 재검증(304)의 요청당 시간과 DB 쿼리 수 비교
+#
+#   python benchmarks/bench_ended_page.py                    # 세션 20개 × 10명 × 새로고침 5번
+#   python benchmarks/bench_ended_page.py --sessions 100 --refreshes 10
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def ended_sessions(sessions, players_per_session):
+    """시작 후 종료된 세션들 - [(session_id, [(닉네임, 토큰)])]"""
+    from game.auth import issue_token
+    from game.models import GameSession, Player
+
+    result = []
+    for _ in range(sessions):
+        game_session = GameSession.objects.create(
+            role_groups=[['assassin'], ['morgana'], ['percival']], host_nickname='player_0')
+        Player.objects.bulk_create([
+            Player(game_session=game_session, nickname=f'player_{i}', pin='-') for i in range(players_per_session)
+        ])
+        game_session.start(game_session.role_groups)
+        game_session.is_active = False
+        game_session.save(update_fields=['is_active'])
+        game_session.bump_state('ended')
+        result.append((game_session.session_id, [
+            (player.nickname, issue_token(player)) for player in game_session.players.order_by('pk')
+        ]))
+    return result
+
+
+def crowd(sessions, refreshes, request):
+    """모든 플레이어가 refreshes번씩 새로고침 - (요청 수, 쿼리 수, 걸린 시간, 상태 코드들)"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    statuses = set()
+    count = 0
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for _ in range(refreshes):
+            for session_id, players in sessions:
+                for nickname, token in players:
+                    statuses.add(request(session_id, nickname, token))
+                    count += 1
+        elapsed = time.perf_counter() - started
+    return count, len(queries), elapsed, statuses
+
+
+def run(session_count, players_per_session, refreshes):
+    setup_django()
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+    from game.auth import token_cookie_name
+    from game.models import ended_cache_key
+
+    sessions = ended_sessions(session_count, players_per_session)
+    client = Client()
+    etags = {}
+
+    def get(session_id, token, **headers):
+        client.cookies[token_cookie_name(session_id)] = token
+        return client.get(reverse('ended', args=[session_id]), **headers)
+
+    def cold(session_id, nickname, token):
+        # 캐시 전부 비움 -> 스냅샷부터 DB에서
+        cache.clear()
+        return get(session_id, token).status_code
+
+    def uncached(session_id, nickname, token):
+        # 역할 공개 캐시를 지우면 시청자별 페이지 캐시도 무효 -> 매번 스냅샷 + 렌더링
+        cache.delete(ended_cache_key(session_id))
+        return get(session_id, token).status_code
+
+    def cached(session_id, nickname, token):
+        response = get(session_id, token)
+        etags[session_id, nickname] = response['ETag']
+        return response.status_code
+
+    def revalidate(session_id, nickname, token):
+        return get(session_id, token, HTTP_IF_NONE_MATCH=etags[session_id, nickname]).status_code
+
+    print(f"{session_count} ended sessions x {players_per_session} players x {refreshes} refreshes")
+    modes = [('cold (no cache)', cold), ('render every time', uncached),
+             ('cached page', cached), ('304 revalidate', revalidate)]
+    for label, request in modes:
+        count, queries, elapsed, statuses = crowd(sessions, refreshes, request)
+        print(f"  {label:<18} {elapsed / count * 1e3:7.3f} ms/request  {queries / count:5.2f} queries/request  "
+              f"status={sorted(statuses)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--refreshes', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sessions, args.players, args.refreshes)
@@ -0,0 +1,56 @@
+# 이벤트 브로커 fan-out: 구독자 수별 발행 1건당 전달 시간, 느린 구독자가 있을 때 큐 메모리
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+async def fan_out(broker_class, subscribers, events):
+    """구독자 전원이 events건을 다 받을 때까지 걸린 시간"""
+    broker = broker_class(queue_size=events)
+    subscriptions = [broker.subscribe('session') for _ in range(subscribers)]
+
+    started = time.perf_counter()
+    for version in range(events):
+        broker.publish('session', {'type': 'players', 'version': version})
+    for subscription in subscriptions:
+        for _ in range(events):
+            await subscription.get()
+    return time.perf_counter() - started
+
+
+async def slow_consumer(broker_class, events):
+    """아무도 읽지 않는 구독자에게 계속 발행했을 때 남는 메모리"""
+    broker = broker_class()
+    subscription = broker.subscribe('session')
+    tracemalloc.start()
+    for version in range(events):
+        broker.publish('session', {'type': 'players', 'version': version})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, subscription.queue.qsize(), subscription.dropped
+
+
+def run(events):
+    setup_django()
+    from game.events import InMemoryBroker
+
+    for subscribers in (1, 10, 100, 1000):
+        elapsed = asyncio.run(fan_out(InMemoryBroker, subscribers, events))
+        print(f"{subscribers:>5} subscribers  {elapsed / events * 1e6:9.1f} us/event  "
+              f"{elapsed / (events * subscribers) * 1e6:6.2f} us/delivery")
+
+    peak, queued, dropped = asyncio.run(slow_consumer(InMemoryBroker, 100000))
+    print(f"slow consumer: 100000 events -> queued {queued}, dropped={dropped}, peak {peak / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=200)
+    args = parser.parse_args()
+    run(args.events)
@@ -0,0 +1,144 @@
+# 유휴 로비 서버 CPU: 1초 폴링 클라이언트 vs SSE 연결 (ASGI 앱을 프로세스 안에서 직접 구동)
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def http_scope(path, headers=()):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+
+
+class Connection:
+    """ASGI 요청 하나 - disconnect 전까지 열어 둠"""
+
+    def __init__(self, application, path, headers=()):
+        self.closed = asyncio.Event()
+        self.first_event = asyncio.Event()
+        self.status = None
+        self.headers = {}
+        self.bytes = 0
+        self.task = asyncio.create_task(application(http_scope(path, headers), self.receive, self.send))
+        self.sent_request = False
+
+    async def receive(self):
+        if not self.sent_request:
+            self.sent_request = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.closed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            self.headers = dict(message['headers'])
+        elif message['type'] == 'http.response.body':
+            self.bytes += len(message.get('body', b''))
+            if b'event: state' in message.get('body', b''):
+                self.first_event.set()
+
+    async def close(self):
+        self.closed.set()
+        try:
+            await asyncio.wait_for(self.task, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self.task.cancel()
+
+
+def cpu_window(seconds):
+    """측정 구간의 (CPU 초, 경과 초)를 재는 코루틴"""
+    async def measure():
+        cpu, wall = time.process_time(), time.perf_counter()
+        await asyncio.sleep(seconds)
+        return time.process_time() - cpu, time.perf_counter() - wall
+    return measure()
+
+
+async def run_polling(application, urls, seconds):
+    """클라이언트마다 1초에 한 번 If-None-Match로 get_state 호출"""
+    etags = {}
+    requests = 0
+    stop = asyncio.Event()
+
+    async def poll(url):
+        nonlocal requests
+        headers = [(b'if-none-match', etags[url])] if url in etags else []
+        connection = Connection(application, url, headers)
+        await connection.task
+        requests += 1
+        if b'etag' in connection.headers:
+            etags[url] = connection.headers[b'etag']
+
+    async def client(url, offset):
+        await asyncio.sleep(offset)
+        while not stop.is_set():
+            started = time.perf_counter()
+            await poll(url)
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, 1.0 - (time.perf_counter() - started)))
+            except asyncio.TimeoutError:
+                pass
+
+    for url in set(urls):
+        await poll(url)
+    tasks = [asyncio.create_task(client(url, i / len(urls))) for i, url in enumerate(urls)]
+    await asyncio.sleep(1)  # 워밍업
+    requests = 0
+    cpu, wall = await cpu_window(seconds)
+    handled = requests
+    # 요청 도중 취소하면 스레드에 걸린 DB 작업이 남으므로 진행 중인 요청은 끝까지 처리
+    stop.set()
+    await asyncio.gather(*tasks)
+    return cpu, wall, handled
+
+
+async def run_sse(application, urls, seconds):
+    """클라이언트마다 SSE 연결 하나를 열어 두고 아무 변경 없이 유지"""
+    connections = [Connection(application, url) for url in urls]
+    await asyncio.wait_for(asyncio.gather(*(c.first_event.wait() for c in connections)), timeout=120)
+    opened = sum(c.status == 200 for c in connections)
+    cpu, wall = await cpu_window(seconds)
+    await asyncio.gather(*(c.close() for c in connections))
+    return cpu, wall, opened
+
+
+def run(lobbies, players, seconds):
+    setup_django()
+    from django.urls import reverse
+    from avalon_role_distributor.asgi import application
+    from game.models import GameSession, Player
+
+    sessions = []
+    for _ in range(lobbies):
+        game_session = GameSession.objects.create(role_groups=[['assassin']], host_nickname='player_0')
+        Player.objects.bulk_create([Player(game_session=game_session, nickname=f'player_{i}', pin='-') for i in range(players)])
+        sessions.append(game_session.session_id)
+
+    clients = lobbies * players
+    poll_urls = [reverse('get_state', args=[sid]) for sid in sessions for _ in range(players)]
+    sse_urls = [reverse('lobby_events', args=[sid]) for sid in sessions for _ in range(players)]
+
+    cpu, wall, handled = asyncio.run(run_polling(application, poll_urls, seconds))
+    print(f"polling (1 Hz)  {clients} clients  CPU {cpu / wall:6.1%}  {handled / wall:7.0f} / {clients} req/s handled")
+
+    cpu, wall, opened = asyncio.run(run_sse(application, sse_urls, seconds))
+    print(f"SSE (idle)      {opened} streams  CPU {cpu / wall:6.1%}        0 req/s (push only)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lobbies', type=int, default=100)
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    run(args.lobbies, args.players, args.seconds)
@@ -0,0 +1,53 @@
+# metrics 미들웨어 오버헤드: get_state 요청당 시간 (수집 끔 vs 켬)과 기록 자체의 비용
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def run(requests, rounds):
+    setup_django()
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from game.metrics import collect, record, reset_metrics
+    from game.models import GameSession
+
+    game_session = GameSession.objects.create(role_groups=[['assassin']])
+    url = reverse('get_state', args=[game_session.session_id])
+
+    def per_request(enabled):
+        with override_settings(AVALON_METRICS_ENABLED=enabled):
+            client = Client()
+            client.get(url)
+            best = float('inf')
+            for _ in range(rounds):
+                started = time.perf_counter()
+                for _ in range(requests):
+                    client.get(url)
+                best = min(best, (time.perf_counter() - started) / requests)
+        return best
+
+    reset_metrics()
+    disabled = per_request(False)
+    enabled = per_request(True)
+    print(f"get_state  metrics off {disabled * 1e6:8.1f} us/req")
+    print(f"get_state  metrics on  {enabled * 1e6:8.1f} us/req  (+{(enabled - disabled) * 1e6:.1f} us)")
+    assert collect()['get_state'][0] == requests * rounds + 1
+
+    stats = [1, 0.0001, 0.0, 0.0]
+    started = time.perf_counter()
+    for _ in range(requests * 10):
+        record('get_state', 0.0004, stats)
+    print(f"record()               {(time.perf_counter() - started) / (requests * 10) * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    run(args.requests, args.rounds)
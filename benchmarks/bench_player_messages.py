@@ -0,0 +1,53 @@
+# generate_player_messages: 역할 구성별 메시지 캐시 miss/hit 비용 비교 (5~10인, 모든 로비 토글)
+import os
+import sys
+import timeit
+
+current_file_path = os.path.abspath(__file__)
+parent_dir = os.path.dirname(current_file_path)
+grandparent_dir = os.path.dirname(parent_dir)
+sys.path.append(grandparent_dir)
+
+from ftn.catalog import get_role_catalog
+from ftn.players import clear_message_cache, generate_player_messages, message_cache_info
+from ftn.roles import RolePlayer, assign_by_role_packages, build_role_packages, role_group_configs
+
+
+def all_tables():
+    """지원하는 모든 인원수 × 로비 토글 조합으로 한 판씩 분배"""
+    catalog = get_role_catalog()
+    tables = []
+    for player_count in range(5, 11):
+        for role_groups in role_group_configs(player_count):
+            packages = build_role_packages(role_groups, player_count, catalog)
+            players = [RolePlayer(f'player_{i}') for i in range(player_count)]
+            tables.append(assign_by_role_packages(players, packages))
+    return tables
+
+
+def run(number=200):
+    tables = all_tables()
+
+    def cold():
+        for table in tables:
+            clear_message_cache()
+            generate_player_messages(table)
+
+    def warm():
+        for table in tables:
+            generate_player_messages(table)
+
+    cold_time = min(timeit.repeat(cold, number=number, repeat=3)) / (number * len(tables)) * 1e6
+    clear_message_cache()
+    warm()
+    warm_time = min(timeit.repeat(warm, number=number, repeat=3)) / (number * len(tables)) * 1e6
+
+    print(f"{len(tables)} compositions")
+    print(f"{'miss (render + fill)':<24} {cold_time:8.2f} µs/deal")
+    print(f"{'hit (fill names only)':<24} {warm_time:8.2f} µs/deal")
+    print(f"{'speedup':<24} {cold_time / warm_time:8.1f}x")
+    print(message_cache_info())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,58 @@
+# 요청당 역할 데이터 로드 비용 비교: 매번 경로 탐색 + json.load vs RoleCatalog
+import os
+import sys
+import json
+import timeit
+
+current_file_path = os.path.abspath(__file__)
+parent_dir = os.path.dirname(current_file_path)
+grandparent_dir = os.path.dirname(parent_dir)
+sys.path.append(grandparent_dir)
+
+from ftn.catalog import get_role_catalog
+
+FTN_DIR = os.path.join(grandparent_dir, 'ftn')
+
+
+def legacy_get_role_data():
+    """기존 game.views.get_role_data와 동일한 경로 탐색 + 파싱"""
+    possible_paths = [
+        os.path.join(FTN_DIR, '..', 'ftn', 'role_messages.json'),
+        os.path.join(grandparent_dir, 'ftn', 'role_messages.json'),
+        os.path.join(FTN_DIR, 'role_messages.json'),
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+
+def legacy_request():
+    # role 뷰 한 번: get_role_data + 템플릿 필터용 조회
+    role_data = legacy_get_role_data()
+    for role in role_data:
+        role_data.get(role, {}).get('emoji', '')
+        role_data.get(role, {}).get('name', role)
+
+
+def catalog_request():
+    catalog = get_role_catalog()
+    for role in catalog:
+        catalog.emoji(role)
+        catalog.name(role)
+
+
+def run(number=20000):
+    results = {}
+    for label, fn in [('before (probe + json.load)', legacy_request), ('after (RoleCatalog)', catalog_request)]:
+        fn()
+        elapsed = min(timeit.repeat(fn, number=number, repeat=3))
+        results[label] = elapsed / number * 1e6
+        print(f"{label:<28} {results[label]:8.2f} µs/request")
+    before, after = results.values()
+    print(f"{'speedup':<28} {before / after:8.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run()
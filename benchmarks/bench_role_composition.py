@@ -0,0 +1,94 @@
+# 역할 구성 요약: 카탈로그 크기별 role 뷰 구성 계산 시간 (요청마다 계산 vs 분배 때 저장)
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def legacy_composition(players, catalog):
+    """기존 role 뷰: 요청마다 플레이어 순회 + 표시 이름 부분 문자열로 카탈로그 전체 검색"""
+    good_comp, evil_comp = {}, {}
+    for p in players:
+        if not p.roles or not p.faction:
+            continue
+        role_display = " + ".join(catalog.display(role) for role in p.roles)
+        if p.faction == 'good':
+            good_comp[role_display] = good_comp.get(role_display, 0) + 1
+        elif p.faction == 'evil':
+            evil_comp[role_display] = evil_comp.get(role_display, 0) + 1
+
+    def sort_by_priority(item):
+        role_display, count = item
+        for role_key in catalog:
+            if catalog.name(role_key) in role_display:
+                return catalog.priority(role_key)
+        return 999
+
+    return dict(sorted(good_comp.items(), key=sort_by_priority)), dict(sorted(evil_comp.items(), key=sort_by_priority))
+
+
+def install_catalog(extra_roles):
+    """실제 역할 앞에 가상 역할 extra_roles개를 붙인 카탈로그를 전역 카탈로그로 설치"""
+    import ftn.catalog as catalog_module
+
+    with open(catalog_module.ROLE_MESSAGES_PATH, encoding='utf-8') as f:
+        role_data = json.load(f)
+    # 실제 역할은 파일의 "bit"를 그대로 쓰므로 가상 역할은 그 뒤 비트
+    padded = {f'extra_{i}': {'name': f'가상역할{i}', 'faction': 'good', 'priority': 1000 + i, 'bit': len(role_data) + i}
+              for i in range(extra_roles)}
+    padded.update(role_data)
+    catalog_module._catalog = catalog_module.RoleCatalog(padded)
+    catalog_module._catalog_mtime = os.stat(catalog_module.ROLE_MESSAGES_PATH).st_mtime_ns
+    return catalog_module._catalog
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(players, repeat):
+    setup_django()
+    from django.test import Client
+    from django.urls import reverse
+    from game.auth import issue_token, token_cookie_name
+    from game.models import GameSession, Player
+    from game.snapshot import get_snapshot
+    from game.views import composition_display, session_composition
+
+    game_session = GameSession.objects.create(role_groups=[['assassin'], ['morgana'], ['percival']], host_nickname='player_0')
+    Player.objects.bulk_create([Player(game_session=game_session, nickname=f'player_{i}', pin='-') for i in range(players)])
+    game_session.distribute_roles()
+    game_session.is_started = True
+    game_session.save(update_fields=['is_started'])
+
+    client = Client()
+    client.cookies[token_cookie_name(game_session.session_id)] = issue_token(game_session.players.get(nickname='player_0'))
+    url = reverse('role', args=[game_session.session_id])
+
+    print(f"{players} players, composition step per request (us) and full role view (ms)")
+    for extra in (0, 100, 1000, 10000):
+        catalog = install_catalog(extra)
+        snapshot = get_snapshot(game_session.session_id)
+        client.get(url)
+
+        legacy = timed(lambda: legacy_composition(snapshot.players, catalog), repeat)
+        stored = timed(lambda: [composition_display(session_composition(snapshot, catalog)[faction], catalog)
+                                for faction in ('good', 'evil')], repeat)
+        view = timed(lambda: client.get(url), max(1, repeat // 10))
+        print(f"  catalog {len(catalog.roles):>6} roles  legacy {legacy * 1e6:9.1f} us  "
+              f"stored {stored * 1e6:6.1f} us  role view {view * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    run(args.players, args.repeat)
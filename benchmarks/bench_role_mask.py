@@ -0,0 +1,156 @@
+# Player 역할 저장 형식 비교: JSON 역할 목록 + 진영 문자열 vs 카탈로그 비트마스크 + 진영 코드
+# 같은 배정을 두 형식의 테이블에 넣고 행 크기(SQLite dbstat)와 읽기 디코드 비용을 잰다.
+#
+#   python benchmarks/bench_role_mask.py                 # 10만 세션 × 7명
+#   python benchmarks/bench_role_mask.py --sessions 10000
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+BATCH_SIZE = 5000
+
+# 마이그레이션 0006 이전 Player 테이블 (roles JSON, faction 문자열)
+LEGACY_TABLE = '''
+CREATE TABLE legacy_player (
+    id integer NOT NULL PRIMARY KEY AUTOINCREMENT,
+    nickname varchar(50) NOT NULL,
+    pin varchar(128) NOT NULL,
+    roles text NOT NULL,
+    role_messages text NOT NULL,
+    role_images text NOT NULL,
+    faction varchar(50) NOT NULL,
+    game_session_id char(32) NOT NULL
+)
+'''
+
+
+def deals(players_per_session, catalog):
+    """로비 설정을 골고루 섞은 (역할 목록, 진영) 배정을 세션마다 하나씩"""
+    from ftn.roles import RolePlayer, assign_by_role_packages, build_role_packages, role_group_configs
+
+    configs = role_group_configs(players_per_session)
+    while True:
+        packages = build_role_packages(random.choice(configs), players_per_session, catalog)
+        seated = assign_by_role_packages([RolePlayer(f'player_{i}') for i in range(players_per_session)], packages)
+        yield [(player.roles, catalog.faction(player.roles[0])) for player in seated]
+
+
+def populate(sessions, players_per_session):
+    """두 테이블에 같은 배정 기록 (game_player는 ORM, legacy_player는 JSON 문자열 그대로)"""
+    from django.db import connection, transaction
+    from ftn.catalog import get_role_catalog
+    from game.models import GameSession, Player
+
+    catalog = get_role_catalog()
+    dealt = deals(players_per_session, catalog)
+    for start in range(0, sessions, BATCH_SIZE):
+        with transaction.atomic():
+            game_sessions = GameSession.objects.bulk_create([
+                GameSession(role_groups=[['assassin']], is_started=True) for _ in range(min(BATCH_SIZE, sessions - start))
+            ])
+            players, legacy_rows = [], []
+            for game_session in game_sessions:
+                for i, (roles, faction) in enumerate(next(dealt)):
+                    players.append(Player(game_session=game_session, nickname=f'player_{i}', pin='-',
+                                          roles=roles, faction=faction))
+                    legacy_rows.append((f'player_{i}', '-', json.dumps(roles), '[]', '[]', faction, game_session.pk.hex))
+            Player.objects.bulk_create(players)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    'INSERT INTO legacy_player (nickname, pin, roles, role_messages, role_images, faction, game_session_id) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, %s)', legacy_rows)
+
+
+def table_bytes(table):
+    """(테이블 b-tree 페이지 바이트, 행 payload 바이트) - 인덱스 제외"""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT SUM(pgsize), SUM(payload) FROM dbstat WHERE name = %s", [table])
+        return cursor.fetchone()
+
+
+def decode_cost(sql, decode, repeat):
+    """행을 읽어 역할 목록/첫 역할/진영으로 푸는 데 드는 행당 시간 (us) - 쿼리 시간은 빼고 디코드만"""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            decode(*row)
+        best = min(best, time.perf_counter() - started)
+    return best / len(rows) * 1e6
+
+
+def model_cost(sample, repeat):
+    """ORM으로 읽은 Player의 roles/primary_role/faction 접근 행당 시간 (us) - 쿼리 포함"""
+    from game.models import Player
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = 0
+        for player in Player.objects.only('role_mask', 'faction_code')[:sample]:
+            player.roles, player.primary_role, player.faction
+            count += 1
+        best = min(best, time.perf_counter() - started)
+    return best / count * 1e6
+
+
+def run(sessions, players_per_session, repeat, sample):
+    setup_django()
+    from django.db import connection
+    from ftn.catalog import get_role_catalog
+
+    catalog = get_role_catalog()
+    with connection.cursor() as cursor:
+        cursor.execute(LEGACY_TABLE)
+
+    started = time.perf_counter()
+    populate(sessions, players_per_session)
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+    print(f"{sessions} sessions x {players_per_session} players ({time.perf_counter() - started:.1f} s to populate)")
+
+    def legacy_decode(roles, faction):
+        roles = json.loads(roles)
+        return roles, roles[0] if roles else None, faction
+
+    def mask_decode(role_mask, faction_code):
+        roles = catalog.roles_for_mask(role_mask)
+        return roles, roles[0] if roles else None, catalog.faction_name(faction_code)
+
+    rows = sessions * players_per_session
+    results = [
+        ('json + varchar', table_bytes('legacy_player'),
+         decode_cost('SELECT roles, faction FROM legacy_player', legacy_decode, repeat)),
+        ('bitmask + code', table_bytes('game_player'),
+         decode_cost('SELECT role_mask, faction_code FROM game_player', mask_decode, repeat)),
+    ]
+    for label, (pages, payload), decode in results:
+        print(f"  {label:<15} table {pages / 2 ** 20:8.1f} MiB  {payload / rows:5.1f} B/row payload  "
+              f"decode {decode:5.2f} us/row")
+    (_, (legacy_pages, legacy_payload), legacy_decode_us), (_, (mask_pages, mask_payload), mask_decode_us) = results
+    print(f"  table {legacy_pages / mask_pages:.2f}x smaller, row payload -{(legacy_payload - mask_payload) / rows:.1f} B, "
+          f"decode {legacy_decode_us / mask_decode_us:.1f}x faster")
+    print(f"  Player.roles/primary_role/faction via ORM ({sample} rows): {model_cost(sample, repeat):.2f} us/row")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=100000)
+    parser.add_argument('--players', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sample', type=int, default=10000, help='ORM 접근 비용을 잴 플레이어 수')
+    args = parser.parse_args()
+    run(args.sessions, args.players, args.repeat, args.sample)
@@ -0,0 +1,85 @@
+# 역할 메시지 저장 방식 비교: Player 행에 저장 vs 역할만 저장하고 읽을 때 생성
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def populate(sessions, players_per_session):
+    from django.contrib.auth.hashers import make_password
+    from game.models import GameSession, Player
+
+    pin = make_password('1234')
+    created = []
+    for _ in range(sessions):
+        game_session = GameSession.objects.create(role_groups=[['assassin'], ['morgana'], ['percival']])
+        Player.objects.bulk_create([
+            Player(game_session=game_session, nickname=f'player_{i}', pin=pin)
+            for i in range(players_per_session)
+        ])
+        game_session.distribute_roles()
+        game_session.is_started = True
+        game_session.save()
+        created.append(game_session)
+    return created
+
+
+def db_size(db_path):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+        cursor.execute('SELECT COALESCE(SUM(LENGTH(role_messages) + LENGTH(role_images)), 0) FROM game_player')
+        role_bytes = cursor.fetchone()[0]
+    return os.path.getsize(db_path), role_bytes
+
+
+def role_latency(game_sessions, players_per_session, repeat):
+    from django.core.cache import cache
+    from django.test import Client
+
+    cache.clear()
+    client = Client()
+    timings = []
+    for _ in range(repeat):
+        for game_session in game_sessions:
+            for i in range(players_per_session):
+                started = time.perf_counter()
+                response = client.get(f'/game/role/{game_session.session_id}/', {'nickname': f'player_{i}', 'pin': '1234'})
+                timings.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.status_code
+    return sum(timings) / len(timings) * 1e3
+
+
+def run(sessions, players_per_session, sample, repeat):
+    db_path = setup_django()
+    from django.test.utils import override_settings
+    from game.models import GameSession
+
+    results = {}
+    for label, store in [('stored messages', True), ('lazy on-read', False)]:
+        GameSession.objects.all().delete()
+        with override_settings(AVALON_STORE_ROLE_MESSAGES=store):
+            game_sessions = populate(sessions, players_per_session)
+            file_size, role_bytes = db_size(db_path)
+            latency = role_latency(game_sessions[:sample], players_per_session, repeat)
+        results[label] = (file_size, role_bytes, latency)
+        print(f"{label:<16} db={file_size / 1024:9.1f} KiB  role columns={role_bytes / 1024:9.1f} KiB  "
+              f"role view={latency:6.2f} ms/request")
+
+    (stored_size, stored_bytes, _), (lazy_size, lazy_bytes, _) = results.values()
+    print(f"{sessions} sessions x {players_per_session} players: "
+          f"db {stored_size / lazy_size:.1f}x smaller, role columns {stored_bytes / max(lazy_bytes, 1):.1f}x smaller")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--players', type=int, default=7)
+    parser.add_argument('--sample', type=int, default=20, help='role 뷰 지연 측정에 쓸 세션 수')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sessions, args.players, args.sample, args.repeat)
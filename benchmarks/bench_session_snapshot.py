@@ -0,0 +1,64 @@
+# 세션 스냅샷: lobby/role/ended 요청당 쿼리 수와 시간 (캐시 비움 vs 스냅샷 적중)
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def run(players, repeat):
+    setup_django()
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from game.auth import issue_token, token_cookie_name
+    from game.models import GameSession, Player
+    from game.snapshot import reset_snapshot_metrics, snapshot_metrics
+
+    def new_session(started, active=True):
+        game_session = GameSession.objects.create(role_groups=[['assassin'], ['morgana']], host_nickname='player_0')
+        Player.objects.bulk_create([Player(game_session=game_session, nickname=f'player_{i}', pin='-') for i in range(players)])
+        if started:
+            game_session.distribute_roles()
+            game_session.is_started = True
+            game_session.is_active = active
+            game_session.save(update_fields=['is_started', 'is_active'])
+        return game_session
+
+    cases = [('lobby', new_session(False)), ('role', new_session(True)), ('ended', new_session(True, active=False))]
+
+    print(f"{players} players, {repeat} requests each")
+    for cold in (True, False):
+        reset_snapshot_metrics()
+        for name, game_session in cases:
+            client = Client()
+            client.cookies[token_cookie_name(game_session.session_id)] = issue_token(game_session.players.get(nickname='player_0'))
+            url = reverse(name, args=[game_session.session_id])
+            client.get(url)
+
+            queries = 0
+            elapsed = 0.0
+            for _ in range(repeat):
+                if cold:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    elapsed += time.perf_counter() - started
+                assert response.status_code == 200, response.status_code
+                queries += len(captured)
+            label = 'cache cleared' if cold else 'snapshot hit'
+            print(f"  {label:<14} {name:<6} {queries / repeat:5.1f} queries/req  {elapsed / repeat * 1e3:6.2f} ms/req")
+        print(f"  metrics: {snapshot_metrics()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    run(args.players, args.repeat)
@@ -0,0 +1,97 @@
+# 로비 폴링 DB 부하: 1000명이 1초마다 get_state를 호출할 때 초당 쿼리 수 비교
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from _django import setup_django
+
+
+def legacy_get_state(request, session_id):
+    """기존 get_state: 매번 세션 + 닉네임 조회 후 MD5 해시 비교"""
+    from django.http import JsonResponse
+    from django.shortcuts import get_object_or_404
+    from game.models import GameSession
+
+    game_session = get_object_or_404(GameSession, session_id=session_id)
+    player_names = list(game_session.players.all().values_list('nickname', flat=True))
+    state_hash = hashlib.md5(json.dumps({'players': player_names, 'is_started': game_session.is_started}).encode()).hexdigest()
+    if request.GET.get('hash') == state_hash:
+        return JsonResponse({}, status=204)
+    return JsonResponse({'players': player_names, 'hash': state_hash})
+
+
+class QueryCounter:
+    """스레드마다 연결이 따로라 execute_wrapper로 전체 쿼리 수를 센다"""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_round(pollers, threads, poll):
+    from django.db import connection
+
+    counter = QueryCounter()
+
+    def one(index):
+        with connection.execute_wrapper(counter):
+            return poll(index)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(one, range(pollers)))
+    return counter.count, time.perf_counter() - started, statuses
+
+
+def run(pollers, rounds, threads):
+    setup_django()
+    from django.test import Client, RequestFactory
+    from django.urls import reverse
+    from game.models import GameSession, Player
+
+    game_session = GameSession.objects.create(role_groups=[['assassin']], host_nickname='player_0')
+    Player.objects.bulk_create([Player(game_session=game_session, nickname=f'player_{i}', pin='-') for i in range(6)])
+    session_id = game_session.session_id
+    url = reverse('get_state', args=[session_id])
+
+    # 이전: 해시를 기억해 두고 보내는 폴링
+    factory = RequestFactory()
+    legacy_hash = json.loads(legacy_get_state(factory.get(url), session_id).content)['hash']
+
+    def legacy_poll(index):
+        return legacy_get_state(factory.get(url, {'hash': legacy_hash}), session_id).status_code
+
+    # 이후: ETag를 기억해 두고 If-None-Match로 폴링
+    etag = Client().get(url)['ETag']
+
+    def etag_poll(index):
+        return Client().get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    for label, poll in [('before (hash)', legacy_poll), ('after (ETag)', etag_poll)]:
+        queries = elapsed = 0
+        for _ in range(rounds):
+            count, seconds, statuses = run_round(pollers, threads, poll)
+            queries += count
+            elapsed += seconds
+        print(f"{label:<14} {queries / rounds:8.0f} DB queries/s at 1 Hz x {pollers} pollers  "
+              f"{elapsed / (rounds * pollers) * 1e3:6.3f} ms/poll  status={sorted(set(statuses))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pollers', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=32)
+    args = parser.parse_args()
+    run(args.pollers, args.rounds, args.threads)
@@ -0,0 +1,240 @@
+# ftn 역할 엔진/메시지 생성 마이크로 벤치마크 - 모든 인원수(5~10) × 로비 역할 토글
+# 케이스마다 ops/s, 기준 작업 대비 상대 속도, tracemalloc 최대 추가 바이트/순증 블록 수를 재고
+# 저장된 기준선(baseline.json)보다 threshold 이상 나빠지면 실패(exit 1)
+# 실행할 수 없는 케이스(선택 의존성 미설치)가 있으면 기준선이 빠지므로 실패 - --skip-missing으로만 넘어감
+#
+#   pip install -r benchmarks/requirements.txt          # player-info 케이스용 pandas
+#   python benchmarks/bench_suite.py                    # 기준선과 비교
+#   python benchmarks/bench_suite.py --save-baseline    # 현재 결과를 기준선으로 저장
+#   python benchmarks/bench_suite.py --filter assign/7p
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+import random
+import statistics
+import tracemalloc
+
+current_file_path = os.path.abspath(__file__)
+parent_dir = os.path.dirname(current_file_path)
+grandparent_dir = os.path.dirname(parent_dir)
+sys.path.append(grandparent_dir)
+
+from ftn.catalog import get_role_catalog
+from ftn.email.generate_msg import distribution_post_process, distributor, generate_player_info
+from ftn.players import clear_message_cache, generate_player_messages
+from ftn.roles import RolePlayer, assign_by_role_packages, build_role_packages, role_group_configs
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+BASELINE_PATH = os.path.join(parent_dir, 'baseline.json')
+# 할당량 비교 시 무시할 작은 차이 (바이트) - 인터프리터 내부 캐시 등
+MEMORY_SLACK = 1024
+
+
+def toggle_label(role_groups):
+    return '+'.join(group[0] for group in role_groups)
+
+
+def cases():
+    """(이름, 함수) 목록 - 실행할 수 없는 케이스는 함수 대신 건너뛴 이유 문자열"""
+    catalog = get_role_catalog()
+    result = []
+    for player_count in range(5, 11):
+        player_ids = [f'player_{i}' for i in range(player_count)]
+
+        # 게임 서버 경로: 역할 패키지 분배 + 메시지 생성
+        for role_groups in role_group_configs(player_count):
+            label = f'{player_count}p/{toggle_label(role_groups)}'
+            packages = build_role_packages(role_groups, player_count, catalog)
+            players = [RolePlayer(name) for name in player_ids]
+            table = assign_by_role_packages(players, packages)
+
+            def deal(players=players, packages=packages):
+                assign_by_role_packages(players, packages)
+
+            def messages_cold(table=table):
+                clear_message_cache()
+                generate_player_messages(table)
+
+            def messages_warm(table=table):
+                generate_player_messages(table)
+
+            result += [(f'assign/{label}', deal), (f'messages-cold/{label}', messages_cold),
+                       (f'messages-warm/{label}', messages_warm)]
+
+        # 이메일 배포 경로: 퍼시벌/모르가나 토글
+        for is_percival in (False, True):
+            for is_morgana in (False, True):
+                label = f'{player_count}p/percival={int(is_percival)},morgana={int(is_morgana)}'
+                raw = distributor(player_ids, is_percival, is_morgana)
+                result.append((f'distributor/{label}', lambda ids=player_ids, p=is_percival, m=is_morgana: distributor(ids, p, m)))
+                result.append((f'post-process/{label}', lambda raw=raw: distribution_post_process(raw)))
+                if pandas is None:
+                    result.append((f'player-info/{label}', 'pandas 미설치'))
+                else:
+                    user_info_df = pandas.DataFrame({'player_ids': player_ids, 'name': player_ids})
+                    result.append((f'player-info/{label}', lambda raw=raw, df=user_info_df: generate_player_info(raw, df)))
+    return result
+
+
+def reference():
+    """기준 작업 - 케이스와 번갈아 재서 기계 속도 변화(CPU 클럭, 다른 VM)를 상쇄"""
+    items = list(range(50))
+    random.shuffle(items)
+    return {str(i): items[i:i + 3] for i in range(0, 50, 5)}
+
+
+def calibrate(fn, min_time):
+    """한 회차가 min_time쯤 걸리는 반복 횟수"""
+    single = timeit.Timer(fn).timeit(number=1)
+    return max(1, int(min_time / max(single, 1e-7)))
+
+
+def measure_speed(fn, min_time, rounds):
+    """(ops/s 중앙값, 기준 작업 대비 상대 속도 중앙값)
+
+    기계 속도는 초 단위로도 크게 바뀌므로 ops/s는 참고용이고, 회귀 판단은 바로 옆에서 잰 기준 작업과의 비율로 한다.
+    """
+    timer, reference_timer = timeit.Timer(fn), timeit.Timer(reference)
+    number, reference_number = calibrate(fn, min_time), calibrate(reference, min_time)
+    ops, relative = [], []
+    for _ in range(rounds):
+        seconds = timer.timeit(number) / number
+        reference_seconds = reference_timer.timeit(reference_number) / reference_number
+        ops.append(1 / seconds)
+        relative.append(reference_seconds / seconds)
+    return statistics.median(ops), statistics.median(relative)
+
+
+def measure_memory(fn):
+    """호출 한 번의 (최대 할당 바이트, 호출 후 남은 블록 수)
+
+    tracemalloc은 호출 중 할당 횟수 합계를 주지 않으므로, 호출 중 최대 추가 메모리와 끝난 뒤 순증 블록 수를 잰다.
+    """
+    fn()  # 지연 초기화/캐시 채우기는 측정에서 제외
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - baseline_size
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return peak, blocks
+
+
+def run_cases(name_filter, min_time, rounds):
+    results, skipped = {}, {}
+    for name, fn in cases():
+        if name_filter and name_filter not in name:
+            continue
+        if not callable(fn):
+            skipped[name] = fn
+            continue
+        ops, relative = measure_speed(fn, min_time, rounds)
+        peak, blocks = measure_memory(fn)
+        results[name] = {'ops': ops, 'relative': relative, 'peak_bytes': peak, 'blocks': blocks}
+        print(f"{name:<56} {ops:12,.0f} ops/s  x{relative:7.3f}  peak {peak / 1024:8.1f} KiB  blocks {blocks:+5d}")
+    return results, skipped
+
+
+def compare(results, baseline, threshold):
+    """기준선보다 느려졌거나(기준 작업 대비 상대 속도) 메모리가 늘어난 케이스 -> 설명"""
+    regressions = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        problems = []
+        change = current['relative'] / previous['relative'] - 1
+        if change < -threshold:
+            problems.append(f"x{previous['relative']:.3f} -> x{current['relative']:.3f} ({change:+.0%})")
+        if current['peak_bytes'] > previous['peak_bytes'] * (1 + threshold) + MEMORY_SLACK:
+            problems.append(f"peak {previous['peak_bytes']:,} -> {current['peak_bytes']:,} bytes")
+        if problems:
+            regressions[name] = ', '.join(problems)
+    return regressions
+
+
+def confirm(results, names, min_time, rounds):
+    """회귀로 보인 케이스만 회차를 두 배로 다시 재서 더 나은 상대 속도를 씀 (우연히 느린 구간 걸러내기)"""
+    functions = dict(cases())
+    for name in names:
+        _, relative = measure_speed(functions[name], min_time, rounds * 2)
+        results[name]['relative'] = max(results[name]['relative'], relative)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='비교하지 않고 현재 결과를 기준선으로 저장')
+    parser.add_argument('--threshold', type=float, default=0.25, help='허용하는 성능 저하 비율 (0.25 = 25%%)')
+    parser.add_argument('--min-time', type=float, default=0.002, help='케이스/기준 작업 한 회차에 쓸 시간 (초)')
+    parser.add_argument('--rounds', type=int, default=25, help='케이스마다 기준 작업과 번갈아 잴 회차 수')
+    parser.add_argument('--filter', help='이름에 이 문자열이 들어간 케이스만')
+    parser.add_argument('--json', help='결과를 JSON으로 저장할 경로')
+    parser.add_argument('--skip-missing', action='store_true', help='실행할 수 없는 케이스를 실패 대신 건너뜀')
+    args = parser.parse_args()
+
+    results, skipped = run_cases(args.filter, args.min_time, args.rounds)
+    for name, reason in skipped.items():
+        print(f"{name:<56} 건너뜀 ({reason})")
+    if skipped and not args.skip_missing:
+        print(f"\n{len(skipped)}개 케이스를 실행할 수 없음 - pip install -r benchmarks/requirements.txt "
+              f"(일부러 빼려면 --skip-missing, 기준선 저장에는 쓰지 말 것)")
+        return 1
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = {}
+        if args.filter and os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)['cases']
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cases': {name: {'ops': round(row['ops'], 1), 'relative': round(row['relative'], 4),
+                                 'peak_bytes': row['peak_bytes'], 'blocks': row['blocks']}
+                          for name, row in sorted(baseline.items())},
+            }, f, indent=2)
+            f.write('\n')
+        print(f"기준선 저장: {args.baseline} ({len(baseline)} cases)")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"기준선 없음: {args.baseline} (--save-baseline으로 먼저 저장)")
+        return 1
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['cases']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        confirm(results, regressions, args.min_time, args.rounds)
+        regressions = compare(results, baseline, args.threshold)
+    new_cases = sorted(set(results) - set(baseline))
+    if new_cases:
+        print(f"기준선에 없는 케이스 {len(new_cases)}개 (비교 안 함): {', '.join(new_cases[:5])}{' ...' if len(new_cases) > 5 else ''}")
+    if regressions:
+        print(f"\n{len(regressions)}건 회귀 (threshold {args.threshold:.0%}):")
+        for name, problem in regressions.items():
+            print(f"  {name}: {problem}")
+        return 1
+    print(f"\n{len(results)}개 케이스 모두 기준선 대비 {args.threshold:.0%} 이내")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
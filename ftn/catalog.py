@@ -0,0 +1,177 @@
+import os
+import json
+import threading
+from types import MappingProxyType
+
+ROLE_MESSAGES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "role_messages.json")
+
+# 저장용 진영 코드 (Player.faction_code) - DB에 저장되므로 순서를 바꾸지 말 것
+FACTIONS = ('unknown', 'good', 'evil')
+FACTION_CODES = MappingProxyType({faction: code for code, faction in enumerate(FACTIONS)})
+
+
+class RoleCatalog:
+    """role_messages.json을 한 번 파싱해서 만든 불변 역할 카탈로그"""
+
+    __slots__ = (
+        'roles', 'good_roles', 'evil_roles', 'priority_order',
+        'role_bits', 'evil_mask', 'forbidden_pairs', 'required_mask', 'validation_cache', 'decode_cache',
+        '_names', '_emojis', '_priorities', '_factions', '_bit_roles', '_can_see', '_cannot_see',
+    )
+
+    def __init__(self, role_data):
+        roles = {name: MappingProxyType(dict(info)) for name, info in role_data.items()}
+        # 역할마다 비트 하나 - "bit"로 고정 (DB의 Player.role_mask에 저장되므로), 없으면 선언 순서
+        role_bits = {name: info.get('bit', index) for index, (name, info) in enumerate(roles.items())}
+        if len(set(role_bits.values())) != len(role_bits):
+            raise ValueError("역할 비트가 겹칩니다: " + ", ".join(f"{name}={bit}" for name, bit in role_bits.items()))
+
+        def mask(role_names):
+            return sum(1 << role_bits[name] for name in set(role_names) if name in role_bits)
+
+        sets = {
+            'roles': MappingProxyType(roles),
+            'good_roles': frozenset(name for name, info in roles.items() if info.get('faction') == 'good'),
+            'evil_roles': frozenset(name for name, info in roles.items() if info.get('faction') == 'evil'),
+            # 악인→선인, 같은 진영 안에서는 priority 순
+            'priority_order': tuple(sorted(
+                roles,
+                key=lambda name: (0 if roles[name].get('faction') == 'evil' else 1, roles[name].get('priority', 999)),
+            )),
+            '_names': {name: info.get('name', name) for name, info in roles.items()},
+            '_emojis': {name: info.get('emoji', '') for name, info in roles.items()},
+            '_priorities': {name: info.get('priority', 999) for name, info in roles.items()},
+            '_factions': {name: info.get('faction', 'unknown') for name, info in roles.items()},
+            'role_bits': MappingProxyType(role_bits),
+            'evil_mask': mask(name for name, info in roles.items() if info.get('faction') == 'evil'),
+            '_bit_roles': {bit: name for name, bit in role_bits.items()},
+            '_can_see': {name: mask(info.get('can_see', [])) for name, info in roles.items()},
+            '_cannot_see': {name: mask(info.get('cannot_see', [])) for name, info in roles.items()},
+            # 겸직 금지 규칙 - 한쪽에만 선언해도 양방향, 쌍마다 한 번만 저장
+            'forbidden_pairs': frozenset(
+                frozenset((name, other))
+                for name, info in roles.items()
+                for other in info.get('forbidden_with', [])
+                if other != name
+            ),
+            'required_mask': mask(name for name, info in roles.items() if info.get('required')),
+            # 역할 구성 시그니처 -> 검증 결과 (ftn.roles.validate_role_packages)
+            'validation_cache': {},
+            # 역할 비트마스크 -> 역할 이름 튜플 (roles_for_mask)
+            'decode_cache': {},
+        }
+        for attr, value in sets.items():
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("RoleCatalog은 변경할 수 없습니다.")
+
+    def __contains__(self, role):
+        return role in self.roles
+
+    def __iter__(self):
+        return iter(self.roles)
+
+    def get(self, role, default=None):
+        """역할 원본 정보 (dict처럼 사용)"""
+        return self.roles.get(role, default)
+
+    def name(self, role):
+        """한국어 역할 이름"""
+        return self._names.get(role, role)
+
+    def emoji(self, role):
+        """역할 이모지"""
+        return self._emojis.get(role, '')
+
+    def display(self, role):
+        """이모지 + 이름"""
+        return f"{self.emoji(role)} {self.name(role)}"
+
+    def priority(self, role):
+        """공개 순서 우선순위"""
+        return self._priorities.get(role, 999)
+
+    def faction(self, role):
+        """진영 (good / evil / unknown)"""
+        return self._factions.get(role, 'unknown')
+
+    def mask_of(self, roles):
+        """역할 목록(겸직 패키지)을 비트마스크 하나로"""
+        bits = self.role_bits
+        result = 0
+        for role in roles:
+            if role in bits:
+                result |= 1 << bits[role]
+        return result
+
+    def sight_masks(self, roles):
+        """겸직 패키지 전체의 (can_see, cannot_see) 마스크"""
+        can_see = cannot_see = 0
+        for role in roles:
+            can_see |= self._can_see.get(role, 0)
+            cannot_see |= self._cannot_see.get(role, 0)
+        return can_see, cannot_see
+
+    def roles_of(self, mask):
+        """비트마스크를 역할 이름 목록으로 (비트 순서)"""
+        roles = []
+        while mask:
+            lowest = mask & -mask
+            roles.append(self._bit_roles[lowest.bit_length() - 1])
+            mask ^= lowest
+        return roles
+
+    def roles_for_mask(self, mask):
+        """저장된 역할 비트마스크를 역할 이름 목록으로 (마스크별로 한 번만 풀어서 기억)"""
+        try:
+            roles = self.decode_cache[mask]
+        except KeyError:
+            roles = self.decode_cache[mask] = tuple(self.roles_of(mask))
+        return list(roles)
+
+    @staticmethod
+    def faction_code(faction):
+        """진영 이름을 저장용 코드로 (모르는 진영은 unknown)"""
+        return FACTION_CODES.get(faction, 0)
+
+    @staticmethod
+    def faction_name(code):
+        """저장용 진영 코드를 진영 이름으로"""
+        return FACTIONS[code] if 0 <= code < len(FACTIONS) else 'unknown'
+
+    def __repr__(self):
+        return f"RoleCatalog({len(self.roles)} roles)"
+
+
+_catalog = None
+_catalog_mtime = None
+_catalog_lock = threading.Lock()
+
+
+def load_role_catalog(path=None):
+    """파일에서 카탈로그를 새로 읽어옴 (캐시 사용 안 함, 기본은 ROLE_MESSAGES_PATH)"""
+    path = path or ROLE_MESSAGES_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return RoleCatalog(json.load(f))
+    except FileNotFoundError:
+        raise FileNotFoundError(f"role_messages.json을 찾을 수 없습니다. 시도한 경로: {path}")
+
+
+def get_role_catalog():
+    """프로세스 전역 카탈로그 반환 - 파일 mtime이 바뀐 경우에만 다시 로드"""
+    global _catalog, _catalog_mtime
+
+    try:
+        mtime = os.stat(ROLE_MESSAGES_PATH).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"role_messages.json을 찾을 수 없습니다. 시도한 경로: {ROLE_MESSAGES_PATH}")
+    if _catalog is not None and mtime == _catalog_mtime:
+        return _catalog
+
+    with _catalog_lock:
+        if _catalog is None or mtime != _catalog_mtime:
+            _catalog = load_role_catalog()
+            _catalog_mtime = mtime
+    return _catalog
@@ -3,6 +3,7 @@ import os
 import sys
 from typing import Dict, List
 from copy import deepcopy
+from itertools import cycle
 
 
 current_file_path = os.path.abspath(__file__)
@@ -99,6 +100,8 @@ def generate_player_info(roles, user_info_df):
     good_image_no = list(range(1,6))
     random.shuffle(bad_image_no)
     random.shuffle(good_image_no)
+    # 10명이면 (모르가나 없을 때) 악인이 4명인데 이미지는 3장 -> 섞은 순서대로 돌아가며 다시 씀
+    bad_image_cycle = cycle(reversed(bad_image_no))
 
     for player in user_info.keys():
 
@@ -136,7 +139,7 @@ def generate_player_info(roles, user_info_df):
             other_names = ", ".join(id_to_name[p] for p in others)
             bold = messages[role]["bold"]
             desc = messages[role]["desc"].format(bad_players=other_names)
-            bad_picked = bad_image_no.pop()
+            bad_picked = next(bad_image_cycle)
             img = f'./media/bad_guy_{bad_picked}.png'
 
         elif player in good:
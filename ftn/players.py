@@ -1,22 +1,19 @@
-import os
-import json
+from functools import lru_cache
+from types import SimpleNamespace
+
 from django.utils.safestring import mark_safe
 
-# 전역 이미지 카운터들
-_good_counter = 1
-_evil_counter = 1
+from ftn.catalog import RoleCatalog, get_role_catalog
 
-def load_role_data():
-    """역할 데이터 로드"""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, "role_messages.json")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# 역할 구성별 메시지 템플릿 캐시 크기 (5~10인 로비 구성 전체를 넉넉히 담음)
+MESSAGE_CACHE_SIZE = 512
 
-def get_role_image(role_name):
-    """역할별 이미지 경로 반환"""
-    global _good_counter, _evil_counter
-    
+def get_role_image(role_name, ordinal=0):
+    """역할별 이미지 경로 반환
+
+    일반 역할(신하/수하)은 ordinal번째 이미지를 돌려가며 사용한다.
+    같은 테이블에서 같은 ordinal이면 항상 같은 이미지가 나온다.
+    """
     # 특수 역할 이미지
     special_images = {
         'merlin': '/media/merlin.png',
@@ -30,89 +27,65 @@ def get_role_image(role_name):
     if role_name in special_images:
         return special_images[role_name]
     elif role_name == 'loyal_servant':
-        img_num = _good_counter
-        _good_counter = (_good_counter % 5) + 1
-        return f'/media/good_guy_{img_num}.png'
+        return f'/media/good_guy_{ordinal % 5 + 1}.png'
     else:  # minion_of_mordred 등
-        img_num = _evil_counter
-        _evil_counter = (_evil_counter % 3) + 1
-        return f'/media/bad_guy_{img_num}.png'
+        return f'/media/bad_guy_{ordinal % 3 + 1}.png'
+
+def build_visibility(players, catalog):
+    """테이블 전체 가시성 계산 (겸직 고려)
+
+    플레이어마다 역할 패키지를 비트마스크 하나로 접고, 한 번의 비트 연산으로
+    (볼 수 있는 플레이어, 볼 수 없는 악인, 겸직 중이라 볼 수 없는 악인)을 구한다.
+    cannot_see가 can_see보다 우선한다 (오베론 특성 반영).
+    """
+    masks = [catalog.mask_of(p.roles) for p in players]
+
+    # 게임에 실제로 있는 악인 역할들
+    table_evil = 0
+    for mask in masks:
+        table_evil |= mask
+    table_evil &= catalog.evil_mask
+
+    result = []
+    for i, player in enumerate(players):
+        can_see, cannot_see = catalog.sight_masks(player.roles)
+        visible_players = [
+            other for j, other in enumerate(players)
+            if j != i and masks[j] & can_see and not masks[j] & cannot_see
+        ]
+        hidden = cannot_see & table_evil
+        self_hidden = hidden & masks[i]
+        result.append((
+            visible_players,
+            [catalog.name(role) for role in catalog.roles_of(hidden & ~self_hidden)],
+            [catalog.name(role) for role in catalog.roles_of(self_hidden)],
+        ))
+    return result
+
+def _legacy_visibility(player, all_players, role_data):
+    """이전 함수들(role_data dict를 받던 시그니처)용 - build_visibility에서 player 자리 결과만
+
+    player가 all_players에 없으면 끝에 붙여서 계산한다.
+    """
+    catalog = role_data if isinstance(role_data, RoleCatalog) else RoleCatalog(role_data)
+    table = list(all_players)
+    index = next((i for i, other in enumerate(table) if other.name == player.name), None)
+    if index is None:
+        table.append(player)
+        index = len(table) - 1
+    return build_visibility(table, catalog)[index]
 
 def get_visible_players(player, all_players, role_data):
-    """플레이어가 볼 수 있는 다른 플레이어들 반환 (겸직 고려)"""
+    """플레이어가 볼 수 있는 다른 플레이어들 반환 (겸직 고려) - 테이블 전체는 build_visibility 사용"""
     if not player.roles:
         return []
-    
-    # 겸직 시 모든 역할의 can_see와 cannot_see 조합
-    combined_can_see = set()
-    combined_cannot_see = set()
-    
-    for role in player.roles:
-        role_info = role_data.get(role, {})
-        combined_can_see.update(role_info.get('can_see', []))
-        combined_cannot_see.update(role_info.get('cannot_see', []))
-    
-    visible_players = []
-    
-    for other_player in all_players:
-        if other_player.name == player.name:
-            continue
-        
-        # 다른 플레이어의 모든 역할을 확인
-        can_see_player = False
-        cannot_see_player = False
-        
-        for other_role in other_player.roles:
-            if other_role in combined_can_see:
-                can_see_player = True
-            if other_role in combined_cannot_see:
-                cannot_see_player = True
-        
-        # 볼 수 있는 역할이 있고, 볼 수 없는 역할이 없을 때만 추가
-        # 단, cannot_see가 우선순위를 가짐 (오베론 특성 반영)
-        if can_see_player and not cannot_see_player:
-            visible_players.append(other_player)
-    
-    return visible_players
+    return _legacy_visibility(player, all_players, role_data)[0]
 
 def get_invisible_evil_roles_for_player(player, all_players, role_data):
-    """특정 플레이어가 볼 수 없는 악인 역할들 반환 (겸직 고려)"""
+    """특정 플레이어가 볼 수 없는 악인 역할들 반환 (겸직 고려) - 테이블 전체는 build_visibility 사용"""
     if not player.roles:
         return [], []
-    
-    # 겸직 시 모든 역할의 cannot_see 조합
-    combined_cannot_see = set()
-    for role in player.roles:
-        role_info = role_data.get(role, {})
-        combined_cannot_see.update(role_info.get('cannot_see', []))
-    
-    # 게임에 실제로 있으면서 이 플레이어가 볼 수 없는 악인들
-    all_evil_roles_in_game = set()
-    for other_player in all_players:
-        for role in other_player.roles:
-            if role_data.get(role, {}).get('faction') == 'evil':
-                all_evil_roles_in_game.add(role)
-    
-    # 현재 플레이어의 역할들 (악인만)
-    player_evil_roles = set()
-    for role in player.roles:
-        if role_data.get(role, {}).get('faction') == 'evil':
-            player_evil_roles.add(role)
-    
-    # 볼 수 없는 악인들을 두 그룹으로 분리
-    invisible_roles = []  # 다른 플레이어가 가진 볼 수 없는 역할
-    self_invisible_roles = []  # 자기 자신이 겸직하고 있는 볼 수 없는 역할
-    
-    for role in combined_cannot_see:
-        if role in all_evil_roles_in_game:
-            role_name = role_data.get(role, {}).get('name', role)
-            if role in player_evil_roles:
-                # 자기 자신이 겸직하고 있는 역할
-                self_invisible_roles.append(role_name)
-            else:
-                # 다른 플레이어가 가진 역할
-                invisible_roles.append(role_name)
-    
+    _, invisible_roles, self_invisible_roles = _legacy_visibility(player, all_players, role_data)
     return invisible_roles, self_invisible_roles
 
 def get_korean_particle(name):
@@ -130,89 +103,121 @@ def get_korean_particle(name):
     else:
         return '은'  # 한글이 아닌 경우 기본값
 
-def generate_player_messages(assigned_players):
-    """플레이어 메시지 및 이미지 생성"""
-    role_data = load_role_data()
-    result = {}
-    
-    for player in assigned_players:
-        if not player.roles:
-            result[player.name] = {
-                "messages": [{"bold": "❓ 역할 없음", "desc": "역할 배정 오류"}],
-                "images": ["/media/unknown.png"],
-                "roles": [],
-                "faction": "unknown"
-            }
-            continue
+def _invisible_message(invisible_evil_roles, self_invisible_roles):
+    """볼 수 없는 악인 안내 문구"""
+    invisible_message = ""
+    
+    # 다른 플레이어가 가진 볼 수 없는 역할들
+    if invisible_evil_roles:
+        if len(invisible_evil_roles) == 1:
+            particle = get_korean_particle(invisible_evil_roles[0])
+            invisible_message += f"\n({invisible_evil_roles[0]}{particle} 보이지 않습니다.)"
+        else:
+            # 여러 개일 때는 마지막 이름의 조사 사용
+            last_particle = get_korean_particle(invisible_evil_roles[-1])
+            invisible_message += f"\n({', '.join(invisible_evil_roles)}{last_particle} 보이지 않습니다.)"
+    
+    # 자기 자신이 겸직하고 있는 볼 수 없는 역할들
+    if self_invisible_roles:
+        if len(self_invisible_roles) == 1:
+            invisible_message += f"\n(악인 {self_invisible_roles[0]}을 겸직하고 있어서 보이지 않습니다.)"
+        else:
+            invisible_message += f"\n(악인 {', '.join(self_invisible_roles)}을 겸직하고 있어서 보이지 않습니다.)"
+    
+    return invisible_message
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def _render_composition(catalog, composition):
+    """역할 구성별 메시지 템플릿 렌더링
+
+    composition은 정렬된 역할 패키지 튜플. 위치마다
+    (메시지 틀, 볼 수 있는 위치들, 진영)을 반환하고, 이름은 분배 때 채운다.
+    """
+    slots = [SimpleNamespace(name=position, roles=list(package)) for position, package in enumerate(composition)]
+
+    rendered = []
+    for slot, (visible_slots, invisible_evil_roles, self_invisible_roles) in zip(slots, build_visibility(slots, catalog)):
+        invisible_message = _invisible_message(invisible_evil_roles, self_invisible_roles)
         
         messages = []
-        images = []
-        
-        # 가시성 계산
-        visible_players = get_visible_players(player, assigned_players, role_data)
-        visible_names = [p.name for p in visible_players]
-        target_text = ", ".join(visible_names) if visible_names else "없음"
-        
-        # 현재 플레이어가 볼 수 없는 악인들
-        current_faction = role_data.get(player.roles[0], {}).get("faction", "unknown")
-        invisible_evil_roles, self_invisible_roles = get_invisible_evil_roles_for_player(player, assigned_players, role_data)
-        
-        invisible_message = ""
-        
-        # 다른 플레이어가 가진 볼 수 없는 역할들
-        if invisible_evil_roles:
-            if len(invisible_evil_roles) == 1:
-                particle = get_korean_particle(invisible_evil_roles[0])
-                invisible_message += f"\n({invisible_evil_roles[0]}{particle} 보이지 않습니다.)"
-            else:
-                # 여러 개일 때는 마지막 이름의 조사 사용
-                last_particle = get_korean_particle(invisible_evil_roles[-1])
-                invisible_message += f"\n({', '.join(invisible_evil_roles)}{last_particle} 보이지 않습니다.)"
-        
-        # 자기 자신이 겸직하고 있는 볼 수 없는 역할들
-        if self_invisible_roles:
-            if len(self_invisible_roles) == 1:
-                invisible_message += f"\n(악인 {self_invisible_roles[0]}을 겸직하고 있어서 보이지 않습니다.)"
-            else:
-                invisible_message += f"\n(악인 {', '.join(self_invisible_roles)}을 겸직하고 있어서 보이지 않습니다.)"
-        
-        for role_name in player.roles:
-            role_info = role_data.get(role_name, {})
+        for role_name in slot.roles:
+            role_info = catalog.get(role_name, {})
             
             bold = role_info.get("bold", f"❓ {role_name}")
-            desc = role_info.get("desc", f"당신은 {role_name}입니다.")
-            
-            # 플레이어 목록 치환
-            # if "{final_visible_players}" in desc:
-            #     desc = desc.format(final_visible_players=target_text)
-            # elif "{target_players}" in desc:
-            #     desc = desc.format(target_players=target_text)
-            
-            # 최종 desc에 mark_safe 적용
-            desc = mark_safe(desc)
-            
             # CSS의 white-space: pre-line으로 줄바꿈 처리하므로 \n 그대로 유지
-            # desc = desc.replace('\n', '<br>') # 주석 처리
+            desc = mark_safe(role_info.get("desc", f"당신은 {role_name}입니다."))
             
             # 능력 보유 여부
-            has_ability = len(role_data.get(role_name, {}).get('can_see', [])) > 0
+            has_ability = len(role_info.get('can_see', [])) > 0
             
             # 볼 수 없는 악인 정보를 별도 필드로 처리
             invisible_info = ""
             if role_info.get('can_see', []) and invisible_message:
                 invisible_info = mark_safe(invisible_message.strip())
             
-            messages.append({"bold": bold, "desc": desc, "visible": target_text, "invisible": invisible_info, "ability": has_ability})
-            images.append(get_role_image(role_name))
+            messages.append((bold, desc, invisible_info, has_ability))
         
         # 첫 번째 역할의 진영 사용
-        faction = role_data.get(player.roles[0], {}).get("faction", "unknown")
+        faction = catalog.faction(slot.roles[0]) if slot.roles else "unknown"
+        rendered.append((tuple(messages), tuple(other.name for other in visible_slots), faction))
+    
+    return tuple(rendered)
+
+def _next_role_image(role_name, image_counts, image_seed):
+    """테이블 안에서 일반 역할 이미지를 순서대로 배정"""
+    ordinal = image_counts.get(role_name, 0)
+    image_counts[role_name] = ordinal + 1
+    return get_role_image(role_name, image_seed + ordinal)
+
+def message_cache_info():
+    """메시지 템플릿 캐시 통계 (hits, misses, maxsize, currsize)"""
+    return _render_composition.cache_info()
+
+def clear_message_cache():
+    _render_composition.cache_clear()
+
+def generate_player_messages(assigned_players, image_seed=0):
+    """플레이어 메시지 및 이미지 생성
+
+    결과는 (좌석 순서, 역할, image_seed)만으로 결정되므로
+    저장하지 않고 읽을 때 다시 만들어도 같은 내용이 나온다.
+    """
+    catalog = get_role_catalog()
+
+    # 좌석 순서와 무관한 역할 구성 시그니처
+    order = sorted(range(len(assigned_players)), key=lambda seat: tuple(assigned_players[seat].roles))
+    composition = tuple(tuple(assigned_players[seat].roles) for seat in order)
+    rendered = _render_composition(catalog, composition)
+
+    position_of = {seat: position for position, seat in enumerate(order)}
+    image_counts = {}
+
+    result = {}
+    for seat, player in enumerate(assigned_players):
+        if not player.roles:
+            result[player.name] = {
+                "messages": [{"bold": "❓ 역할 없음", "desc": "역할 배정 오류"}],
+                "images": ["/media/unknown.png"],
+                "roles": [],
+                "faction": "unknown"
+            }
+            continue
+        
+        message_templates, visible_positions, faction = rendered[position_of[seat]]
+        
+        # 이름 채우기 (좌석 순서대로)
+        visible_seats = sorted(order[position] for position in visible_positions)
+        visible_names = [assigned_players[other].name for other in visible_seats]
+        target_text = ", ".join(visible_names) if visible_names else "없음"
         
         result[player.name] = {
-            "messages": messages,
-            "images": images,
+            "messages": [
+                {"bold": bold, "desc": desc, "visible": target_text, "invisible": invisible, "ability": ability}
+                for bold, desc, invisible, ability in message_templates
+            ],
+            "images": [_next_role_image(role_name, image_counts, image_seed) for role_name in player.roles],
             "roles": player.roles,
             "faction": faction
         }
     
-    return result
\ No newline at end of file
+    return result
@@ -1,4 +1,15 @@
 import secrets
+from array import array
+from itertools import combinations
+
+from ftn.catalog import get_role_catalog
+from ftn.players import get_korean_particle
+
+# 검증 결과를 기억해 둘 역할 구성 수 (로비 설정은 몇 가지뿐이라 넉넉함)
+VALIDATION_CACHE_SIZE = 1024
+
+# 로비에서 켜고 끌 수 있는 특수 악인
+SPECIAL_EVIL_ROLES = ['morgana', 'mordred', 'oberon']
 
 
 def num_of_evil_roles(player_count):
@@ -13,13 +24,48 @@ def num_of_evil_roles(player_count):
     else:
         return 4
 
-# 겸직 금지 조합
-FORBIDDEN_COMBINATIONS = [
-    ('mordred', 'oberon'),
-    ('oberon', 'mordred'), 
-    ('morgana', 'oberon'),
-    ('oberon', 'morgana'),
-]
+def role_group_configs(player_count):
+    """로비에서 가능한 역할 토글 조합 (퍼시벌 on/off × 특수 악인 조합)"""
+    max_special = num_of_evil_roles(player_count) - 1  # 암살자 한 자리 제외
+    configs = []
+    for percival in (False, True):
+        for size in range(max_special + 1):
+            for specials in combinations(SPECIAL_EVIL_ROLES, size):
+                role_groups = [['assassin']] + [[role] for role in specials]
+                if percival:
+                    role_groups.append(['percival'])
+                configs.append(role_groups)
+    return configs
+
+def build_role_packages(role_groups, player_count, catalog):
+    """로비 역할 설정으로 인원수에 맞는 역할 패키지 목록 구성"""
+    # 기본 역할 패키지 구성
+    good_packages = [['merlin']]
+    evil_packages = []
+    
+    for pkg in role_groups:
+        is_good = any(role in catalog.good_roles for role in pkg)
+        is_evil = any(role in catalog.evil_roles for role in pkg)
+        
+        if is_good and not is_evil:
+            good_packages.append(pkg)
+        elif is_evil and not is_good:
+            evil_packages.append(pkg)
+    
+    # 역할 부족분 자동 채우기
+    required_evil = num_of_evil_roles(player_count)
+    required_good = player_count - required_evil
+    
+    if not evil_packages:
+        evil_packages.append(['assassin'])
+    
+    while len(evil_packages) < required_evil:
+        evil_packages.append(['minion_of_mordred'])
+    
+    while len(good_packages) < required_good:
+        good_packages.append(['loyal_servant'])
+
+    return good_packages + evil_packages
 
 class RolePlayer:
     def __init__(self, name):
@@ -29,25 +75,42 @@ class RolePlayer:
     def __repr__(self):
         return f"RolePlayer({self.name}, roles={self.roles})"
 
-def validate_role_packages(role_packages):
-    """역할 패키지 검증"""
-    all_roles = []
-    for package in role_packages:
-        all_roles.extend(package)
-    
-    # 겸직 금지 조합 확인
-    for package in role_packages:
-        package_set = set(package)
-        for forbidden in FORBIDDEN_COMBINATIONS:
-            if forbidden[0] in package_set and forbidden[1] in package_set:
-                raise ValueError(f"금지된 겸직: {forbidden[0]} + {forbidden[1]}")
-    
+def package_signature(role_packages):
+    """역할 구성의 정규화된 시그니처 (패키지 순서/패키지 내 순서 무관)"""
+    return tuple(sorted(tuple(sorted(package)) for package in role_packages))
+
+def _check_role_packages(signature, catalog):
+    """검증 실패 메시지 반환, 통과하면 None"""
+    all_roles = 0
+    for package in signature:
+        # 겸직 금지 조합 확인
+        for pair in combinations(package, 2):
+            if frozenset(pair) in catalog.forbidden_pairs:
+                return f"금지된 겸직: {pair[0]} + {pair[1]}"
+        all_roles |= catalog.mask_of(package)
+
     # 필수 역할 확인
-    if 'merlin' not in all_roles:
-        raise ValueError("멀린은 필수 역할입니다.")
-    if 'assassin' not in all_roles:
-        raise ValueError("암살자는 필수 역할입니다.")
+    for role in catalog.roles_of(catalog.required_mask & ~all_roles):
+        name = catalog.name(role)
+        return f"{name}{get_korean_particle(name)} 필수 역할입니다."
+    return None
 
+def validate_role_packages(role_packages, catalog=None):
+    """역할 패키지 검증 - 같은 구성은 카탈로그마다 한 번만 검사"""
+    catalog = catalog or get_role_catalog()
+    signature = package_signature(role_packages)
+
+    cache = catalog.validation_cache
+    try:
+        error = cache[signature]
+    except KeyError:
+        error = _check_role_packages(signature, catalog)
+        if len(cache) >= VALIDATION_CACHE_SIZE:
+            cache.clear()
+        cache[signature] = error
+
+    if error:
+        raise ValueError(error)
     return True
 
 def assign_by_role_packages(players, role_packages):
@@ -66,3 +129,110 @@ def assign_by_role_packages(players, role_packages):
         player.roles = package
 
     return players
+
+def composition_summary(players, catalog):
+    """분배 결과 요약 - 진영별 [역할 패키지, 인원] 목록과 합계, 역할 공개 순서
+
+    players는 (닉네임, 역할 목록, 진영) 목록. 결과는 JSON으로 저장할 수 있는 dict
+    """
+    counts = {'good': {}, 'evil': {}}
+    for _, roles, faction in players:
+        if roles and faction in counts:
+            package = tuple(roles)
+            counts[faction][package] = counts[faction].get(package, 0) + 1
+
+    summary = {}
+    for faction, packages in counts.items():
+        # 패키지의 첫 역할 우선순위 순 (같으면 처음 나온 순서)
+        ordered = sorted(packages.items(), key=lambda item: catalog.priority(item[0][0]))
+        summary[faction] = [[list(package), count] for package, count in ordered]
+        summary[f'{faction}_total'] = sum(packages.values())
+
+    # 역할 공개 순서: 악인→선인, 우선순위 순 (역할 없는 플레이어는 마지막)
+    def reveal_key(player):
+        _, roles, faction = player
+        if not roles or faction not in counts:
+            return (2, 999)
+        return (0 if faction == 'evil' else 1, catalog.priority(roles[0]))
+
+    summary['reveal_order'] = [nickname for nickname, _, _ in sorted(players, key=reveal_key)]
+    return summary
+
+
+class Deals:
+    """deal_many 결과 - int8 행렬 (행 하나가 한 판, 값은 role_packages 인덱스)"""
+
+    def __init__(self, buffer, width):
+        self.buffer = buffer
+        self.width = width
+
+    @property
+    def shape(self):
+        return (len(self), self.width)
+
+    def __len__(self):
+        return len(self.buffer) // self.width if self.width else 0
+
+    def row(self, index):
+        """index번째 판: 좌석 순서대로 받은 패키지 인덱스"""
+        if index < 0:
+            index += len(self)
+        start = index * self.width
+        return self.buffer[start:start + self.width]
+
+    def __getitem__(self, index):
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def column(self, seat):
+        """seat번 좌석이 판마다 받은 패키지 인덱스"""
+        return self.buffer[seat::self.width]
+
+    def tobytes(self):
+        return self.buffer.tobytes()
+
+    def __repr__(self):
+        return f"Deals(shape={self.shape})"
+
+
+def _random_bytes(chunk_size):
+    """CSPRNG 바이트 스트림 - chunk_size 단위로 한 번에 뽑아서 버퍼링"""
+    while True:
+        yield from secrets.token_bytes(chunk_size)
+
+
+def deal_many(role_packages, n):
+    """역할 패키지를 n판 한꺼번에 섞어서 int8 순열 행렬로 반환
+
+    검증은 한 번만 하고, 판마다 Fisher-Yates 셔플을 버퍼링된 CSPRNG 바이트로
+    수행한다 (거절 샘플링으로 편향 없음).
+    """
+    width = len(role_packages)
+    if not 0 < width <= 127:
+        raise ValueError("역할 조합 수는 1개에서 127개 사이여야 합니다.")
+    if n < 0:
+        raise ValueError("판 수는 0 이상이어야 합니다.")
+
+    validate_role_packages(role_packages)
+
+    # (스왑 위치, 범위, 거절 한계) - 한계 이상의 바이트는 버림
+    steps = [(i, i + 1, 256 - 256 % (i + 1)) for i in range(width - 1, 0, -1)]
+    expected = sum(256 / limit for _, _, limit in steps) * n
+    draw = _random_bytes(int(expected * 1.05) + 64).__next__
+
+    identity = list(range(width))
+    buffer = array('b')
+    for _ in range(n):
+        perm = identity[:]
+        for i, bound, limit in steps:
+            value = draw()
+            while value >= limit:
+                value = draw()
+            j = value % bound
+            perm[i], perm[j] = perm[j], perm[i]
+        buffer.extend(perm)
+
+    return Deals(buffer, width)
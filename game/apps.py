@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game'
+
+    def ready(self):
+        # AVALON_PURGE_INTERVAL이 설정되면 첫 요청 때 세션 정리 스케줄러 시작
+        from .retention import start_scheduler
+        request_started.connect(start_scheduler, dispatch_uid='avalon-purge-scheduler')
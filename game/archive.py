@@ -0,0 +1,211 @@
+# game/archive.py
+"""종료된 세션 콜드 보관 - 세션과 플레이어를 압축한 ArchivedSession 행 하나로 옮기고 hot 테이블에서 삭제
+
+보관본에는 종료 화면에 필요한 것만 남긴다 (PIN 해시와 역할 메시지는 빼고, 메시지는 읽을 때 역할에서 다시 만듦).
+보관본은 바뀌지 않으므로 풀어 둔 스냅샷을 프로세스마다 작은 LRU에 만료 없이 둔다.
+manage.py archive_sessions로 돌리거나, 정리 스케줄러(AVALON_PURGE_INTERVAL)가 정리 전에 돌린다.
+"""
+import json
+import time
+import zlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedSession, GameSession, Player
+
+FORMAT_VERSION = 2
+# 이전 형식 - 읽기만 함 (1: 플레이어에 더미 여부 없음)
+READABLE_VERSIONS = (1, 2)
+
+# 작은 payload(수백 바이트)의 압축률을 올리는 zlib 사전 - 자주 나오는 문자열일수록 뒤에
+# 기존 보관본을 풀 때도 필요하므로 바꾸려면 FORMAT_VERSION을 올리고 이전 사전도 남길 것
+ZDICT = (
+    b'oberon"]mordred"]percival"]morgana"]minion_of_mordred"],1]]loyal_servant"],'
+    b'"evil_total":"good_total":"reveal_order":["'
+    b'{"good":[[["merlin"],1],[["percival"],1],[["loyal_servant"],'
+    b'"evil":[[["assassin"],1],[["morgana"],1],[["minion_of_mordred"],'
+    b'"g":[["assassin"],["morgana"],["percival"]],"s":true,"d":false,"c":'
+    b'player_dummy_,"p":[['
+)
+
+
+def pack(game_session, players):
+    """세션 + pk 순 플레이어 목록 -> 보관용 bytes
+
+    키는 한 글자: h 호스트, d 더미 사용, g 역할 그룹, s 시작 여부, v 상태 버전, c 구성 요약,
+    p 플레이어 [pk, 닉네임, 역할 마스크, 진영 코드, 더미 여부(0/1)]
+    """
+    data = {
+        'h': game_session.host_nickname,
+        'd': game_session.enable_dummy,
+        'g': game_session.role_groups,
+        's': game_session.is_started,
+        'v': game_session.state_version,
+        'c': game_session.composition,
+        'p': [[player.pk, player.nickname, player.role_mask, player.faction_code, int(player.is_dummy)]
+              for player in players],
+    }
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+    compressor = zlib.compressobj(9, zdict=ZDICT)
+    return bytes([FORMAT_VERSION]) + compressor.compress(raw) + compressor.flush()
+
+
+def legacy_dummy_flags(enable_dummy, nicknames):
+    """형식 1 보관본의 좌석별 더미 여부 - 닉네임만으로 추정
+
+    더미는 5명을 채울 때만 dummy_0부터 차례로 만들어져 pk 순 맨 뒤에 붙으므로,
+    접두사만 보지 않고 뒤에서부터 그 모양과 맞는 좌석만 더미로 센다.
+    """
+    flags = [0] * len(nicknames)
+    if not enable_dummy or len(nicknames) != 5:
+        return flags
+    for count in range(len(nicknames) - 1, 0, -1):
+        if nicknames[-count:] == [f'dummy_{i}' for i in range(count)]:
+            flags[-count:] = [1] * count
+            break
+    return flags
+
+
+def unpack(payload):
+    payload = bytes(payload)
+    if payload[0] not in READABLE_VERSIONS:
+        raise ValueError(f"알 수 없는 보관 형식: {payload[0]}")
+    decompressor = zlib.decompressobj(zdict=ZDICT)
+    data = json.loads(decompressor.decompress(payload[1:]) + decompressor.flush())
+    if payload[0] == 1:
+        flags = legacy_dummy_flags(data['d'], [player[1] for player in data['p']])
+        data['p'] = [player + [flag] for player, flag in zip(data['p'], flags)]
+    return data
+
+
+def restore(record):
+    """보관본 -> 저장하지 않는(읽기 전용) GameSession과 플레이어로 만든 SessionSnapshot"""
+    from .snapshot import SessionSnapshot
+
+    data = unpack(record.payload)
+    game_session = GameSession(
+        session_id=record.session_id,
+        created_at=record.created_at,
+        host_nickname=data['h'],
+        enable_dummy=data['d'],
+        role_groups=data['g'],
+        is_active=False,
+        is_started=data['s'],
+        state_version=data['v'],
+        composition=data['c'],
+    )
+    players = [
+        Player(pk=pk, game_session=game_session, nickname=nickname, pin='', is_dummy=bool(is_dummy),
+               role_mask=role_mask, faction_code=faction_code)
+        for pk, nickname, role_mask, faction_code, is_dummy in data['p']
+    ]
+    return SessionSnapshot(game_session, players)
+
+
+class ArchiveCache:
+    """풀어 둔 보관 스냅샷 LRU (보관본은 바뀌지 않으므로 만료 없음)"""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        with self.lock:
+            snapshot = self.entries.get(session_id)
+            if snapshot is not None:
+                self.entries.move_to_end(session_id)
+            return snapshot
+
+    def put(self, session_id, snapshot):
+        with self.lock:
+            self.entries[session_id] = snapshot
+            self.entries.move_to_end(session_id)
+            while len(self.entries) > settings.AVALON_ARCHIVE_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def discard(self, session_ids):
+        with self.lock:
+            for session_id in session_ids:
+                self.entries.pop(session_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+archive_cache = ArchiveCache()
+
+
+def archived_snapshot(session_id):
+    """보관된 세션의 스냅샷 (보관되지 않았으면 None)"""
+    key = str(session_id)
+    snapshot = archive_cache.get(key)
+    if snapshot is None:
+        record = ArchivedSession.objects.filter(session_id=session_id).first()
+        if record is None:
+            return None
+        snapshot = restore(record)
+        archive_cache.put(key, snapshot)
+    return snapshot
+
+
+async def aarchived_snapshot(session_id):
+    """archived_snapshot의 async 버전"""
+    key = str(session_id)
+    snapshot = archive_cache.get(key)
+    if snapshot is None:
+        record = await ArchivedSession.objects.filter(session_id=session_id).afirst()
+        if record is None:
+            return None
+        snapshot = restore(record)
+        archive_cache.put(key, snapshot)
+    return snapshot
+
+
+def archive_sessions(min_age=None, batch_size=None, pause=0, dry_run=False, now=None):
+    """생성 후 min_age초가 지난 종료 세션을 보관본으로 옮김 - {'sessions', 'players', 'batches', 'bytes'} 반환
+
+    묶음 하나(보관본 bulk_create + 원본 삭제)가 트랜잭션 하나. bytes는 새로 쓴 보관본 크기 합.
+    """
+    from .retention import expired_sessions
+
+    min_age = settings.AVALON_ARCHIVE_AFTER if min_age is None else min_age
+    batch_size = batch_size or settings.AVALON_PURGE_BATCH_SIZE
+    now = now or timezone.now()
+    sessions = expired_sessions(False, min_age, now)
+
+    stats = {'sessions': 0, 'players': 0, 'batches': 0, 'bytes': 0}
+    if dry_run:
+        stats['sessions'] = sessions.count()
+        stats['players'] = Player.objects.filter(game_session__in=sessions.values('pk')).count()
+        return stats
+
+    while True:
+        with transaction.atomic():
+            batch = list(sessions[:batch_size])
+            if not batch:
+                break
+            players = {}
+            for player in Player.objects.filter(game_session__in=batch).only(
+                    'pk', 'game_session_id', 'nickname', 'role_mask', 'faction_code', 'is_dummy').order_by('pk'):
+                players.setdefault(player.game_session_id, []).append(player)
+
+            records = [
+                ArchivedSession(session_id=game_session.pk, created_at=game_session.created_at,
+                                payload=pack(game_session, players.get(game_session.pk, [])))
+                for game_session in batch
+            ]
+            ArchivedSession.objects.bulk_create(records)
+            GameSession.objects.filter(pk__in=[game_session.pk for game_session in batch]).delete()
+
+        stats['sessions'] += len(batch)
+        stats['players'] += sum(len(group) for group in players.values())
+        stats['batches'] += 1
+        stats['bytes'] += sum(len(record.payload) for record in records)
+        if pause:
+            time.sleep(pause)
+    return stats
@@ -0,0 +1,138 @@
+# game/auth.py
+import uuid
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import signing
+
+from .metrics import check_password
+from .models import Player
+
+TOKEN_SALT = 'game.player'
+TOKEN_HEADER = 'X-Avalon-Token'
+
+
+_password_executor = None
+_password_executor_lock = threading.Lock()
+
+
+def password_executor():
+    """PIN 해시 확인 전용 스레드 풀 - 크기를 제한해 느린 해시가 서버 전체를 막지 않게"""
+    global _password_executor
+    if _password_executor is None:
+        with _password_executor_lock:
+            if _password_executor is None:
+                _password_executor = ThreadPoolExecutor(
+                    max_workers=settings.AVALON_PASSWORD_WORKERS, thread_name_prefix='avalon-password')
+    return _password_executor
+
+
+async def acheck_password(pin, encoded):
+    """check_password를 이벤트 루프 밖(제한된 스레드 풀)에서 실행 (요청 metrics는 context 복사로 전달)"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(password_executor(), context.run, check_password, pin, encoded)
+
+
+def token_cookie_name(session_id):
+    """세션마다 따로 쓰는 토큰 쿠키 이름 (여러 세션 동시 참여 가능)"""
+    return f'avalon_{uuid.UUID(str(session_id)).hex}'
+
+
+def issue_token(player):
+    """PIN 확인이 끝난 플레이어에게 세션/닉네임에 묶인 HMAC 서명 토큰 발급"""
+    return signing.dumps(
+        {'s': str(player.game_session_id), 'n': player.nickname, 'p': player.pk},
+        salt=TOKEN_SALT,
+    )
+
+
+def set_token_cookie(response, request, player):
+    response.set_cookie(
+        token_cookie_name(player.game_session_id),
+        issue_token(player),
+        max_age=settings.AVALON_TOKEN_MAX_AGE,
+        httponly=True,
+        samesite='Lax',
+        secure=request.is_secure(),
+    )
+    return response
+
+
+def read_token(request, session_id):
+    """요청의 토큰 검증 - 성공하면 (닉네임, player pk), 아니면 None"""
+    token = request.headers.get(TOKEN_HEADER) or request.COOKIES.get(token_cookie_name(session_id))
+    if not token:
+        return None
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=settings.AVALON_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if data.get('s') != str(session_id):
+        return None
+    return data.get('n'), data.get('p')
+
+
+def legacy_credentials(request):
+    """토큰이 없는 예전 링크의 (닉네임, PIN) - 이전 기간(AVALON_LEGACY_PIN_AUTH)이 아니거나 없으면 None"""
+    if not settings.AVALON_LEGACY_PIN_AUTH:
+        return None
+    nickname = request.GET.get('nickname') or request.POST.get('nickname')
+    pin = request.GET.get('pin') or request.POST.get('pin')
+    if not nickname or not pin:
+        return None
+    return nickname, pin
+
+
+def authenticate_player(request, game_session, snapshot=None):
+    """토큰(쿠키/헤더)으로 플레이어 확인, 없으면 (이전 기간에만) 닉네임 + PIN으로 확인
+
+    snapshot(game.snapshot.SessionSnapshot)을 넘기면 토큰 확인은 DB 조회 없이 스냅샷에서 한다.
+    """
+    claims = read_token(request, game_session.session_id)
+    if claims:
+        nickname, player_pk = claims
+        if snapshot is not None:
+            return snapshot.player(nickname, pk=player_pk)
+        try:
+            # 추방 후 같은 닉네임으로 다시 들어온 플레이어와 구분하기 위해 pk까지 확인
+            return Player.objects.get(game_session=game_session, nickname=nickname, pk=player_pk)
+        except Player.DoesNotExist:
+            return None
+
+    # 토큰이 없는 예전 링크 호환 (느린 PIN 해시 확인)
+    credentials = legacy_credentials(request)
+    if credentials is None:
+        return None
+    nickname, pin = credentials
+    try:
+        player = Player.objects.get(game_session=game_session, nickname=nickname)
+    except Player.DoesNotExist:
+        return None
+    return player if check_password(pin, player.pin) else None
+
+
+async def aauthenticate_player(request, game_session, snapshot=None):
+    """authenticate_player의 async 버전 (PIN 확인은 password_executor에서)"""
+    claims = read_token(request, game_session.session_id)
+    if claims:
+        nickname, player_pk = claims
+        if snapshot is not None:
+            return snapshot.player(nickname, pk=player_pk)
+        try:
+            return await Player.objects.aget(game_session=game_session, nickname=nickname, pk=player_pk)
+        except Player.DoesNotExist:
+            return None
+
+    credentials = legacy_credentials(request)
+    if credentials is None:
+        return None
+    nickname, pin = credentials
+    try:
+        player = await Player.objects.aget(game_session=game_session, nickname=nickname)
+    except Player.DoesNotExist:
+        return None
+    return player if await acheck_password(pin, player.pin) else None
@@ -0,0 +1,236 @@
+# game/events.py
+"""세션 이벤트 pub/sub 브로커
+
+publish(session_id, event)는 뷰(워커 스레드)에서, subscribe(session_id)는 SSE 같은 async 코드에서 쓴다.
+구독자마다 크기가 정해진 큐를 두고, 큐가 가득 찬 느린 구독자는 메모리를 늘리는 대신 끊는다.
+"""
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+DEFAULT_QUEUE_SIZE = 64
+
+
+class SubscriptionDropped(Exception):
+    """큐가 넘쳐 브로커가 구독을 끊음 - 구독자는 현재 상태를 다시 읽고 새로 구독해야 한다"""
+
+
+class Subscription:
+    """세션 하나에 대한 구독 (만든 이벤트 루프에서만 사용)"""
+
+    def __init__(self, broker, session_id, queue_size):
+        self.broker = broker
+        self.session_id = session_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.dropped = False
+
+    def deliver(self, event):
+        """구독자 루프에서 실행 - 큐가 가득 차면 구독을 끊음"""
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 큐가 찼다면 구독자는 get()에서 기다리는 중이 아니므로 다음 get()에서 알게 됨
+            self.dropped = True
+            self.broker.unsubscribe(self)
+
+    async def get(self, timeout=None):
+        """다음 이벤트 - timeout이 지나면 None, 끊긴 구독이면 SubscriptionDropped"""
+        if self.dropped:
+            raise SubscriptionDropped(self.session_id)
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except SubscriptionDropped:
+            raise StopAsyncIteration
+
+
+class EventBroker(ABC):
+    """브로커 인터페이스 - 다중 워커 배포용 백엔드는 이 클래스를 상속해서 구현
+
+    메서드를 빠뜨린 백엔드는 get_broker()가 만들 때 TypeError로 실패한다.
+    """
+
+    @abstractmethod
+    def publish(self, session_id, event):
+        """이벤트(dict) 발행 - 어느 스레드에서든 호출 가능"""
+
+    @abstractmethod
+    def subscribe(self, session_id):
+        """Subscription 반환 - 실행 중인 이벤트 루프 안에서 호출"""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """구독 해제 - Subscription.close()와 느린 구독자를 끊을 때 호출"""
+
+
+class InMemoryBroker(EventBroker):
+    """단일 프로세스용 브로커 - 같은 프로세스의 구독자에게만 전달"""
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = {}  # session_id -> set(Subscription)
+        self.lock = threading.Lock()
+
+    def subscribe(self, session_id):
+        subscription = Subscription(self, str(session_id), self.queue_size)
+        with self.lock:
+            self.subscribers.setdefault(subscription.session_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.session_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.session_id]
+
+    def publish(self, session_id, event):
+        self.dispatch(str(session_id), event)
+
+    def dispatch(self, session_id, event):
+        """이 프로세스의 구독자에게 전달 - 구독자마다 큐에 넣기만 함"""
+        with self.lock:
+            subscribers = tuple(self.subscribers.get(session_id, ()))
+        if not subscribers:
+            return
+
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscription in subscribers:
+            if subscription.loop is current_loop:
+                subscription.deliver(event)
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # 루프가 이미 닫힘
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, session_id=None):
+        with self.lock:
+            if session_id is None:
+                return sum(len(subscribers) for subscribers in self.subscribers.values())
+            return len(self.subscribers.get(str(session_id), ()))
+
+
+class SQLiteBroker(InMemoryBroker):
+    """여러 워커 프로세스가 SQLite 파일 하나로 이벤트를 공유하는 브로커 (로컬/테스트용)
+
+    발행은 파일에 한 줄 추가, 각 프로세스는 구독자가 있는 동안만 poll_interval마다 새 줄을 읽어
+    자기 구독자에게 전달한다.
+    """
+
+    RETENTION = 60
+
+    def __init__(self, path, poll_interval=0.5, queue_size=DEFAULT_QUEUE_SIZE):
+        super().__init__(queue_size=queue_size)
+        self.path = str(path)
+        self.poll_interval = poll_interval
+        self.readers = {}  # 이벤트 루프 -> 읽기 task
+        with self.connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS avalon_events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, payload TEXT NOT NULL, created REAL NOT NULL)'
+            )
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def publish(self, session_id, event):
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute(
+                'INSERT INTO avalon_events (session_id, payload, created) VALUES (?, ?, ?)',
+                (str(session_id), json.dumps(event), now),
+            )
+            connection.execute('DELETE FROM avalon_events WHERE created < ?', (now - self.RETENTION,))
+
+    def subscribe(self, session_id):
+        subscription = super().subscribe(session_id)
+        loop = subscription.loop
+        if loop not in self.readers:
+            # 구독 직후 발행된 이벤트를 놓치지 않도록 시작 위치는 여기서 정함
+            last_id, _ = self.fetch_after(None)
+            self.readers[loop] = loop.create_task(self.read_events(loop, last_id))
+        return subscription
+
+    def fetch_after(self, last_id):
+        with self.connect() as connection:
+            if last_id is None:
+                return connection.execute('SELECT COALESCE(MAX(id), 0) FROM avalon_events').fetchone()[0], []
+            rows = connection.execute(
+                'SELECT id, session_id, payload FROM avalon_events WHERE id > ? ORDER BY id', (last_id,)
+            ).fetchall()
+        return (rows[-1][0] if rows else last_id), rows
+
+    async def read_events(self, loop, last_id):
+        try:
+            while self.subscriber_count():
+                await asyncio.sleep(self.poll_interval)
+                last_id, rows = await asyncio.to_thread(self.fetch_after, last_id)
+                for _, session_id, payload in rows:
+                    self.dispatch(session_id, json.loads(payload))
+        finally:
+            self.readers.pop(loop, None)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """settings.AVALON_EVENT_BROKER로 만든 프로세스 전역 브로커"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = settings.AVALON_EVENT_BROKER
+                _broker = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def publish(session_id, event):
+    get_broker().publish(session_id, event)
+
+
+def subscribe(session_id):
+    return get_broker().subscribe(session_id)
+
+
+def reset_broker(*, setting, **kwargs):
+    global _broker
+    if setting == 'AVALON_EVENT_BROKER':
+        _broker = None
+
+
+setting_changed.connect(reset_broker)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game.archive import archive_sessions
+
+
+class Command(BaseCommand):
+    help = '종료된 세션을 압축 보관본으로 옮기고 hot 테이블에서 삭제 - 묶음 단위, 종료 화면은 보관본에서 그대로 열림'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=settings.AVALON_ARCHIVE_AFTER,
+                            help='생성 후 이 시간(초)이 지난 종료 세션만 (0이면 종료된 세션 전부)')
+        parser.add_argument('--batch-size', type=int, default=settings.AVALON_PURGE_BATCH_SIZE,
+                            help='트랜잭션 하나에 옮길 세션 수')
+        parser.add_argument('--pause', type=float, default=0, help='묶음 사이 대기 (초, 운영 중 부하 분산)')
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 수만 출력')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size는 1 이상이어야 합니다.')
+        if options['min_age'] < 0:
+            raise CommandError('--min-age는 0 이상이어야 합니다.')
+
+        stats = archive_sessions(
+            min_age=options['min_age'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f"보관 대상: 세션 {stats['sessions']:,}개, 플레이어 {stats['players']:,}명")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"보관: 세션 {stats['sessions']:,}개, 플레이어 {stats['players']:,}명 "
+                f"({stats['batches']}묶음, 보관본 {stats['bytes'] / 1024:,.1f} KiB)"
+            ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from game.stats import BACKFILL_CHUNK_SIZE, backfill_role_stats
+
+
+class Command(BaseCommand):
+    help = '시작된 세션의 Player 행과 보관본을 다시 세서 역할 배정 통계를 새로 만듦 (통계 도입 전 기록용, 기존 카운터는 교체)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=BACKFILL_CHUNK_SIZE, help='한 번에 읽어 올 행 수')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size는 1 이상이어야 합니다.')
+        sessions = backfill_role_stats(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"역할 배정 통계 재계산: 세션 {sessions:,}개"))
@@ -0,0 +1,361 @@
+import json
+import time
+import random
+import tempfile
+import threading
+import http.client
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import resolve, reverse
+
+from game.metrics import QUERIES, REQUEST_OFFSET, collect
+
+
+def percentile(ordered, q):
+    """정렬된 값에서 nearest-rank 백분위수"""
+    if not ordered:
+        return 0.0
+    rank = max(1, round(q / 100 * len(ordered) + 0.5))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ClientAgent:
+    """Django 테스트 클라이언트로 요청 (프로세스 안, 네트워크 없음)"""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None, headers=None):
+        if method == 'POST':
+            response = self.client.post(path, data or {}, headers=headers)
+        else:
+            response = self.client.get(path, headers=headers)
+        return response.status_code, response.headers, response.content
+
+
+class HttpAgent:
+    """keep-alive 연결 하나와 쿠키를 가진 HTTP 클라이언트 (runserver/uvicorn/gunicorn 대상)"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.connection = None
+        self.cookies = {}
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if method == 'POST':
+            body = urlencode(data or {})
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            if 'csrftoken' in self.cookies:
+                headers['X-CSRFToken'] = self.cookies['csrftoken']
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=30)
+            try:
+                self.connection.request(method, self.prefix + path, body, headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # 서버가 keep-alive 연결을 닫은 경우 한 번만 다시 연결
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                if morsel['max-age'] == '0':
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.coded_value
+        return response.status, response.headers, content
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+class SyntheticSession:
+    """호스트 1명 + 플레이어들이 로비 참가 → 1초 폴링 → 시작 → 역할 확인 → 종료까지 진행"""
+
+    def __init__(self, runner, index, player_count):
+        self.runner = runner
+        self.index = index
+        self.player_count = player_count
+        self.session_id = None
+        self.host_joined = threading.Event()  # 먼저 참가한 플레이어가 호스트가 되므로 나머지는 호스트 참가 후 입장
+        self.all_joined = threading.Event()
+        self.joined = 0
+        self.joined_lock = threading.Lock()
+        self.all_joined_at = None
+        self.started_at = None
+        self.ended = False
+        # 호스트는 모두 역할을 확인한 뒤에 종료 (폴링이 늦은 플레이어가 시작과 종료를 한 번에 보고 역할을 건너뛰지 않도록)
+        self.roles_seen = 0
+        self.all_roles_seen = threading.Event()
+
+    def player_joined(self):
+        with self.joined_lock:
+            self.joined += 1
+            if self.joined == self.player_count:
+                self.all_joined_at = time.monotonic()
+                self.all_joined.set()
+
+    def role_seen(self):
+        with self.joined_lock:
+            self.roles_seen += 1
+            if self.roles_seen == self.player_count:
+                self.all_roles_seen.set()
+
+    def play(self, seat):
+        runner = self.runner
+        agent = runner.new_agent()
+        try:
+            if seat == 0:
+                runner.call(agent, 'GET', 'home')
+                status, headers, _ = runner.call(agent, 'POST', 'home', data={'enable_dummy': 'false'})
+                if status != 302:
+                    raise RuntimeError(f'세션 생성 실패 (HTTP {status})')
+                self.session_id = resolve(urlsplit(headers['Location']).path).kwargs['session_id']
+            elif not self.host_joined.wait(runner.timeout) or self.session_id is None:
+                return
+
+            runner.call(agent, 'GET', 'join', self.session_id)
+            status, _, _ = runner.call(agent, 'POST', 'join', self.session_id,
+                                       data={'nickname': f'player_{seat}', 'pin': '1234'})
+            if status != 302:
+                raise RuntimeError(f'참가 실패 (HTTP {status})')
+            if seat == 0:
+                self.host_joined.set()
+            runner.call(agent, 'GET', 'lobby', self.session_id)
+            self.player_joined()
+            self.poll(agent, host=seat == 0)
+        except Exception as e:
+            runner.failures.append(f'session {self.index} seat {seat}: {e}')
+            self.host_joined.set()
+        finally:
+            if hasattr(agent, 'close'):
+                agent.close()
+            connections.close_all()
+
+    def poll(self, agent, host):
+        """실제 로비처럼 poll_interval마다 get_state (ETag 포함), 상태 변화에 따라 role/ended 요청"""
+        runner = self.runner
+        etag = None
+        is_started = role_seen = False
+        deadline = time.monotonic() + runner.timeout
+        next_tick = time.monotonic()
+        while time.monotonic() < deadline:
+            headers = {'If-None-Match': etag} if etag else None
+            status, response_headers, content = runner.call(agent, 'GET', 'get_state', self.session_id, headers=headers)
+            if status == 200:
+                state = json.loads(content)
+                etag = response_headers.get('ETag')
+                is_started = state['is_started']
+                if not state['is_active']:
+                    runner.call(agent, 'GET', 'ended', self.session_id)
+                    return
+            elif status != 304:
+                raise RuntimeError(f'get_state HTTP {status}')
+
+            if is_started and not role_seen:
+                runner.call(agent, 'GET', 'role', self.session_id)
+                role_seen = True
+                self.role_seen()
+
+            now = time.monotonic()
+            if host and self.started_at is None and self.all_joined.is_set() \
+                    and now >= self.all_joined_at + runner.lobby_seconds:
+                status, _, _ = runner.call(agent, 'POST', 'start_game', self.session_id, data={
+                    'active_roles': json.dumps([['assassin'], ['morgana']]),
+                    'enable_percival': 'true',
+                })
+                if status != 302:
+                    raise RuntimeError(f'start_game HTTP {status}')
+                self.started_at = now
+            elif host and self.started_at is not None and not self.ended \
+                    and self.all_roles_seen.is_set() and now >= self.started_at + runner.role_seconds:
+                status, _, _ = runner.call(agent, 'POST', 'end_game', self.session_id)
+                if status >= 400:
+                    raise RuntimeError(f'end_game HTTP {status}')
+                self.ended = True
+
+            next_tick += runner.poll_interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+        raise RuntimeError('시간 초과')
+
+
+class Command(BaseCommand):
+    help = '가상 세션/플레이어로 전체 게임 흐름 부하 테스트 (엔드포인트별 처리량, p50/p95/p99 지연, DB 쿼리 수)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=10, help='동시에 진행할 세션 수')
+        parser.add_argument('--players', type=int, nargs=2, default=[5, 10], metavar=('MIN', 'MAX'),
+                            help='세션당 플레이어 수 범위 (5~10)')
+        parser.add_argument('--target', default='client',
+                            help="'client'(Django 테스트 클라이언트, 임시 DB) 또는 서버 주소 (예: http://127.0.0.1:8000)")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='get_state 폴링 간격 (초, 로비와 같게 1초)')
+        parser.add_argument('--lobby-seconds', type=float, default=10.0, help='모두 참가한 뒤 호스트가 시작하기까지 (초)')
+        parser.add_argument('--role-seconds', type=float, default=10.0, help='시작 후 호스트가 종료하기까지 (초)')
+        parser.add_argument('--ramp-seconds', type=float, default=5.0, help='세션 시작 시점을 이 시간에 걸쳐 분산')
+        parser.add_argument('--timeout', type=float, default=300.0, help='플레이어 하나가 흐름을 끝내야 하는 시간 (초)')
+        parser.add_argument('--metrics-token', default='', help='서버 /metrics의 Bearer 토큰 (AVALON_METRICS_TOKEN)')
+        parser.add_argument('--current-db', action='store_true',
+                            help="client 대상일 때 임시 DB 대신 설정된 DB 사용")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--json', help='결과를 JSON으로 저장할 경로')
+
+    def handle(self, *args, **options):
+        low, high = options['players']
+        if not 5 <= low <= high <= 10:
+            raise CommandError('--players는 5 이상 10 이하 범위여야 합니다.')
+        if options['sessions'] <= 0 or options['poll_interval'] <= 0:
+            raise CommandError('--sessions와 --poll-interval은 0보다 커야 합니다.')
+
+        self.target = options['target']
+        self.poll_interval = options['poll_interval']
+        self.lobby_seconds = options['lobby_seconds']
+        self.role_seconds = options['role_seconds']
+        self.timeout = options['timeout']
+        self.metrics_token = options['metrics_token']
+        self.results = []  # (엔드포인트, 초, HTTP 상태) - list.append는 스레드 안전
+        self.failures = []
+
+        rng = random.Random(options['seed'])
+        player_counts = [rng.randint(low, high) for _ in range(options['sessions'])]
+
+        if self.target == 'client':
+            # 테스트 클라이언트의 Host(testserver) 허용, 쿼리 수는 metrics 미들웨어로 셈
+            with override_settings(AVALON_METRICS_ENABLED=True, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                if options['current_db']:
+                    report = self.run_sessions(player_counts, options['ramp_seconds'])
+                else:
+                    with tempfile.TemporaryDirectory(prefix='avalon-loadtest-') as tmpdir:
+                        test_settings = connections['default'].settings_dict.setdefault('TEST', {})
+                        if connections['default'].vendor == 'sqlite' and not test_settings.get('NAME'):
+                            # 여러 스레드가 같은 DB를 쓰도록 메모리 DB 대신 파일
+                            test_settings['NAME'] = f'{tmpdir}/loadtest.sqlite3'
+                        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+                        try:
+                            report = self.run_sessions(player_counts, options['ramp_seconds'])
+                        finally:
+                            teardown_databases(old_config, verbosity=0)
+        elif self.target.startswith(('http://', 'https://')):
+            report = self.run_sessions(player_counts, options['ramp_seconds'])
+        else:
+            raise CommandError("--target은 'client' 또는 http(s):// 주소여야 합니다.")
+
+        self.print_report(report)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    def new_agent(self):
+        return ClientAgent() if self.target == 'client' else HttpAgent(self.target)
+
+    def call(self, agent, method, name, session_id=None, data=None, headers=None):
+        path = reverse(name, args=[session_id] if session_id else [])
+        started = time.perf_counter()
+        status, response_headers, content = agent.request(method, path, data=data, headers=headers)
+        self.results.append((name, time.perf_counter() - started, status))
+        return status, response_headers, content
+
+    def query_totals(self):
+        """뷰별 누적 DB 쿼리 수 - client는 이 프로세스의 metrics, 서버는 /metrics (없으면 None)"""
+        if self.target == 'client':
+            return {view: values[REQUEST_OFFSET + QUERIES] for view, values in collect().items()}
+        headers = {'Authorization': f'Bearer {self.metrics_token}'} if self.metrics_token else None
+        agent = HttpAgent(self.target)
+        try:
+            status, _, content = agent.request('GET', '/metrics', headers=headers)
+        except OSError:
+            return None
+        finally:
+            agent.close()
+        if status != 200:
+            return None
+        totals = {}
+        prefix = 'avalon_request_db_queries_total{view="'
+        for line in content.decode().splitlines():
+            if line.startswith(prefix):
+                labels, value = line.rsplit(' ', 1)
+                totals[labels[len(prefix):-2]] = float(value)
+        return totals
+
+    def run_sessions(self, player_counts, ramp_seconds):
+        before = self.query_totals()
+        sessions = [SyntheticSession(self, i, count) for i, count in enumerate(player_counts)]
+        threads = []
+        started = time.perf_counter()
+        for session in sessions:
+            for seat in range(session.player_count):
+                thread = threading.Thread(target=session.play, args=(seat,), daemon=True)
+                threads.append(thread)
+                thread.start()
+            if len(sessions) > 1:
+                time.sleep(ramp_seconds / (len(sessions) - 1))
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        after = self.query_totals()
+
+        by_endpoint = {}
+        for name, seconds, status in self.results:
+            by_endpoint.setdefault(name, []).append((seconds, status))
+
+        endpoints = {}
+        for name, samples in sorted(by_endpoint.items()):
+            latencies = sorted(seconds for seconds, _ in samples)
+            endpoints[name] = {
+                'requests': len(samples),
+                'throughput': len(samples) / elapsed,
+                'errors': sum(1 for _, status in samples if status >= 400),
+                'p50_ms': percentile(latencies, 50) * 1e3,
+                'p95_ms': percentile(latencies, 95) * 1e3,
+                'p99_ms': percentile(latencies, 99) * 1e3,
+                'db_queries': None if before is None or after is None else after.get(name, 0) - before.get(name, 0),
+            }
+        return {
+            'target': self.target,
+            'sessions': len(sessions),
+            'players': sum(player_counts),
+            'seconds': elapsed,
+            'requests': len(self.results),
+            'failures': self.failures,
+            'endpoints': endpoints,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['target']}: {report['sessions']}개 세션, {report['players']}명, "
+            f"{report['requests']:,}요청, {report['seconds']:.1f}초 ({report['requests'] / report['seconds']:,.1f} req/s)"
+        )
+        self.stdout.write(f"{'endpoint':<12} {'requests':>8} {'req/s':>8} {'errors':>6} "
+                          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'q/req':>6}")
+        for name, row in report['endpoints'].items():
+            queries = row['db_queries']
+            query_text = f"{queries:>8.0f} {queries / row['requests']:>6.2f}" if queries is not None else f"{'-':>8} {'-':>6}"
+            self.stdout.write(
+                f"{name:<12} {row['requests']:>8} {row['throughput']:>8.1f} {row['errors']:>6} "
+                f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {query_text}"
+            )
+        if all(row['db_queries'] is None for row in report['endpoints'].values()):
+            self.stdout.write('DB 쿼리 수: 서버를 AVALON_METRICS_ENABLED=True로 실행하면 /metrics에서 읽어옵니다.')
+        for failure in report['failures']:
+            self.stdout.write(self.style.ERROR(failure))
+        if report['failures']:
+            raise CommandError(f"{len(report['failures'])}명의 플레이어가 흐름을 끝내지 못했습니다.")
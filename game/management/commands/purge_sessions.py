@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game.retention import purge_sessions
+
+
+class Command(BaseCommand):
+    help = '보존 기간이 지난 세션 삭제 (종료된 세션과 그 보관본, 방치된 로비) - 묶음 단위, 플레이어는 함께 삭제'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ended-max-age', type=int, default=settings.AVALON_ENDED_SESSION_MAX_AGE,
+                            help='종료된 세션 보존 기간 (초, 0이면 정리 안 함)')
+        parser.add_argument('--stale-max-age', type=int, default=settings.AVALON_STALE_SESSION_MAX_AGE,
+                            help='종료되지 않은 세션 보존 기간 (초, 0이면 정리 안 함)')
+        parser.add_argument('--batch-size', type=int, default=settings.AVALON_PURGE_BATCH_SIZE,
+                            help='트랜잭션 하나에 지울 세션 수')
+        parser.add_argument('--pause', type=float, default=0, help='묶음 사이 대기 (초, 운영 중 부하 분산)')
+        parser.add_argument('--dry-run', action='store_true', help='지우지 않고 대상 수만 출력')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size는 1 이상이어야 합니다.')
+        if options['ended_max_age'] < 0 or options['stale_max_age'] < 0:
+            raise CommandError('보존 기간은 0 이상이어야 합니다.')
+
+        stats = purge_sessions(
+            ended_max_age=options['ended_max_age'],
+            stale_max_age=options['stale_max_age'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+        )
+        size = f", {stats['bytes'] / 1024:,.1f} KiB" if stats['bytes'] is not None else ''
+        if options['dry_run']:
+            self.stdout.write(f"삭제 대상: 세션 {stats['sessions']:,}개, 플레이어 {stats['players']:,}명, "
+                              f"보관본 {stats['archived']:,}개")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"삭제: 세션 {stats['sessions']:,}개, 플레이어 {stats['players']:,}명, 보관본 {stats['archived']:,}개 "
+                f"({stats['batches']}묶음{size} 회수)"
+            ))
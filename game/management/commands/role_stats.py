@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ftn.catalog import get_role_catalog
+from game.stats import role_stats
+
+
+class Command(BaseCommand):
+    help = '역할 배정 통계 출력 - 인원수별 세션 수, 더미 사용, 역할/겸직/역할 구성별 배정 횟수 (카운터 테이블만 읽음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='{인원수: {키: 횟수}} JSON으로 출력')
+
+    def handle(self, *args, **options):
+        stats = role_stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats, ensure_ascii=False, indent=2))
+            return
+        if not stats:
+            self.stdout.write('통계가 없습니다. (이전 기록은 manage.py backfill_role_stats)')
+            return
+
+        catalog = get_role_catalog()
+        for player_count, counts in stats.items():
+            sessions = counts.get('sessions', 0)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{player_count}인: 세션 {sessions:,}개, 더미 사용 {counts.get('dummy_sessions', 0):,}개 "
+                f"(더미 {counts.get('dummies', 0):,}명)"
+            ))
+            for prefix, label in (('role:', '역할'), ('combo:', '겸직'), ('lineup:', '구성')):
+                rows = sorted(((count, key[len(prefix):]) for key, count in counts.items() if key.startswith(prefix)),
+                              reverse=True)
+                for count, name in rows:
+                    names = ' + '.join(catalog.name(role) for role in name.split('+') if role) or '-'
+                    self.stdout.write(f"  {label} {names:<40} {count:>8,}  ({count / sessions:.2f}/세션)")
@@ -0,0 +1,143 @@
+import os
+import json
+import math
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ftn.catalog import get_role_catalog
+from ftn.roles import RolePlayer, assign_by_role_packages, build_role_packages, deal_many, role_group_configs
+
+
+def chi_square(observed, expected):
+    """카이제곱 통계량과 p-value (Wilson-Hilferty 근사)"""
+    stat = sum((o - expected) ** 2 / expected for o in observed)
+    dof = len(observed) - 1
+    if dof <= 0:
+        return stat, 1.0
+    z = ((stat / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return stat, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def simulate_chunk(role_packages, deals, engine):
+    """워커 프로세스: deals판 분배 후 좌석별 패키지 빈도 반환"""
+    width = len(role_packages)
+    counts = [[0] * width for _ in range(width)]
+
+    if engine == 'batch':
+        result = deal_many(role_packages, deals)
+        for seat in range(width):
+            for index, count in Counter(result.column(seat)).items():
+                counts[seat][index] = count
+    else:
+        players = [RolePlayer(f'seat_{i}') for i in range(width)]
+        for _ in range(deals):
+            packages = list(role_packages)
+            index_of = {id(pkg): i for i, pkg in enumerate(packages)}
+            assign_by_role_packages(players, packages)
+            for seat, player in enumerate(players):
+                counts[seat][index_of[id(player.roles)]] += 1
+
+    return counts
+
+
+class Command(BaseCommand):
+    help = '역할 분배 공정성 몬테카를로 시뮬레이션 (좌석별/역할별 빈도, 카이제곱 균등성 검정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deals', type=int, default=100000, help='구성마다 분배할 판 수')
+        parser.add_argument('--players', type=int, nargs='+', default=list(range(5, 11)), help='플레이어 수 (5~10)')
+        parser.add_argument('--role-groups', help='특정 로비 역할 구성만 시뮬레이션 (JSON, 예: [["assassin","morgana"]])')
+        parser.add_argument('--engine', choices=['batch', 'single'], default='batch',
+                            help='batch: deal_many, single: assign_by_role_packages를 판마다 호출')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk', type=int, default=50000, help='워커 한 번에 맡길 판 수')
+        parser.add_argument('--alpha', type=float, default=0.001, help='균등성 기각 유의수준')
+
+    def handle(self, *args, **options):
+        catalog = get_role_catalog()
+        deals = options['deals']
+        if deals <= 0 or options['chunk'] <= 0:
+            raise CommandError('--deals와 --chunk는 1 이상이어야 합니다.')
+
+        if options['role_groups']:
+            try:
+                fixed_groups = json.loads(options['role_groups'])
+            except json.JSONDecodeError as e:
+                raise CommandError(f'--role-groups JSON 파싱 실패: {e}')
+
+        # (플레이어 수, 로비 설정, 역할 패키지) 목록
+        scenarios = []
+        for player_count in options['players']:
+            try:
+                groups_list = [fixed_groups] if options['role_groups'] else role_group_configs(player_count)
+                for role_groups in groups_list:
+                    packages = build_role_packages(role_groups, player_count, catalog)
+                    if len(packages) != player_count:
+                        raise ValueError(f'{player_count}명에 역할 조합 {len(packages)}개')
+                    scenarios.append((player_count, role_groups, packages))
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = []
+            for scenario_index, (_, _, packages) in enumerate(scenarios):
+                remaining = deals
+                while remaining > 0:
+                    size = min(options['chunk'], remaining)
+                    futures.append((scenario_index, pool.submit(simulate_chunk, packages, size, options['engine'])))
+                    remaining -= size
+
+            totals = [None] * len(scenarios)
+            for scenario_index, future in futures:
+                counts = future.result()
+                if totals[scenario_index] is None:
+                    totals[scenario_index] = counts
+                else:
+                    for row, add in zip(totals[scenario_index], counts):
+                        for i, value in enumerate(add):
+                            row[i] += value
+        elapsed = time.perf_counter() - started
+
+        rejected = 0
+        verbose = options['verbosity'] >= 2
+        for (player_count, role_groups, packages), counts in zip(scenarios, totals):
+            labels = [' + '.join(catalog.name(role) for role in pkg) for pkg in packages]
+            p_values = []
+            for seat, row in enumerate(counts):
+                _, p_value = chi_square(row, deals / len(packages))
+                p_values.append(p_value)
+
+            # 역할별 빈도: 같은 구성의 패키지(신하 여러 명 등)는 합쳐서 본다
+            role_share = Counter()
+            for row in counts:
+                for label, count in zip(labels, row):
+                    role_share[label] += count
+
+            # 좌석 수만큼 검정을 반복하므로 Bonferroni 보정
+            worst = min(1.0, min(p_values) * len(p_values))
+            if worst < options['alpha']:
+                rejected += 1
+            groups_text = ', '.join('+'.join(group) for group in role_groups)
+            self.stdout.write(f'{player_count}명 [{groups_text}] 보정 p={worst:.4f}')
+
+            if verbose:
+                total_seats = deals * len(packages)
+                for label, count in sorted(role_share.items()):
+                    self.stdout.write(f'    {label}: {count / total_seats:.4%}')
+                for seat, (row, p_value) in enumerate(zip(counts, p_values)):
+                    share = ' '.join(f'{count / deals:.3f}' for count in row)
+                    self.stdout.write(f'    seat {seat}: {share}  p={p_value:.4f}')
+
+        total_deals = deals * len(scenarios)
+        self.stdout.write(
+            f'{len(scenarios)}개 구성, {total_deals:,}판, {elapsed:.2f}초 '
+            f'({total_deals / elapsed:,.0f} deals/s, workers={options["workers"]}, engine={options["engine"]})'
+        )
+        if rejected:
+            self.stdout.write(self.style.WARNING(f'유의수준 {options["alpha"]}에서 균등성 기각: {rejected}개 구성'))
+        else:
+            self.stdout.write(self.style.SUCCESS('모든 구성에서 좌석별 분배가 균등합니다.'))
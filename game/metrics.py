@@ -0,0 +1,252 @@
+# game/metrics.py
+"""뷰별 지연 히스토그램, DB 쿼리 수/시간, PIN 해시/템플릿 렌더 시간 수집 (Prometheus 텍스트로 노출)
+
+요청 하나의 값은 contextvar에 담긴 리스트에 더하고(sync_to_async로 넘어간 스레드에서도 같은 리스트),
+요청이 끝나면 스레드별 집계에 더한다. 잠금은 스레드가 처음 기록할 때와 /metrics로 내보낼 때만 잡는다.
+"""
+import bisect
+import threading
+import contextvars
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+# 지연 히스토그램 구간 상한 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 요청별 값 [쿼리 수, DB 시간, PIN 해시 시간, 템플릿 시간]
+QUERIES, DB_SECONDS, PASSWORD_SECONDS, TEMPLATE_SECONDS = range(4)
+TIMED_KINDS = {'db': DB_SECONDS, 'password': PASSWORD_SECONDS, 'template': TEMPLATE_SECONDS}
+
+# 뷰별 집계 [요청 수, 시간 합, 쿼리 수, DB 시간, PIN 해시 시간, 템플릿 시간, 구간별 요청 수...]
+COUNT, SECONDS = 0, 1
+REQUEST_OFFSET = 2
+BUCKET_OFFSET = REQUEST_OFFSET + 4
+
+_request_stats = contextvars.ContextVar('avalon_request_stats', default=None)
+
+_local = threading.local()
+_registry = []  # (스레드, 뷰별 집계 dict)
+_retired = {}  # 끝난 스레드의 집계를 합친 것
+_registry_lock = threading.Lock()
+
+
+def _thread_views():
+    try:
+        return _local.views
+    except AttributeError:
+        views = _local.views = {}
+        with _registry_lock:
+            _registry.append((threading.current_thread(), views))
+        return views
+
+
+def _merge(target, views):
+    for view, values in list(views.items()):
+        total = target.get(view)
+        if total is None:
+            target[view] = list(values)
+        else:
+            for i, value in enumerate(values):
+                total[i] += value
+
+
+def record(view, seconds, stats):
+    """요청 하나를 이 스레드의 집계에 더함"""
+    views = _thread_views()
+    values = views.get(view)
+    if values is None:
+        values = views[view] = [0] * (BUCKET_OFFSET + len(BUCKETS) + 1)
+    values[COUNT] += 1
+    values[SECONDS] += seconds
+    for i, value in enumerate(stats):
+        values[REQUEST_OFFSET + i] += value
+    values[BUCKET_OFFSET + bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+def collect():
+    """모든 스레드의 집계를 합친 뷰별 값 (끝난 스레드의 집계는 이때 정리)"""
+    with _registry_lock:
+        alive = []
+        for thread, views in _registry:
+            if thread.is_alive():
+                alive.append((thread, views))
+            else:
+                _merge(_retired, views)
+        _registry[:] = alive
+        merged = {view: list(values) for view, values in _retired.items()}
+        for _, views in alive:
+            _merge(merged, views)
+    return merged
+
+
+def reset_metrics():
+    with _registry_lock:
+        for _, views in _registry:
+            views.clear()
+        _retired.clear()
+
+
+class timed:
+    """진행 중인 요청이 있으면 블록 실행 시간을 kind('db', 'password', 'template')에 더함"""
+
+    __slots__ = ('index', 'stats', 'started')
+
+    def __init__(self, kind):
+        self.index = TIMED_KINDS[kind]
+
+    def __enter__(self):
+        self.stats = _request_stats.get()
+        if self.stats is not None:
+            self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.stats is not None:
+            self.stats[self.index] += perf_counter() - self.started
+
+
+def check_password(password, encoded):
+    with timed('password'):
+        return hashers.check_password(password, encoded)
+
+
+def make_password(password):
+    with timed('password'):
+        return hashers.make_password(password)
+
+
+def count_query(execute, sql, params, many, context):
+    """DB execute_wrapper - 요청 안에서 실행된 쿼리 수와 시간"""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[QUERIES] += 1
+        stats[DB_SECONDS] += perf_counter() - started
+
+
+def install_query_counter(sender, connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+connection_created.connect(install_query_counter)
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """렌더 시간을 재는 DjangoTemplates (settings.TEMPLATES의 BACKEND)"""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+def view_label(request):
+    match = request.resolver_match
+    return match.view_name if match is not None else 'unresolved'
+
+
+class MetricsMiddleware:
+    """요청마다 뷰 이름별로 지연/쿼리/해시/템플릿 시간 기록 (AVALON_METRICS_ENABLED일 때만 사용)
+
+    스트리밍 응답(SSE)은 응답 객체를 돌려줄 때까지만 잰다.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.AVALON_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = [0, 0.0, 0.0, 0.0]
+        token = _request_stats.set(stats)
+        started = perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            record(view_label(request), perf_counter() - started, stats)
+            _request_stats.reset(token)
+
+    async def __acall__(self, request):
+        stats = [0, 0.0, 0.0, 0.0]
+        token = _request_stats.set(stats)
+        started = perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            record(view_label(request), perf_counter() - started, stats)
+            _request_stats.reset(token)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def export():
+    """Prometheus 텍스트 형식 (이 프로세스의 값)"""
+    from .snapshot import snapshot_metrics
+
+    views = sorted(collect().items())
+    lines = [
+        '# HELP avalon_request_duration_seconds Request latency by view.',
+        '# TYPE avalon_request_duration_seconds histogram',
+    ]
+    for view, values in views:
+        label = f'view="{_escape(view)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), values[BUCKET_OFFSET:]):
+            cumulative += count
+            lines.append(f'avalon_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'avalon_request_duration_seconds_sum{{{label}}} {values[SECONDS]}')
+        lines.append(f'avalon_request_duration_seconds_count{{{label}}} {values[COUNT]}')
+
+    counters = (
+        ('avalon_request_db_queries_total', 'DB queries executed by view.', QUERIES),
+        ('avalon_request_db_seconds_total', 'Time spent in DB queries by view.', DB_SECONDS),
+        ('avalon_request_password_seconds_total', 'Time spent hashing or checking PINs by view.', PASSWORD_SECONDS),
+        ('avalon_request_template_seconds_total', 'Time spent rendering templates by view.', TEMPLATE_SECONDS),
+    )
+    for name, help_text, index in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for view, values in views:
+            lines.append(f'{name}{{view="{_escape(view)}"}} {values[REQUEST_OFFSET + index]}')
+
+    snapshot = snapshot_metrics()
+    lines += [
+        '# HELP avalon_snapshot_lookups_total Session snapshot cache lookups.',
+        '# TYPE avalon_snapshot_lookups_total counter',
+        f'avalon_snapshot_lookups_total{{result="hit"}} {snapshot["hits"]}',
+        f'avalon_snapshot_lookups_total{{result="miss"}} {snapshot["misses"]}',
+        '# HELP avalon_snapshot_invalidations_total Session snapshot invalidations.',
+        '# TYPE avalon_snapshot_invalidations_total counter',
+        f'avalon_snapshot_invalidations_total {snapshot["invalidations"]}',
+    ]
+    return '\n'.join(lines) + '\n'
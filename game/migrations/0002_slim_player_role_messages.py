@@ -0,0 +1,15 @@
+# Generated by Django 5.2.1 on 2026-10-16 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # 기존 행의 role_messages/role_images는 그대로 둠 - 저장된 메시지가 있으면 읽을 때 그대로 쓰고
+    # (GameSession.attach_role_messages), 비어 있는 행만 역할 배정에서 다시 만든다.
+    # 지우면 되돌릴 수 없고, 지난 세션의 이미지가 image_seed 기준으로 바뀌어 보인다.
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = []
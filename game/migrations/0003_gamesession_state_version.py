@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_slim_player_role_messages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='state_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
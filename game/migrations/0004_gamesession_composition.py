@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_gamesession_state_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='composition',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
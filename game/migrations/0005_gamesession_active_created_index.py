@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_gamesession_composition'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamesession',
+            index=models.Index(fields=['is_active', 'created_at'], name='game_session_active_created'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:52
+
+from django.db import migrations, models
+
+from ftn.catalog import get_role_catalog
+
+BATCH_SIZE = 1000
+
+
+def encode_roles(apps, schema_editor):
+    # 역할 이름 목록 -> 카탈로그 비트마스크, 진영 이름 -> 코드
+    Player = apps.get_model('game', 'Player')
+    catalog = get_role_catalog()
+    batch = []
+    for player in Player.objects.only('pk', 'roles', 'faction').iterator(chunk_size=BATCH_SIZE):
+        player.role_mask = catalog.mask_of(player.roles or [])
+        player.faction_code = catalog.faction_code(player.faction)
+        batch.append(player)
+        if len(batch) >= BATCH_SIZE:
+            Player.objects.bulk_update(batch, ['role_mask', 'faction_code'])
+            batch = []
+    Player.objects.bulk_update(batch, ['role_mask', 'faction_code'])
+
+
+def decode_roles(apps, schema_editor):
+    Player = apps.get_model('game', 'Player')
+    catalog = get_role_catalog()
+    batch = []
+    for player in Player.objects.only('pk', 'role_mask', 'faction_code').iterator(chunk_size=BATCH_SIZE):
+        player.roles = catalog.roles_for_mask(player.role_mask)
+        player.faction = catalog.faction_name(player.faction_code)
+        batch.append(player)
+        if len(batch) >= BATCH_SIZE:
+            Player.objects.bulk_update(batch, ['roles', 'faction'])
+            batch = []
+    Player.objects.bulk_update(batch, ['roles', 'faction'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_gamesession_active_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='role_mask',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='faction_code',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(encode_roles, decode_roles),
+        migrations.RemoveField(
+            model_name='player',
+            name='roles',
+        ),
+        migrations.RemoveField(
+            model_name='player',
+            name='faction',
+        ),
+    ]
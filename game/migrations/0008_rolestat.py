@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-17 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0007_archivedsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_count', models.PositiveSmallIntegerField()),
+                ('key', models.CharField(max_length=200)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('player_count', 'key'), name='game_rolestat_count_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-17 00:40
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def trailing_dummy_count(nicknames):
+    # game.archive.legacy_dummy_flags와 같은 규칙 (마이그레이션은 앱 코드가 바뀌어도 그대로 두려고 복사)
+    # 더미는 5명을 채울 때만 dummy_0부터 차례로 만들어져 pk 순 맨 뒤에 붙음
+    if len(nicknames) != 5:
+        return 0
+    for count in range(len(nicknames) - 1, 0, -1):
+        if nicknames[-count:] == [f'dummy_{i}' for i in range(count)]:
+            return count
+    return 0
+
+
+def mark_dummies(apps, schema_editor):
+    Player = apps.get_model('game', 'Player')
+    # 더미만 사용 불가 비밀번호(make_password(None))를 받음 - 참가한 플레이어는 PIN 해시가 있음
+    Player.objects.filter(pin__startswith=UNUSABLE_PASSWORD_PREFIX).update(is_dummy=True)
+
+    # 그 전의 더미는 make_password(str(i))로 만들어져 해시로는 구분이 안 됨 -> 더미를 켠 시작된 세션의 맨 뒤 좌석 모양으로
+    dummy_pks = []
+
+    def add(seats):
+        count = trailing_dummy_count([nickname for _, nickname in seats])
+        if count:
+            dummy_pks.extend(pk for pk, _ in seats[-count:])
+
+    current, seats = None, []
+    rows = Player.objects.filter(
+        game_session__enable_dummy=True, game_session__is_started=True,
+    ).order_by('game_session_id', 'pk').values_list('game_session_id', 'pk', 'nickname')
+    for session_id, pk, nickname in rows.iterator(chunk_size=BATCH_SIZE):
+        if session_id != current:
+            add(seats)
+            current, seats = session_id, []
+        seats.append((pk, nickname))
+    add(seats)
+    for start in range(0, len(dummy_pks), BATCH_SIZE):
+        Player.objects.filter(pk__in=dummy_pks[start:start + BATCH_SIZE]).update(is_dummy=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_rolestat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='is_dummy',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_dummies, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,33 @@
 # game/models.py
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.safestring import mark_safe
-from django.contrib.auth.hashers import make_password
 import uuid
-import json
-import os
 
-from ftn.roles import RolePlayer, assign_by_role_packages, num_of_evil_roles
+from ftn.catalog import RoleCatalog, get_role_catalog
+from ftn.roles import RolePlayer, assign_by_role_packages, build_role_packages, composition_summary
 from ftn.players import generate_player_messages
 
+from . import events
+from .metrics import make_password
+
+# 읽을 때 만든 역할 메시지 캐시 (세션별)
+ROLE_MESSAGES_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 로비 폴링용 상태 버전 캐시 (쓰기 때마다 갱신, 만료는 안전장치)
+STATE_CACHE_TIMEOUT = 60
+
+
+def state_version_cache_key(session_id):
+    return f'avalon:state_version:{session_id}'
+
+
+def ended_cache_key(session_id):
+    """종료 화면의 역할 공개 캐시 (game.views) - 지우면 그 세션의 시청자별 페이지 캐시도 무효"""
+    return f'avalon:ended:{session_id}'
+
 
 class GameSession(models.Model):
     session_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -18,89 +37,169 @@ class GameSession(models.Model):
     role_groups = models.JSONField()
     is_active = models.BooleanField(default=True)
     is_started = models.BooleanField(default=False)
+    # 참가/추방/시작/종료 때마다 증가 - get_state의 ETag
+    state_version = models.PositiveIntegerField(default=0)
+    # 분배 때 한 번 계산하는 역할 구성 요약 (ftn.roles.composition_summary)
+    composition = models.JSONField(default=dict, blank=True)
 
     def distribute_roles(self):
-        player_list = [player.nickname for player in self.players.all()]
-
-        # 더미 플레이어 추가
-        if self.enable_dummy and len(player_list) < 5:
-            dummies = [f'dummy_{i}' for i in range(5 - len(player_list))]
-            player_list += dummies
-            
-            for i, dummy in enumerate(dummies):
-                Player.objects.create(
-                    game_session=self,
-                    nickname=dummy,
-                    pin=make_password(str(i))
-                )
-
-        # 역할 데이터 로드
-        from django.conf import settings
-        
-        possible_paths = [
-            os.path.join(os.path.dirname(__file__), '..', 'ftn', 'role_messages.json'),
-            os.path.join(settings.BASE_DIR, 'ftn', 'role_messages.json'),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ftn', 'role_messages.json'),
-        ]
-        
-        role_data = None
-        for path in possible_paths:
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        role_data = json.load(f)
-                        break
-            except Exception as e:
-                continue
-        
-        if role_data is None:
-            raise FileNotFoundError(f"role_messages.json을 찾을 수 없습니다. 시도한 경로들: {possible_paths}")
-        
-        good_roles = {name for name, info in role_data.items() if info['faction'] == 'good'}
-        evil_roles = {name for name, info in role_data.items() if info['faction'] == 'evil'}
-        
-        # 기본 역할 패키지 구성
-        good_packages = [['merlin']]
-        evil_packages = []
-        
-        for pkg in self.role_groups:
-            is_good = any(role in good_roles for role in pkg)
-            is_evil = any(role in evil_roles for role in pkg)
-            
-            if is_good and not is_evil:
-                good_packages.append(pkg)
-            elif is_evil and not is_good:
-                evil_packages.append(pkg)
-        
-        # 역할 부족분 자동 채우기
-        required_evil = num_of_evil_roles(len(player_list))
-        required_good = len(player_list) - required_evil
-        
-        if not evil_packages:
-            evil_packages.append(['assassin'])
-        
-        while len(evil_packages) < required_evil:
-            evil_packages.append(['minion_of_mordred'])
-        
-        while len(good_packages) < required_good:
-            good_packages.append(['loyal_servant'])
-
-        # 역할 분배 및 저장
-        role_packages = good_packages + evil_packages
-        role_players = [RolePlayer(p) for p in player_list]
-        assigned_players = assign_by_role_packages(role_players, role_packages)
-        messages = generate_player_messages(assigned_players)
-        
-        for player_name, info in messages.items():
-            try:
-                player = Player.objects.get(game_session=self, nickname=player_name)
+        """역할 분배 - 조회 1회 + 일괄 생성/수정 + 구성 요약 저장, 한 트랜잭션 (플레이어 수와 무관한 쿼리 수)"""
+        # start() 안에서 부르면 바깥 트랜잭션에 합류 (부분 롤백할 일이 없으므로 savepoint 생략)
+        with transaction.atomic(savepoint=False):
+            players = list(self.players.order_by('pk'))
+
+            # 더미 플레이어 추가 (로그인하지 않으므로 해시 없는 사용 불가 비밀번호)
+            dummies = []
+            if self.enable_dummy and len(players) < 5:
+                dummies = [
+                    Player(game_session=self, nickname=f'dummy_{i}', pin=make_password(None), is_dummy=True)
+                    for i in range(5 - len(players))
+                ]
+            seated = players + dummies
+
+            # 역할 패키지 구성 및 분배
+            catalog = get_role_catalog()
+            role_packages = build_role_packages(self.role_groups, len(seated), catalog)
+            role_players = [RolePlayer(player.nickname) for player in seated]
+            assigned_players = assign_by_role_packages(role_players, role_packages)
+            for role_player in assigned_players:
+                # 저장 후 다시 읽을 때와 같은 순서(비트 순)로 메시지/구성 요약 생성
+                role_player.roles = catalog.roles_for_mask(catalog.mask_of(role_player.roles))
+            messages = generate_player_messages(assigned_players, self.image_seed)
+
+            # 저장 (기본은 역할만 저장, 메시지/이미지는 읽을 때 생성)
+            store_messages = settings.AVALON_STORE_ROLE_MESSAGES
+            for player in seated:
+                info = messages[player.nickname]
                 player.roles = info['roles']
-                player.role_messages = info['messages']
-                player.role_images = info['images']
+                player.role_messages = info['messages'] if store_messages else []
+                player.role_images = info['images'] if store_messages else []
                 player.faction = info['faction']
-                player.save()
-            except Player.DoesNotExist:
-                pass
+
+            # 역할 화면/종료 화면이 요청마다 다시 계산하지 않도록 구성 요약 저장
+            self.composition = composition_summary(
+                [(player.nickname, player.roles, player.faction) for player in seated], catalog)
+
+            Player.objects.bulk_create(dummies)
+            Player.objects.bulk_update(players, ['role_mask', 'role_messages', 'role_images', 'faction_code'])
+            GameSession.objects.filter(pk=self.pk).update(composition=self.composition)
+
+            # 배정 통계 누적 (같은 트랜잭션 - 분배가 롤백되면 통계도 같이)
+            from .stats import record_deal
+            record_deal(len(seated), [(player.role_mask, player.is_dummy) for player in seated])
+
+        cache.delete(self.role_messages_cache_key)
+        self.invalidate_snapshot()
+
+    def start(self, role_groups):
+        """게임 시작 - 역할 분배 + 시작 표시 + 상태 버전 증가를 한 트랜잭션으로. 이미 시작된 세션이면 아무것도 안 함
+
+        동시에 온 시작 요청(더블 클릭, 탭 두 개) 중 하나만 분배한다. 이 요청이 시작했으면 True.
+        """
+        with transaction.atomic():
+            sessions = GameSession.objects.filter(pk=self.pk)
+            if connection.features.has_select_for_update:
+                # 행 잠금 - 뒤에 온 요청은 먼저 온 요청이 커밋할 때까지 기다렸다가 is_started=True를 봄
+                list(sessions.select_for_update().values_list('pk', flat=True))
+            # SQLite는 행 잠금이 없지만 조건부 UPDATE가 DB 쓰기 잠금을 잡으므로 뒤에 온 요청은 0행이 됨
+            if not sessions.filter(is_started=False).update(is_started=True, role_groups=role_groups):
+                self.is_started = True
+                return False
+            self.role_groups = role_groups
+            self.is_started = True
+            self.distribute_roles()
+            self.bump_state('started')
+        return True
+
+    def invalidate_snapshot(self):
+        """쓰기 경로에서 호출 - 캐시된 세션 스냅샷(game.snapshot) 무효화"""
+        from .snapshot import invalidate_snapshot
+        invalidate_snapshot(self.pk)
+
+    def bump_state(self, event='state'):
+        """상태 버전 증가 - 커밋되면 캐시에 새 버전을 기록하고 구독자에게 이벤트 발행
+
+        롤백되면 DB에 없는 버전이 캐시에 남지 않도록 캐시 기록도 커밋 뒤로 미룬다.
+        """
+        self.invalidate_snapshot()
+        GameSession.objects.filter(pk=self.pk).update(state_version=F('state_version') + 1)
+        self.refresh_from_db(fields=['state_version'])
+        session_id, version = self.pk, self.state_version
+
+        def committed():
+            cache.set(state_version_cache_key(session_id), version, STATE_CACHE_TIMEOUT)
+            events.publish(session_id, {'type': event, 'version': version})
+
+        transaction.on_commit(committed)
+
+    @property
+    def image_seed(self):
+        """세션마다 일반 역할 이미지 시작 번호를 다르게 (5와 3의 최소공배수)"""
+        return self.session_id.int % 15
+
+    @property
+    def role_messages_cache_key(self):
+        return f'avalon:role_messages:{self.session_id}'
+
+    def build_role_messages(self, players):
+        """저장된 역할 배정으로 닉네임별 (메시지, 이미지) 생성 (캐시 없음)"""
+        role_players = []
+        for player in sorted(players, key=lambda p: p.pk):
+            role_player = RolePlayer(player.nickname)
+            role_player.roles = list(player.roles)
+            role_players.append(role_player)
+
+        return {
+            name: (info['messages'], info['images'])
+            for name, info in generate_player_messages(role_players, self.image_seed).items()
+        }
+
+    def derive_role_messages(self, players=None):
+        """닉네임별 (메시지, 이미지) - 세션별 캐시"""
+        derived = cache.get(self.role_messages_cache_key)
+        if derived is None:
+            if players is None:
+                players = self.players.all()
+            derived = self.build_role_messages(players)
+            cache.set(self.role_messages_cache_key, derived, ROLE_MESSAGES_CACHE_TIMEOUT)
+        return derived
+
+    async def aderive_role_messages(self, players):
+        """derive_role_messages의 async 버전"""
+        derived = await cache.aget(self.role_messages_cache_key)
+        if derived is None:
+            derived = self.build_role_messages(players)
+            await cache.aset(self.role_messages_cache_key, derived, ROLE_MESSAGES_CACHE_TIMEOUT)
+        return derived
+
+    @staticmethod
+    def _missing_role_messages(players):
+        return [player for player in players if player.roles and not player.role_messages]
+
+    def attach_role_messages(self, players, all_players=None):
+        """메시지가 저장되지 않은 플레이어에 읽을 때 만든 메시지/이미지 채우기
+
+        all_players는 세션 전체 플레이어 (이미 조회했다면 넘겨서 쿼리 절약)
+        """
+        missing = self._missing_role_messages(players)
+        if missing:
+            derived = self.derive_role_messages(all_players)
+            for player in missing:
+                player.role_messages, player.role_images = derived.get(player.nickname, ([], []))
+        return players
+
+    async def aattach_role_messages(self, players, all_players):
+        """attach_role_messages의 async 버전 (all_players 필수)"""
+        missing = self._missing_role_messages(players)
+        if missing:
+            derived = await self.aderive_role_messages(all_players)
+            for player in missing:
+                player.role_messages, player.role_images = derived.get(player.nickname, ([], []))
+        return players
+
+    class Meta:
+        # 보존 기간 정리(game.retention)가 전체 스캔 없이 종료/방치 세션을 오래된 순으로 찾도록
+        indexes = [models.Index(fields=['is_active', 'created_at'], name='game_session_active_created')]
 
     def __str__(self):
         return f"Game Session: {self.session_id}"
@@ -110,25 +209,73 @@ class Player(models.Model):
     game_session = models.ForeignKey(GameSession, on_delete=models.CASCADE, related_name='players')
     nickname = models.CharField(max_length=50)
     pin = models.CharField(max_length=128)
+    # 분배 때 채워 넣은 더미 좌석 - 닉네임(dummy_N)은 실제 플레이어도 쓸 수 있으므로 통계/보관은 이 값으로 구분
+    is_dummy = models.BooleanField(default=False)
     
-    # 역할 정보
-    roles = models.JSONField(default=list)
+    # 역할 정보 - 역할은 카탈로그 비트(role_messages.json의 "bit")의 마스크, 진영은 ftn.catalog.FACTIONS 코드
+    role_mask = models.PositiveIntegerField(default=0)
     role_messages = models.JSONField(default=list)
     role_images = models.JSONField(default=list)
-    faction = models.CharField(max_length=50, blank=True, default='unknown')
+    faction_code = models.PositiveSmallIntegerField(default=0)
+
+    @property
+    def roles(self):
+        """역할 이름 목록 (비트 순서)"""
+        return get_role_catalog().roles_for_mask(self.role_mask) if self.role_mask else []
+
+    @roles.setter
+    def roles(self, roles):
+        self.role_mask = get_role_catalog().mask_of(roles or [])
+
+    @property
+    def faction(self):
+        """진영 (good / evil / unknown)"""
+        return RoleCatalog.faction_name(self.faction_code)
+
+    @faction.setter
+    def faction(self, faction):
+        self.faction_code = RoleCatalog.faction_code(faction)
 
     @property
     def primary_role(self):
         """첫 번째 역할"""
-        return self.roles[0] if self.roles else None
+        roles = self.roles
+        return roles[0] if roles else None
     
     @property
     def has_multiple_roles(self):
         """겸직 여부"""
-        return len(self.roles) > 1 if self.roles else False
+        return bool(self.role_mask & (self.role_mask - 1))
 
     class Meta:
         unique_together = ('game_session', 'nickname')
 
     def __str__(self):
-        return f"{self.nickname} in {self.game_session.session_id}"
\ No newline at end of file
+        return f"{self.nickname} in {self.game_session.session_id}"
+
+
+class ArchivedSession(models.Model):
+    """종료된 세션의 압축 보관본 - 세션 하나가 행 하나, 만든 뒤에는 바꾸지 않음 (game.archive)"""
+    session_id = models.UUIDField(primary_key=True, editable=False)
+    # 원래 세션의 생성 시각 - 보존 기간 정리(game.retention) 기준
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # 형식 버전 1바이트 + zlib(JSON) - game.archive.pack
+    payload = models.BinaryField()
+
+    def __str__(self):
+        return f"Archived Session: {self.session_id}"
+
+
+class RoleStat(models.Model):
+    """역할 배정 통계 카운터 - (인원수, 키)마다 행 하나, 분배 때 F() 증가로 누적 (game.stats)"""
+    player_count = models.PositiveSmallIntegerField()
+    # sessions / dummy_sessions / dummies / role:<역할> / combo:<겸직 역할+...> / lineup:<세션에 나온 역할+...>
+    key = models.CharField(max_length=200)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['player_count', 'key'], name='game_rolestat_count_key')]
+
+    def __str__(self):
+        return f"{self.player_count}p {self.key}: {self.count}"
@@ -0,0 +1,157 @@
+# game/retention.py
+"""보존 기간이 지난 세션 정리 - 종료된 세션과 방치된 로비를 PK 묶음 단위로 삭제 (플레이어는 cascade)
+
+종료된 세션의 보관본(game.archive)도 같은 보존 기간으로 삭제한다.
+manage.py purge_sessions로 돌리거나, AVALON_PURGE_INTERVAL을 설정하면 서버 프로세스가 주기적으로 직접 보관/정리한다.
+"""
+import time
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .archive import archive_cache, archive_sessions
+from .models import ArchivedSession, GameSession, Player, ended_cache_key, state_version_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def expired_sessions(is_active, max_age, now):
+    """보존 기간이 지난 세션 - (is_active, created_at) 인덱스 순서대로 오래된 것부터"""
+    cutoff = now - timedelta(seconds=max_age)
+    # is_active=False는 SQL에서 NOT "is_active"가 되어 인덱스를 못 타므로 IN (...)으로 비교
+    return GameSession.objects.filter(is_active__in=[is_active], created_at__lt=cutoff).order_by('created_at')
+
+
+def used_bytes():
+    """SQLite가 쓰고 있는 페이지 바이트 (삭제로 비워진 페이지는 freelist로 빠짐), 다른 DB는 None"""
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        values = []
+        for pragma in ('page_size', 'page_count', 'freelist_count'):
+            cursor.execute(f'PRAGMA {pragma}')
+            values.append(cursor.fetchone()[0])
+    page_size, page_count, freelist_count = values
+    return page_size * (page_count - freelist_count)
+
+
+def row_bytes(pks):
+    """PostgreSQL: 삭제할 세션/플레이어 행의 크기 합 (인덱스 제외), 다른 DB는 None"""
+    if connection.vendor != 'postgresql':
+        return None
+    total = 0
+    with connection.cursor() as cursor:
+        for model, column in ((GameSession, 'session_id'), (Player, 'game_session_id')):
+            cursor.execute(
+                f'SELECT COALESCE(SUM(pg_column_size(t.*)), 0) FROM {model._meta.db_table} t WHERE {column} = ANY(%s)',
+                [list(pks)],
+            )
+            total += cursor.fetchone()[0]
+    return total
+
+
+def purge_sessions(ended_max_age=None, stale_max_age=None, batch_size=None, pause=0, dry_run=False, now=None):
+    """보존 기간이 지난 세션 삭제 - {'sessions', 'players', 'archived', 'batches', 'bytes'} 반환
+
+    max_age(초)가 0이면 그 종류는 정리하지 않는다. 묶음 하나가 트랜잭션 하나라 잠금은 짧게만 잡힌다.
+    bytes는 SQLite면 비워진 페이지, PostgreSQL이면 삭제한 행 크기, 그 외 DB는 None.
+    """
+    ended_max_age = settings.AVALON_ENDED_SESSION_MAX_AGE if ended_max_age is None else ended_max_age
+    stale_max_age = settings.AVALON_STALE_SESSION_MAX_AGE if stale_max_age is None else stale_max_age
+    batch_size = batch_size or settings.AVALON_PURGE_BATCH_SIZE
+    now = now or timezone.now()
+
+    stats = {'sessions': 0, 'players': 0, 'archived': 0, 'batches': 0, 'bytes': None}
+    before = used_bytes()
+    deleted_bytes = None
+    for is_active, max_age in ((False, ended_max_age), (True, stale_max_age)):
+        if max_age <= 0:
+            continue
+        sessions = expired_sessions(is_active, max_age, now)
+        if dry_run:
+            stats['sessions'] += sessions.count()
+            stats['players'] += Player.objects.filter(game_session__in=sessions.values('pk')).count()
+            continue
+
+        while True:
+            pks = list(sessions.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            size = row_bytes(pks)
+            if size is not None:
+                deleted_bytes = (deleted_bytes or 0) + size
+            with transaction.atomic():
+                _, deleted = GameSession.objects.filter(pk__in=pks).delete()
+            cache.delete_many([key(pk) for pk in pks for key in (state_version_cache_key, ended_cache_key)])
+            stats['sessions'] += deleted.get(GameSession._meta.label, 0)
+            stats['players'] += deleted.get(Player._meta.label, 0)
+            stats['batches'] += 1
+            if pause:
+                time.sleep(pause)
+
+    if ended_max_age > 0:
+        archived = ArchivedSession.objects.filter(created_at__lt=now - timedelta(seconds=ended_max_age))
+        if dry_run:
+            stats['archived'] = archived.count()
+        while not dry_run:
+            pks = list(archived.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            stats['archived'] += ArchivedSession.objects.filter(pk__in=pks).delete()[0]
+            cache.delete_many([key(pk) for pk in pks for key in (state_version_cache_key, ended_cache_key)])
+            archive_cache.discard(str(pk) for pk in pks)
+            stats['batches'] += 1
+            if pause:
+                time.sleep(pause)
+
+    if before is not None and not dry_run:
+        stats['bytes'] = before - used_bytes()
+    else:
+        stats['bytes'] = deleted_bytes
+    return stats
+
+
+class PurgeScheduler(threading.Thread):
+    """interval초마다 archive_sessions와 purge_sessions를 도는 백그라운드 스레드"""
+
+    def __init__(self, interval):
+        super().__init__(name='avalon-purge', daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                archived = archive_sessions()
+                if archived['sessions']:
+                    logger.info('세션 보관: %(sessions)d개 세션, %(players)d명 플레이어, %(bytes)d바이트', archived)
+                stats = purge_sessions()
+                if stats['sessions']:
+                    logger.info('세션 정리: %(sessions)d개 세션, %(players)d명 플레이어, %(batches)d묶음', stats)
+            except Exception:
+                logger.exception('세션 정리 실패')
+            finally:
+                connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler(**kwargs):
+    """request_started 수신 - 서버 프로세스의 첫 요청 때 한 번만 스케줄러 시작 (관리 명령에서는 안 돎)"""
+    global _scheduler
+    if _scheduler is not None or settings.AVALON_PURGE_INTERVAL <= 0:
+        return
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PurgeScheduler(settings.AVALON_PURGE_INTERVAL)
+            _scheduler.start()
@@ -0,0 +1,179 @@
+# game/snapshot.py
+"""세션 스냅샷 - 세션 플래그와 pk 순 플레이어 목록(역할/진영 포함)을 캐시에 보관
+
+스냅샷 키에 state_version이 들어가므로 bump_state로 버전이 오르면 이전 스냅샷은 더 이상 읽히지 않는다.
+버전을 올리지 않는 쓰기(distribute_roles)는 invalidate_snapshot으로 직접 지운다.
+hot 테이블에 없는 세션은 보관본(game.archive)에서 찾는다.
+"""
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.http import Http404
+
+from .archive import aarchived_snapshot, archive_cache, archived_snapshot
+from .models import STATE_CACHE_TIMEOUT, GameSession, state_version_cache_key
+
+SNAPSHOT_TIMEOUT = STATE_CACHE_TIMEOUT
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def _count(name):
+    with _metrics_lock:
+        _metrics[name] += 1
+
+
+def snapshot_metrics():
+    """이 프로세스의 스냅샷 적중/미스/무효화 횟수"""
+    with _metrics_lock:
+        metrics = {name: _metrics[name] for name in ('hits', 'misses', 'invalidations')}
+    lookups = metrics['hits'] + metrics['misses']
+    metrics['hit_rate'] = metrics['hits'] / lookups if lookups else 0.0
+    return metrics
+
+
+def reset_snapshot_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def snapshot_cache_key(session_id, version):
+    return f'avalon:snapshot:{session_id}:{version}'
+
+
+class SessionSnapshot:
+    """GameSession + pk 순 플레이어 목록의 읽기 전용 사본
+
+    플레이어는 PIN 해시 없이(defer) 담긴다. 스냅샷의 객체는 저장하지 않는다.
+    """
+
+    __slots__ = ('session', 'players')
+
+    def __init__(self, session, players):
+        self.session = session
+        self.players = players
+
+    @property
+    def version(self):
+        return self.session.state_version
+
+    def player(self, nickname, pk=None):
+        """닉네임(과 pk)이 일치하는 플레이어, 없으면 None"""
+        for player in self.players:
+            if player.nickname == nickname and (pk is None or player.pk == pk):
+                return player
+        return None
+
+    def __repr__(self):
+        return f"SessionSnapshot({self.session.session_id}, v{self.version}, {len(self.players)} players)"
+
+
+def current_state_version(session_id):
+    """세션 state_version - 캐시 우선, 없으면 DB 한 번 조회 (세션이 없으면 None)"""
+    version = cache.get(state_version_cache_key(session_id))
+    if version is None:
+        # 보관된 세션은 다시 hot 테이블로 돌아오지 않으므로 LRU에 있으면 바로
+        archived = archive_cache.get(str(session_id))
+        if archived is not None:
+            return archived.version
+        version = GameSession.objects.filter(session_id=session_id).values_list('state_version', flat=True).first()
+        if version is None:
+            archived = archived_snapshot(session_id)
+            version = archived.version if archived is not None else None
+        if version is not None:
+            # 그사이 쓰기가 기록한 더 새 버전을 덮어쓰지 않도록 add
+            cache.add(state_version_cache_key(session_id), version, STATE_CACHE_TIMEOUT)
+    return version
+
+
+def load_snapshot(session_id):
+    """DB에서 스냅샷을 새로 만들어 캐시에 저장 (세션이 없으면 None)"""
+    archived = archive_cache.get(str(session_id))
+    if archived is not None:
+        return archived
+    game_session = GameSession.objects.filter(session_id=session_id).first()
+    if game_session is None:
+        # 보관본은 자체 LRU에 있으므로 공유 캐시에 다시 넣지 않음
+        return archived_snapshot(session_id)
+    snapshot = SessionSnapshot(game_session, list(game_session.players.defer('pin').order_by('pk')))
+    cache.set(snapshot_cache_key(session_id, game_session.state_version), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def get_snapshot(session_id):
+    """세션 스냅샷 - 적중하면 DB 조회 없음 (세션이 없으면 None)"""
+    version = current_state_version(session_id)
+    if version is None:
+        return None
+    snapshot = cache.get(snapshot_cache_key(session_id, version))
+    if snapshot is not None:
+        _count('hits')
+        return snapshot
+    _count('misses')
+    return load_snapshot(session_id)
+
+
+def get_snapshot_or_404(session_id):
+    snapshot = get_snapshot(session_id)
+    if snapshot is None:
+        raise Http404('세션을 찾을 수 없습니다.')
+    return snapshot
+
+
+def invalidate_snapshot(session_id):
+    """쓰기 직후 호출 - 현재 버전의 스냅샷 삭제 (다음 읽기에서 다시 만듦)"""
+    version = cache.get(state_version_cache_key(session_id))
+    if version is not None:
+        cache.delete(snapshot_cache_key(session_id, version))
+    _count('invalidations')
+
+
+# async 뷰용 (ASGI) - 캐시/ORM의 async API 사용
+
+async def acurrent_state_version(session_id):
+    version = await cache.aget(state_version_cache_key(session_id))
+    if version is None:
+        archived = archive_cache.get(str(session_id))
+        if archived is not None:
+            return archived.version
+        version = await GameSession.objects.filter(session_id=session_id).values_list('state_version', flat=True).afirst()
+        if version is None:
+            archived = await aarchived_snapshot(session_id)
+            version = archived.version if archived is not None else None
+        if version is not None:
+            await cache.aadd(state_version_cache_key(session_id), version, STATE_CACHE_TIMEOUT)
+    return version
+
+
+async def aload_snapshot(session_id):
+    archived = archive_cache.get(str(session_id))
+    if archived is not None:
+        return archived
+    game_session = await GameSession.objects.filter(session_id=session_id).afirst()
+    if game_session is None:
+        return await aarchived_snapshot(session_id)
+    players = [player async for player in game_session.players.defer('pin').order_by('pk')]
+    snapshot = SessionSnapshot(game_session, players)
+    await cache.aset(snapshot_cache_key(session_id, game_session.state_version), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+async def aget_snapshot(session_id):
+    version = await acurrent_state_version(session_id)
+    if version is None:
+        return None
+    snapshot = await cache.aget(snapshot_cache_key(session_id, version))
+    if snapshot is not None:
+        _count('hits')
+        return snapshot
+    _count('misses')
+    return await aload_snapshot(session_id)
+
+
+async def aget_snapshot_or_404(session_id):
+    snapshot = await aget_snapshot(session_id)
+    if snapshot is None:
+        raise Http404('세션을 찾을 수 없습니다.')
+    return snapshot
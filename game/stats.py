@@ -0,0 +1,101 @@
+# game/stats.py
+"""역할 배정 통계 - 분배 때마다 RoleStat 카운터를 같은 트랜잭션 안에서 F() 증가로 누적
+
+읽기는 (인원수, 키) 행만 보므로 세션/플레이어 수와 무관하다 (manage.py role_stats).
+카운터가 생기기 전의 기록은 manage.py backfill_role_stats로 Player 행과 보관본에서 다시 센다.
+"""
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+
+from ftn.catalog import get_role_catalog
+
+from .archive import unpack
+from .models import ArchivedSession, Player, RoleStat
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def deal_counts(seats):
+    """좌석별 (역할 마스크, 더미 여부) 목록 -> 키별 증가량
+
+    sessions / dummy_sessions / dummies / role:<역할> / combo:<겸직 역할들> / lineup:<세션에 나온 역할들>
+    """
+    catalog = get_role_catalog()
+    counts = Counter(sessions=1)
+    lineup = 0
+    for role_mask, is_dummy in seats:
+        lineup |= role_mask
+        roles = catalog.roles_for_mask(role_mask) if role_mask else []
+        counts.update(f'role:{role}' for role in roles)
+        if len(roles) > 1:
+            counts['combo:' + '+'.join(roles)] += 1
+        if is_dummy:
+            counts['dummies'] += 1
+    if counts['dummies']:
+        counts['dummy_sessions'] = 1
+    counts['lineup:' + '+'.join(catalog.roles_for_mask(lineup) if lineup else [])] += 1
+    return counts
+
+
+def record_deal(player_count, seats):
+    """분배 한 번을 카운터에 반영 - 없는 행 생성(충돌 무시) + CASE로 한 번에 증가, 항상 쿼리 2번"""
+    counts = deal_counts(seats)
+    RoleStat.objects.bulk_create(
+        [RoleStat(player_count=player_count, key=key) for key in counts], ignore_conflicts=True)
+    RoleStat.objects.filter(player_count=player_count, key__in=counts).update(count=F('count') + Case(
+        *[When(key=key, then=Value(amount)) for key, amount in counts.items()],
+        default=Value(0),
+        output_field=models.PositiveBigIntegerField(),
+    ))
+
+
+def role_stats():
+    """{인원수: {키: 횟수}} - 카운터 테이블만 읽음"""
+    result = {}
+    for player_count, key, count in RoleStat.objects.order_by('player_count', 'key').values_list(
+            'player_count', 'key', 'count'):
+        result.setdefault(player_count, {})[key] = count
+    return result
+
+
+def backfill_role_stats(chunk_size=BACKFILL_CHUNK_SIZE):
+    """시작된 세션의 Player 행과 보관본을 스트리밍으로 다시 세서 카운터를 통째로 교체 - 센 세션 수 반환
+
+    정리(game.retention)로 이미 삭제된 세션은 셀 수 없으므로 카운터 도입 직후 한 번만 돌릴 것.
+    """
+    totals = {}
+
+    def add(seats):
+        totals.setdefault(len(seats), Counter()).update(deal_counts(seats))
+
+    sessions = 0
+    with transaction.atomic():
+        # 세션 순서로 읽어서 세션 하나씩 모음 (플레이어 pk 순 = 분배 때 좌석 순)
+        current, seats = None, []
+        rows = Player.objects.filter(game_session__is_started=True).order_by('game_session_id', 'pk').values_list(
+            'game_session_id', 'role_mask', 'is_dummy')
+        for session_id, role_mask, is_dummy in rows.iterator(chunk_size=chunk_size):
+            if session_id != current:
+                if seats:
+                    add(seats)
+                    sessions += 1
+                current, seats = session_id, []
+            seats.append((role_mask, is_dummy))
+        if seats:
+            add(seats)
+            sessions += 1
+
+        for payload in ArchivedSession.objects.values_list('payload', flat=True).iterator(chunk_size=chunk_size):
+            data = unpack(payload)
+            if data['s'] and data['p']:
+                add([(role_mask, is_dummy) for _, _, role_mask, _, is_dummy in data['p']])
+                sessions += 1
+
+        RoleStat.objects.all().delete()
+        RoleStat.objects.bulk_create([
+            RoleStat(player_count=player_count, key=key, count=count)
+            for player_count, counts in totals.items() for key, count in counts.items()
+        ])
+    return sessions
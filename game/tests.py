@@ -1,3 +1,1110 @@
-from django.test import TestCase
+import os
+import json
+import time
+import zlib
+import asyncio
+import tempfile
+import random
+import threading
+from io import StringIO
+from collections import Counter
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.hashers import is_password_usable, make_password
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+from ftn.catalog import FACTION_CODES, ROLE_MESSAGES_PATH, RoleCatalog, get_role_catalog, load_role_catalog
+from ftn.email.generate_msg import distributor, generate_player_info
+from ftn.players import (
+    _render_composition, build_visibility, clear_message_cache, generate_player_messages,
+    get_invisible_evil_roles_for_player, get_visible_players, message_cache_info,
+)
+from ftn.roles import (
+    RolePlayer, _check_role_packages, build_role_packages, deal_many, package_signature, role_group_configs,
+    validate_role_packages,
+)
+
+from . import events, urls as game_urls
+from .management.commands.simulate_deals import chi_square
+from .archive import ZDICT, archive_cache, archive_sessions, legacy_dummy_flags, unpack
+from .auth import issue_token, token_cookie_name
+from .events import EventBroker, InMemoryBroker, SQLiteBroker, SubscriptionDropped
+from .metrics import reset_metrics
+from .retention import expired_sessions, purge_sessions
+from .models import ArchivedSession, GameSession, Player, RoleStat, ended_cache_key, state_version_cache_key
+from .snapshot import get_snapshot, reset_snapshot_metrics, snapshot_metrics
+from .stats import role_stats
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def create_session(player_count, enable_dummy=False, role_groups=None):
+    game_session = GameSession.objects.create(
+        role_groups=role_groups or [['assassin'], ['morgana'], ['percival']],
+        enable_dummy=enable_dummy,
+        host_nickname='player_0' if player_count else None,
+    )
+    pin = make_password('1234')
+    Player.objects.bulk_create([
+        Player(game_session=game_session, nickname=f'player_{i}', pin=pin)
+        for i in range(player_count)
+    ])
+    return game_session
+
+
+class VisibilityTests(SimpleTestCase):
+    # 테이블별 기준 결과 - 좌석마다 (보이는 좌석, 볼 수 없는 악인, 겸직 중이라 볼 수 없는 악인)
+    BASELINES = [
+        ([['merlin'], ['percival'], ['loyal_servant'], ['assassin'], ['morgana'], ['oberon']], [
+            ([3, 4], ['오베론'], []),
+            ([0, 4], [], []),
+            ([], [], []),
+            ([4], ['오베론'], []),
+            ([3], ['오베론'], []),
+            ([], ['암살자', '모르가나'], []),
+        ]),
+        ([['merlin'], ['percival'], ['loyal_servant'], ['assassin', 'oberon'], ['morgana'], ['minion_of_mordred']], [
+            ([4, 5], ['오베론'], []),
+            ([0, 4], [], []),
+            ([], [], []),
+            ([], ['모르가나', '모드레드의 수하'], ['암살자', '오베론']),
+            ([5], ['오베론'], []),
+            ([4], ['오베론'], []),
+        ]),
+        ([['merlin'], ['loyal_servant'], ['assassin', 'morgana'], ['mordred'], ['loyal_servant']], [
+            ([2], ['모드레드'], []),
+            ([], [], []),
+            ([3], [], []),
+            ([2], [], []),
+            ([], [], []),
+        ]),
+    ]
+
+    def visibility(self, packages):
+        players = [RolePlayer(f'seat_{i}') for i in range(len(packages))]
+        for player, package in zip(players, packages):
+            player.roles = package
+        return players, build_visibility(players, get_role_catalog())
+
+    def test_matches_baseline_tables(self):
+        for packages, expected in self.BASELINES:
+            players, result = self.visibility(packages)
+            seats = {id(player): i for i, player in enumerate(players)}
+            self.assertEqual(
+                [([seats[id(other)] for other in visible], hidden, self_hidden) for visible, hidden, self_hidden in result],
+                expected, packages)
+
+    def test_legacy_functions_take_role_data_dict(self):
+        # 예전 시그니처 그대로 role_messages.json의 dict를 받아도 build_visibility와 같은 결과
+        with open(ROLE_MESSAGES_PATH, encoding='utf-8') as f:
+            role_data = json.load(f)
+        for packages, expected in self.BASELINES:
+            players, _ = self.visibility(packages)
+            seats = {id(player): i for i, player in enumerate(players)}
+            self.assertEqual([
+                ([seats[id(other)] for other in get_visible_players(player, players, role_data)],
+                 *get_invisible_evil_roles_for_player(player, players, role_data))
+                for player in players
+            ], expected, packages)
+
+    def test_cannot_see_overrides_can_see(self):
+        # 멀린은 암살자를 볼 수 있지만 오베론은 볼 수 없음 -> 암살자+오베론 겸직자는 안 보임
+        players, result = self.visibility([['merlin'], ['assassin', 'oberon'], ['assassin']])
+        self.assertEqual(result[0][0], [players[2]])
+
+    def test_multi_role_player_sees_union_and_is_seen_once(self):
+        players, result = self.visibility([['merlin'], ['percival'], ['assassin', 'morgana'], ['minion_of_mordred']])
+        # 암살자+모르가나 겸직자는 멀린/퍼시벌에게 한 번씩만 보임
+        self.assertEqual(result[0][0], [players[2], players[3]])
+        self.assertEqual(result[1][0], [players[0], players[2]])
+        # 겸직자는 두 역할의 can_see 합집합으로 수하를 봄
+        self.assertEqual(result[2][0], [players[3]])
+
+    def test_hidden_names_reach_messages(self):
+        players, _ = self.visibility(
+            [['merlin'], ['loyal_servant'], ['assassin'], ['mordred'], ['minion_of_mordred', 'oberon']])
+        messages = generate_player_messages(players)
+        self.assertEqual(messages['seat_0']['messages'][0]['invisible'], '(모드레드, 오베론은 보이지 않습니다.)')
+        self.assertEqual(messages['seat_0']['messages'][0]['visible'], 'seat_2')
+        self.assertEqual(messages['seat_4']['messages'][0]['invisible'],
+                         '(암살자, 모드레드는 보이지 않습니다.)\n(악인 모드레드의 수하, 오베론을 겸직하고 있어서 보이지 않습니다.)')
+
+
+class MessageCacheTests(SimpleTestCase):
+    def seated(self, packages):
+        players = [RolePlayer(f'seat_{i}') for i in range(len(packages))]
+        for player, package in zip(players, packages):
+            player.roles = package
+        return players
+
+    def test_cached_render_equals_uncached(self):
+        packages = [['merlin'], ['percival'], ['loyal_servant'], ['assassin', 'morgana'], ['oberon']]
+        clear_message_cache()
+        first = generate_player_messages(self.seated(packages), 3)
+        hits = message_cache_info().hits
+        # 좌석 순서가 달라도 같은 구성이면 캐시 적중
+        cached = generate_player_messages(self.seated(packages), 3)
+        reordered = generate_player_messages(self.seated(packages[::-1]), 3)
+        self.assertEqual(message_cache_info().hits, hits + 2)
+        self.assertEqual(cached, first)
+        self.assertEqual(reordered['seat_0'], first['seat_4'] | {'images': reordered['seat_0']['images']})
+
+        composition = tuple(sorted(tuple(package) for package in packages))
+        catalog = get_role_catalog()
+        self.assertEqual(_render_composition(catalog, composition), _render_composition.__wrapped__(catalog, composition))
+
+    def test_catalog_reload_uses_new_cache_key(self):
+        packages = [['merlin'], ['loyal_servant'], ['loyal_servant'], ['assassin'], ['minion_of_mordred']]
+        with open(ROLE_MESSAGES_PATH, encoding='utf-8') as f:
+            role_data = json.load(f)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'role_messages.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(role_data, f)
+            with mock.patch('ftn.catalog.ROLE_MESSAGES_PATH', path), \
+                    mock.patch('ftn.catalog._catalog', None), mock.patch('ftn.catalog._catalog_mtime', None):
+                before_catalog = get_role_catalog()
+                before = generate_player_messages(self.seated(packages))
+
+                role_data['merlin']['bold'] = '🧙 바뀐 멀린'
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(role_data, f)
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+                misses = message_cache_info().misses
+                after = generate_player_messages(self.seated(packages))
+                self.assertIsNot(get_role_catalog(), before_catalog)
+                self.assertEqual(message_cache_info().misses, misses + 1)
+        self.assertNotEqual(before['seat_0']['messages'][0]['bold'], '🧙 바뀐 멀린')
+        self.assertEqual(after['seat_0']['messages'][0]['bold'], '🧙 바뀐 멀린')
+
+
+class ValidateRolePackagesTests(SimpleTestCase):
+    def setUp(self):
+        # 프로세스 전역 카탈로그의 캐시를 건드리지 않도록 새로 읽은 카탈로그 사용
+        self.catalog = load_role_catalog()
+
+    def assert_invalid(self, packages, message):
+        with self.assertRaises(ValueError) as raised:
+            validate_role_packages(packages, self.catalog)
+        self.assertEqual(str(raised.exception), message)
+
+    def test_required_roles(self):
+        self.assert_invalid([['percival'], ['loyal_servant'], ['assassin']], '멀린은 필수 역할입니다.')
+        self.assert_invalid([['merlin'], ['loyal_servant'], ['morgana']], '암살자는 필수 역할입니다.')
+        self.assertTrue(validate_role_packages([['merlin'], ['assassin']], self.catalog))
+
+    def test_forbidden_pair_in_either_order(self):
+        for package in (['oberon', 'mordred'], ['mordred', 'oberon']):
+            self.assert_invalid([['merlin'], ['assassin'], package], '금지된 겸직: mordred + oberon')
+        self.assert_invalid([['merlin'], ['assassin'], ['morgana', 'oberon']], '금지된 겸직: morgana + oberon')
+        self.assertTrue(validate_role_packages([['merlin'], ['assassin', 'oberon']], self.catalog))
+
+    def test_cached_result_matches_fresh_validation(self):
+        cases = [
+            [['merlin'], ['assassin'], ['loyal_servant']],
+            [['merlin'], ['assassin'], ['oberon', 'mordred']],
+            [['percival'], ['assassin']],
+        ]
+        for packages in cases:
+            fresh = _check_role_packages(package_signature(packages), load_role_catalog())
+            for attempt in range(2):
+                # 두 번째는 패키지 순서를 바꿔도 같은 시그니처로 캐시 적중
+                packages = packages[::-1] if attempt else packages
+                try:
+                    validate_role_packages(packages, self.catalog)
+                    error = None
+                except ValueError as e:
+                    error = str(e)
+                self.assertEqual(error, fresh)
+            self.assertEqual(self.catalog.validation_cache[package_signature(packages)], fresh)
+        self.assertEqual(len(self.catalog.validation_cache), len(cases))
+
+        # 한도에 닿으면 비우고 다시 채움
+        with mock.patch('ftn.roles.VALIDATION_CACHE_SIZE', len(cases)):
+            validate_role_packages([['merlin'], ['assassin', 'percival']], self.catalog)
+        self.assertEqual(len(self.catalog.validation_cache), 1)
+
+
+class DealManyTests(SimpleTestCase):
+    def setUp(self):
+        self.packages = build_role_packages([['assassin'], ['percival']], 5, get_role_catalog())
+
+    def test_rows_are_permutations(self):
+        deals = deal_many(self.packages, 200)
+        self.assertEqual(deals.shape, (200, 5))
+        self.assertEqual(len(deals.tobytes()), 200 * 5)
+        for row in deals:
+            self.assertEqual(sorted(row), [0, 1, 2, 3, 4])
+        self.assertEqual(list(deals[-1]), list(deals.row(199)))
+        self.assertEqual(list(deals.column(2)), [row[2] for row in deals])
+
+    def test_zero_deals(self):
+        deals = deal_many(self.packages, 0)
+        self.assertEqual(deals.shape, (0, 5))
+        self.assertEqual(list(deals), [])
+        with self.assertRaises(ValueError):
+            deal_many(self.packages, -1)
+
+    def test_permutations_are_uniform(self):
+        # 5! = 120가지 순열이 고르게 나오는지 카이제곱 검정 (자유도 119, p ≈ 1e-6 임계값 207)
+        n = 12000
+        counts = Counter(tuple(row) for row in deal_many(self.packages, n))
+        self.assertEqual(len(counts), 120)
+        expected = n / 120
+        chi_square = sum((observed - expected) ** 2 / expected for observed in counts.values())
+        self.assertLess(chi_square, 207)
+
+
+class SimulateDealsCommandTests(SimpleTestCase):
+    def test_reports_every_player_count_and_role_toggle(self):
+        out = StringIO()
+        call_command('simulate_deals', deals=200, chunk=100, workers=1, verbosity=2, stdout=out)
+        lines = out.getvalue().splitlines()
+
+        reported = {}
+        for line in lines:
+            if ' 보정 p=' in line:
+                config, p_value = line.split(' 보정 p=')
+                reported[config] = float(p_value)
+        expected = {f"{player_count}명 [{', '.join('+'.join(group) for group in role_groups)}]"
+                    for player_count in range(5, 11) for role_groups in role_group_configs(player_count)}
+        self.assertEqual(set(reported), expected)
+        self.assertTrue(all(0 <= p_value <= 1 for p_value in reported.values()))
+        # 퍼시벌, 오베론/모드레드/모르가나 토글이 모두 들어 있음
+        self.assertIn('5명 [assassin, oberon, percival]', reported)
+        self.assertIn('10명 [assassin, morgana, mordred, oberon, percival]', reported)
+        # 구성마다 좌석별 빈도와 p-value, 끝에 처리량 요약
+        self.assertEqual(sum(line.lstrip().startswith('seat ') for line in lines),
+                         sum(int(config.split('명')[0]) for config in expected))
+        self.assertIn(f'{len(expected)}개 구성, {len(expected) * 200:,}판', lines[-2])
+
+    def test_chi_square_matches_known_values(self):
+        self.assertEqual(chi_square([50, 50], 50)[0], 0.0)
+        stat, p_value = chi_square([30, 70], 50)
+        self.assertAlmostEqual(stat, 16.0)
+        self.assertLess(p_value, 0.001)
+        self.assertGreater(chi_square([48, 52], 50)[1], 0.5)
+
+
+@skipUnless(pandas, '이메일 배포 경로(generate_player_info)는 pandas 필요')
+class GeneratePlayerInfoTests(SimpleTestCase):
+    def deal(self, seed):
+        player_ids = [f'player_{i}' for i in range(10)]
+        random.seed(seed)
+        roles = distributor(player_ids, is_percival=False, is_morgana=False)
+        return roles, generate_player_info(roles, pandas.DataFrame({'player_ids': player_ids, 'name': player_ids}))
+
+    def test_fourth_evil_seat_reuses_images_in_shuffled_order(self):
+        roles, info = self.deal(seed=7)
+        evil = [player for player in info if player in roles['bad']]
+        self.assertEqual(len(evil), 4)
+        images = [info[player]['img'] for player in evil]
+        self.assertEqual(len(set(images[:3])), 3)
+        self.assertEqual(images[3], images[0])
+        # 같은 시드면 같은 결과
+        self.assertEqual(self.deal(seed=7)[1], info)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class DistributeRolesTests(TestCase):
+    def assert_dealt(self, game_session, player_count):
+        players = list(game_session.players.all())
+        self.assertEqual(len(players), player_count)
+        for player in players:
+            self.assertTrue(player.roles)
+            self.assertIn(player.faction, ('good', 'evil'))
+        self.assertEqual(sum(player.primary_role == 'merlin' for player in players), 1)
+
+    def test_query_count_is_constant(self):
+        for player_count in (5, 10):
+            game_session = create_session(player_count)
+            # 조회 + bulk_update + 구성 요약 저장 + 통계 행 생성/증가 (바깥 트랜잭션에 합류해서 savepoint 없음)
+            with self.assertNumQueries(5):
+                game_session.distribute_roles()
+            self.assert_dealt(game_session, player_count)
+
+    def test_dummies_are_bulk_created(self):
+        game_session = create_session(2, enable_dummy=True)
+        with self.assertNumQueries(6):
+            game_session.distribute_roles()
+        self.assert_dealt(game_session, 5)
+        dummy = game_session.players.get(nickname='dummy_0')
+        self.assertFalse(is_password_usable(dummy.pin))
+
+    def test_composition_is_stored_at_deal_time(self):
+        game_session = create_session(7)
+        game_session.distribute_roles()
+        composition = GameSession.objects.get(pk=game_session.pk).composition
+
+        self.assertEqual((composition['good_total'], composition['evil_total']), (4, 3))
+        self.assertEqual(composition['good'][0], [['merlin'], 1])
+        self.assertIn([['loyal_servant'], 2], composition['good'])
+        # 공개 순서는 악인 먼저
+        factions = {player.nickname: player.faction for player in game_session.players.all()}
+        self.assertEqual([factions[name] for name in composition['reveal_order']], ['evil'] * 3 + ['good'] * 4)
+
+    def test_roles_are_stored_as_catalog_bits(self):
+        catalog = get_role_catalog()
+        game_session = create_session(0)
+        Player.objects.create(game_session=game_session, nickname='a', pin='x', roles=['morgana', 'assassin'], faction='evil')
+        Player.objects.create(game_session=game_session, nickname='b', pin='x')
+
+        stored = {player.nickname: player for player in game_session.players.all()}
+        self.assertEqual(stored['a'].role_mask, (1 << catalog.role_bits['assassin']) | (1 << catalog.role_bits['morgana']))
+        self.assertEqual(stored['a'].faction_code, FACTION_CODES['evil'])
+        # 비트 순서로 읽힘
+        self.assertEqual(stored['a'].roles, ['assassin', 'morgana'])
+        self.assertEqual((stored['a'].primary_role, stored['a'].has_multiple_roles, stored['a'].faction), ('assassin', True, 'evil'))
+        self.assertEqual((stored['b'].roles, stored['b'].primary_role, stored['b'].faction), ([], None, 'unknown'))
+
+    def test_catalog_bits_come_from_role_data(self):
+        catalog = RoleCatalog({'b': {'bit': 3}, 'a': {'bit': 0}, 'c': {}})
+        self.assertEqual(dict(catalog.role_bits), {'b': 3, 'a': 0, 'c': 2})
+        self.assertEqual(catalog.roles_for_mask(0b1001), ['a', 'b'])
+        with self.assertRaises(ValueError):
+            RoleCatalog({'a': {'bit': 1}, 'b': {}})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StartGameTests(TransactionTestCase):
+    def host_client(self, game_session):
+        client = Client()
+        host = game_session.players.get(nickname=game_session.host_nickname)
+        client.cookies[token_cookie_name(game_session.session_id)] = issue_token(host)
+        return client
+
+    def start(self, client, game_session):
+        return client.post(reverse('start_game', args=[game_session.session_id]), {
+            'active_roles': json.dumps([['assassin'], ['morgana']]),
+            'enable_percival': 'true',
+        })
+
+    def test_parallel_starts_deal_once(self):
+        game_session = create_session(3, enable_dummy=True)
+        parallel = 4
+        barrier = threading.Barrier(parallel)
+        results = []
+        distribute_roles = GameSession.distribute_roles
+
+        def slow_distribute_roles(session):
+            # 다른 요청이 분배 도중에 도착하도록
+            time.sleep(0.05)
+            distribute_roles(session)
+
+        def start():
+            client = self.host_client(game_session)
+            try:
+                barrier.wait()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.start(client, game_session)
+                results.append((response.status_code, response['Location'], len(queries)))
+            finally:
+                connection.close()
+
+        with mock.patch.object(GameSession, 'distribute_roles', autospec=True, side_effect=slow_distribute_roles) as dealt:
+            threads = [threading.Thread(target=start) for _ in range(parallel)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(dealt.call_count, 1)
+        self.assertEqual({(status, location) for status, location, _ in results},
+                         {(302, reverse('role', args=[game_session.session_id]))})
+        # 더미는 한 번만, 상태 버전도 한 번만 증가
+        self.assertEqual(game_session.players.count(), 5)
+        game_session.refresh_from_db()
+        self.assertEqual((game_session.is_started, game_session.state_version), (True, 1))
+        self.assertEqual(game_session.role_groups, [['assassin'], ['morgana'], ['percival']])
+        self.assertTrue(all(queries <= VIEW_BUDGETS['start_game'][0] for _, _, queries in results))
+
+    def test_repeated_start_is_a_cheap_no_op(self):
+        game_session = create_session(5)
+        client = self.host_client(game_session)
+        self.start(client, game_session)
+        roles = {player.nickname: player.role_mask for player in game_session.players.all()}
+
+        # 세션 조회 + 토큰 플레이어 확인
+        with self.assertNumQueries(2):
+            response = self.start(client, game_session)
+        self.assertRedirects(response, reverse('role', args=[game_session.session_id]), fetch_redirect_response=False)
+        self.assertEqual({player.nickname: player.role_mask for player in game_session.players.all()}, roles)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class PlayerTokenTests(TestCase):
+    def setUp(self):
+        self.game_session = create_session(0)
+
+    def join(self, nickname, pin='1234'):
+        return self.client.post(reverse('join', args=[self.game_session.session_id]), {'nickname': nickname, 'pin': pin})
+
+    def test_join_issues_token_and_lobby_needs_no_pin(self):
+        response = self.join('alice')
+        self.assertRedirects(response, reverse('lobby', args=[self.game_session.session_id]))
+        self.assertNotIn('pin', response['Location'])
+        self.assertIn(token_cookie_name(self.game_session.session_id), response.cookies)
+
+        response = self.client.get(reverse('lobby', args=[self.game_session.session_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['player_nickname'], 'alice')
+
+    @override_settings(AVALON_LEGACY_PIN_AUTH=True)
+    def test_legacy_pin_link_authenticates_during_migration_window(self):
+        player = Player.objects.create(game_session=self.game_session, nickname='bob', pin=make_password('1234'))
+        url = reverse('lobby', args=[self.game_session.session_id])
+
+        response = self.client.get(url, {'nickname': 'bob', 'pin': '1234'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['player_nickname'], player.nickname)
+        self.assertRedirects(self.client.get(url, {'nickname': 'bob', 'pin': '0000'}),
+                             reverse('join', args=[self.game_session.session_id]))
+
+    def test_pin_without_token_is_rejected_after_migration_window(self):
+        self.game_session.host_nickname = 'bob'
+        self.game_session.save(update_fields=['host_nickname'])
+        Player.objects.create(game_session=self.game_session, nickname='bob', pin=make_password('1234'))
+        session_id = self.game_session.session_id
+
+        self.assertRedirects(self.client.get(reverse('lobby', args=[session_id]), {'nickname': 'bob', 'pin': '1234'}),
+                             reverse('join', args=[session_id]))
+        response = self.client.post(reverse('end_game', args=[session_id]), {'nickname': 'bob', 'pin': '1234'})
+        self.assertEqual(response.status_code, 401)
+        self.assertTrue(GameSession.objects.get(pk=session_id).is_active)
+
+    def test_tampered_token_is_rejected(self):
+        self.join('alice')
+        cookie = token_cookie_name(self.game_session.session_id)
+        self.client.cookies[cookie] = self.client.cookies[cookie].value + 'x'
+        response = self.client.get(reverse('lobby', args=[self.game_session.session_id]))
+        self.assertRedirects(response, reverse('join', args=[self.game_session.session_id]))
+
+    def test_token_of_kicked_player_does_not_match_new_player(self):
+        self.join('alice')
+        old_token = self.client.cookies[token_cookie_name(self.game_session.session_id)].value
+        Player.objects.filter(nickname='alice').delete()
+        self.join('alice', pin='9999')
+
+        response = self.client.get(
+            reverse('lobby', args=[self.game_session.session_id]), HTTP_X_AVALON_TOKEN=old_token)
+        self.assertRedirects(response, reverse('join', args=[self.game_session.session_id]))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SessionSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_snapshot_metrics()
+        self.game_session = create_session(6)
+        self.session_id = self.game_session.session_id
+        host = self.game_session.players.get(nickname='player_0')
+        self.client.cookies[token_cookie_name(self.session_id)] = issue_token(host)
+
+    def start(self):
+        self.game_session.distribute_roles()
+        self.game_session.is_started = True
+        self.game_session.save(update_fields=['is_started'])
+        self.game_session.bump_state('started')
+
+    def test_read_views_hit_snapshot_without_queries(self):
+        self.start()
+        for name in ('role', 'ended'):
+            url = reverse(name, args=[self.session_id])
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['players_in_session']), 6)
+        self.assertGreaterEqual(snapshot_metrics()['hits'], 2)
+
+    def test_write_paths_invalidate_snapshot(self):
+        lobby_url = reverse('lobby', args=[self.session_id])
+        self.client.get(lobby_url)
+        self.client.post(reverse('kick_player', args=[self.session_id]), {'target_nickname': 'player_5'})
+
+        response = self.client.get(lobby_url)
+        self.assertEqual([p.nickname for p in response.context['players_in_session']],
+                         ['player_0', 'player_1', 'player_2', 'player_3', 'player_4'])
+
+        self.start()
+        snapshot = get_snapshot(self.session_id)
+        self.assertTrue(snapshot.session.is_started)
+        self.assertTrue(all(player.roles for player in snapshot.players))
+        self.assertGreaterEqual(snapshot_metrics()['invalidations'], 3)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StatePollingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.game_session = create_session(0)
+        self.url = reverse('get_state', args=[self.game_session.session_id])
+
+    def test_unchanged_state_is_304_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_join_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        # 새 버전은 커밋 뒤에 캐시에 기록됨
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('join', args=[self.game_session.session_id]), {'nickname': 'alice', 'pin': '1234'})
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['players'], ['alice'])
+
+    def test_rolled_back_bump_does_not_touch_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        version = cache.get(state_version_cache_key(self.game_session.session_id))
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.game_session.bump_state()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(cache.get(state_version_cache_key(self.game_session.session_id)), version)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LobbyEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.game_session = create_session(0)
+        self.url = reverse('lobby_events', args=[self.game_session.session_id])
+
+    def join_alice(self):
+        # 이벤트는 커밋 후 발행되므로 테스트 트랜잭션 안에서는 직접 실행
+        with self.captureOnCommitCallbacks(execute=True):
+            Player.objects.create(game_session=self.game_session, nickname='alice', pin='-')
+            self.game_session.bump_state('players')
+
+    def test_wsgi_request_falls_back_to_polling(self):
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+
+    async def test_stream_pushes_state_changes(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertIn(b'"players": []', await anext(stream))
+
+        await sync_to_async(self.join_alice)()
+        event = await asyncio.wait_for(anext(stream), timeout=5)
+        self.assertIn(b'event: state', event)
+        self.assertIn(b'"players": ["alice"]', event)
+        await stream.aclose()
+
+
+class IncompleteBroker(EventBroker):
+    # unsubscribe를 빠뜨린 백엔드
+    def publish(self, session_id, event):
+        pass
+
+    def subscribe(self, session_id):
+        pass
+
+
+class EventBrokerTests(SimpleTestCase):
+    def test_incomplete_backend_fails_when_constructed(self):
+        with override_settings(AVALON_EVENT_BROKER={'BACKEND': 'game.tests.IncompleteBroker'}):
+            with self.assertRaisesMessage(TypeError, 'unsubscribe'):
+                events.get_broker()
+        self.assertIsInstance(events.get_broker(), InMemoryBroker)
+
+    async def test_publish_fans_out_to_every_subscriber(self):
+        broker = InMemoryBroker()
+        first, second = broker.subscribe('s'), broker.subscribe('s')
+        other = broker.subscribe('t')
+
+        broker.publish('s', {'version': 1})
+        self.assertEqual(await first.get(timeout=1), {'version': 1})
+        self.assertEqual(await second.get(timeout=1), {'version': 1})
+        self.assertIsNone(await other.get(timeout=0.01))
+
+    async def test_slow_subscriber_is_dropped(self):
+        broker = InMemoryBroker(queue_size=2)
+        slow = broker.subscribe('s')
+        for version in range(3):
+            broker.publish('s', {'version': version})
+
+        self.assertEqual(broker.subscriber_count('s'), 0)
+        with self.assertRaises(SubscriptionDropped):
+            await slow.get(timeout=1)
+
+    async def test_sqlite_broker_delivers_across_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), 'events.sqlite3')
+        publisher = SQLiteBroker(path)
+        subscriber = SQLiteBroker(path, poll_interval=0.01)
+
+        async with subscriber.subscribe('s') as subscription:
+            await asyncio.to_thread(publisher.publish, 's', {'version': 7})
+            self.assertEqual(await subscription.get(timeout=5), {'version': 7})
+        self.assertEqual(subscriber.subscriber_count(), 0)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, AVALON_METRICS_ENABLED=True, AVALON_METRICS_TOKEN='')
+class MetricsTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.game_session = GameSession.objects.create(role_groups=[['assassin']])
+        self.session_id = self.game_session.session_id
+
+    def scrape(self, **headers):
+        response = self.client.get('/metrics', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_records_views_queries_and_password_time(self):
+        self.client.get(reverse('join', args=[self.session_id]))
+        self.client.post(reverse('join', args=[self.session_id]), {'nickname': 'alice', 'pin': '1234'})
+        self.client.get(reverse('get_state', args=[self.session_id]))
+        asyncio.run(AsyncClient().get(reverse('get_state', args=[self.session_id])))
+
+        samples = self.scrape()
+        self.assertEqual(samples['avalon_request_duration_seconds_count{view="join"}'], 2)
+        self.assertEqual(samples['avalon_request_duration_seconds_count{view="get_state"}'], 2)
+        self.assertEqual(samples['avalon_request_duration_seconds_bucket{view="get_state",le="+Inf"}'], 2)
+        self.assertGreater(samples['avalon_request_db_queries_total{view="join"}'], 0)
+        self.assertGreater(samples['avalon_request_password_seconds_total{view="join"}'], 0)
+        self.assertGreater(samples['avalon_request_template_seconds_total{view="join"}'], 0)
+        self.assertIn('avalon_snapshot_lookups_total{result="hit"}', samples)
+
+    def test_endpoint_is_gated_by_settings(self):
+        with override_settings(AVALON_METRICS_ENABLED=False):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(AVALON_METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            self.scrape(authorization='Bearer secret')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoadTestCommandTests(TransactionTestCase):
+    def test_runs_full_lifecycle_and_reports_every_endpoint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'report.json')
+            call_command('loadtest', sessions=2, players=[5, 6], current_db=True, poll_interval=0.05,
+                         lobby_seconds=0.1, role_seconds=0.1, ramp_seconds=0, seed=1, json=path, stdout=StringIO())
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(report['failures'], [])
+        self.assertEqual(
+            set(report['endpoints']),
+            {'home', 'join', 'lobby', 'get_state', 'start_game', 'role', 'end_game', 'ended'},
+        )
+        self.assertEqual(report['endpoints']['start_game']['requests'], 2)
+        self.assertEqual(report['endpoints']['role']['requests'], report['players'])
+        self.assertTrue(all(row['errors'] == 0 for row in report['endpoints'].values()))
+        self.assertLessEqual(report['endpoints']['start_game']['db_queries'], 2 * VIEW_BUDGETS['start_game'][0])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class RetentionTests(TestCase):
+    def aged_session(self, days, is_active, player_count=3):
+        game_session = create_session(player_count)
+        GameSession.objects.filter(pk=game_session.pk).update(
+            is_active=is_active, created_at=timezone.now() - timedelta(days=days))
+        return game_session
+
+    def test_purges_expired_sessions_in_batches(self):
+        ended = [self.aged_session(2, is_active=False) for _ in range(3)]
+        stale = self.aged_session(10, is_active=True)
+        keep = [self.aged_session(2, is_active=True), self.aged_session(0, is_active=False), create_session(3)]
+
+        out = StringIO()
+        call_command('purge_sessions', '--dry-run', stdout=out)
+        self.assertIn('세션 4개, 플레이어 12명', out.getvalue())
+        self.assertEqual(GameSession.objects.count(), 7)
+
+        stats = purge_sessions(ended_max_age=86400, stale_max_age=7 * 86400, batch_size=2)
+        self.assertEqual((stats['sessions'], stats['players'], stats['batches']), (4, 12, 3))
+        self.assertIsNotNone(stats['bytes'])
+        self.assertFalse(GameSession.objects.filter(pk__in=[s.pk for s in ended + [stale]]).exists())
+        self.assertEqual(set(GameSession.objects.values_list('pk', flat=True)), {s.pk for s in keep})
+        self.assertEqual(Player.objects.count(), 9)
+
+    def test_sweep_uses_active_created_index(self):
+        plan = expired_sessions(False, 86400, timezone.now()).values('pk').explain()
+        self.assertIn('game_session_active_created', plan)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        archive_cache.clear()
+
+    def ended_session(self, player_count=7):
+        game_session = create_session(player_count)
+        game_session.start([['assassin'], ['morgana'], ['percival']])
+        game_session.is_active = False
+        game_session.save(update_fields=['is_active'])
+        game_session.bump_state('ended')
+        return game_session
+
+    def revealed(self, response):
+        return [(player.nickname, player.roles, player.faction, player.role_messages, player.role_images)
+                for player in response.context['players_in_session']]
+
+    def test_ended_renders_from_archive(self):
+        game_session = self.ended_session()
+        active = create_session(5)
+        url = reverse('ended', args=[game_session.session_id])
+        before = self.revealed(self.client.get(url))
+
+        stats = archive_sessions(min_age=0)
+        self.assertEqual((stats['sessions'], stats['players'], stats['batches']), (1, 7, 1))
+        # hot 테이블에는 진행 중인 세션만
+        self.assertEqual(list(GameSession.objects.values_list('pk', flat=True)), [active.pk])
+        self.assertEqual(Player.objects.count(), 5)
+        self.assertEqual(ArchivedSession.objects.get().session_id, game_session.session_id)
+
+        cache.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.revealed(response), before)
+        # 두 번째부터는 보관 LRU에서
+        cache.delete(state_version_cache_key(game_session.session_id))
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        self.assertContains(self.client.get(reverse('join', args=[game_session.session_id])), '막을 내렸습니다')
+        self.assertFalse(self.client.get(reverse('get_state', args=[game_session.session_id])).json()['is_active'])
+
+    def test_archive_is_compact_and_purged_with_ended_sessions(self):
+        game_session = self.ended_session(10)
+        call_command('archive_sessions', '--min-age', '0', stdout=StringIO())
+        record = ArchivedSession.objects.get()
+        self.assertLess(len(record.payload), 400)
+        self.assertEqual(unpack(record.payload)['v'], game_session.state_version)
+
+        ArchivedSession.objects.update(created_at=timezone.now() - timedelta(days=2))
+        stats = purge_sessions(ended_max_age=86400)
+        self.assertEqual(stats['archived'], 1)
+        self.assertFalse(ArchivedSession.objects.exists())
+        self.assertEqual(self.client.get(reverse('ended', args=[game_session.session_id])).status_code, 404)
+
+
+class RoleStatsTests(TestCase):
+    def scanned(self):
+        """카운터 없이 Player 행 전체를 훑어 센 인원수별 (세션 수, 역할별 횟수)"""
+        result = {}
+        for game_session in GameSession.objects.filter(is_started=True):
+            players = list(game_session.players.all())
+            sessions, roles = result.setdefault(len(players), (Counter(), Counter()))
+            sessions['sessions'] += 1
+            roles.update(f'role:{role}' for player in players for role in player.roles)
+        return result
+
+    def test_counters_match_a_full_scan(self):
+        for player_count, enable_dummy in ((5, False), (7, False), (7, False), (2, True)):
+            game_session = create_session(player_count, enable_dummy=enable_dummy)
+            game_session.start([['assassin'], ['morgana'], ['percival']])
+        stats = role_stats()
+
+        for player_count, (sessions, roles) in self.scanned().items():
+            self.assertEqual(stats[player_count]['sessions'], sessions['sessions'])
+            self.assertEqual({key: count for key, count in stats[player_count].items() if key.startswith('role:')},
+                             dict(roles))
+        self.assertEqual((stats[5]['dummy_sessions'], stats[5]['dummies']), (1, 3))
+        self.assertEqual(stats[7]['lineup:merlin+percival+loyal_servant+assassin+morgana+minion_of_mordred'], 2)
+
+        # 분배가 실패해서 롤백되면 통계도 그대로
+        game_session = create_session(6)
+        with mock.patch.object(GameSession, 'bump_state', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                game_session.start([['assassin']])
+        self.assertEqual(role_stats(), stats)
+
+    def test_backfill_rebuilds_from_players_and_archive(self):
+        for player_count in (5, 6, 10):
+            game_session = create_session(player_count)
+            game_session.start([['assassin'], ['morgana']])
+        ended = create_session(5, enable_dummy=True)
+        ended.start([['assassin']])
+        GameSession.objects.filter(pk=ended.pk).update(is_active=False)
+        archive_sessions(min_age=0)
+        create_session(8)  # 시작 안 한 로비는 세지 않음
+        expected = role_stats()
+
+        RoleStat.objects.all().delete()
+        out = StringIO()
+        call_command('backfill_role_stats', '--chunk-size', '3', stdout=out)
+        self.assertIn('세션 4개', out.getvalue())
+        self.assertEqual(role_stats(), expected)
+        call_command('role_stats', stdout=out)
+        self.assertIn('5인: 세션 2개', out.getvalue())
+
+    def test_dummy_seats_are_flagged_not_guessed_from_nickname(self):
+        # 실제 플레이어도 dummy_N 닉네임을 쓸 수 있음 - 더미는 분배 때 채운 좌석(dummy_0) 하나뿐
+        game_session = create_session(4, enable_dummy=True)
+        Player.objects.filter(game_session=game_session, nickname='player_3').update(nickname='dummy_1')
+        game_session.start([['assassin']])
+        self.assertEqual(list(game_session.players.filter(is_dummy=True).values_list('nickname', flat=True)),
+                         ['dummy_0'])
+        self.assertEqual(role_stats()[5]['dummies'], 1)
+
+        GameSession.objects.filter(pk=game_session.pk).update(is_active=False)
+        archive_sessions(min_age=0)
+        data = unpack(ArchivedSession.objects.get().payload)
+        self.assertEqual([(nickname, is_dummy) for _, nickname, _, _, is_dummy in data['p']][-2:],
+                         [('dummy_1', 0), ('dummy_0', 1)])
+
+        expected = role_stats()
+        call_command('backfill_role_stats', stdout=StringIO())
+        self.assertEqual(role_stats(), expected)
+
+        # 더미 여부가 없는 형식 1 보관본은 맨 뒤의 dummy_0, dummy_1, ... 좌석만 더미로 추정
+        self.assertEqual(legacy_dummy_flags(True, ['player_0', 'player_1', 'player_2', 'dummy_1', 'dummy_0']),
+                         [0, 0, 0, 0, 1])
+        self.assertEqual(legacy_dummy_flags(True, ['player_0', 'player_1', 'dummy_0', 'dummy_1', 'dummy_2']),
+                         [0, 0, 1, 1, 1])
+        self.assertEqual(legacy_dummy_flags(False, ['player_0', 'player_1', 'player_2', 'player_3', 'dummy_0']),
+                         [0, 0, 0, 0, 0])
+        compressor = zlib.compressobj(9, zdict=ZDICT)
+        raw = json.dumps({'d': True, 'p': [[i, name, 0, 0] for i, name in enumerate(
+            ['player_0', 'player_1', 'player_2', 'dummy_1', 'dummy_0'])]}).encode()
+        legacy = unpack(bytes([1]) + compressor.compress(raw) + compressor.flush())
+        self.assertEqual([player[4] for player in legacy['p']], [0, 0, 0, 0, 1])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class PlayerIsDummyMigrationTests(TransactionTestCase):
+    migrate_from = [('game', '0008_rolestat')]
+    migrate_to = [('game', '0009_player_is_dummy')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_marks_baseline_dummies_by_seat_shape(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        OldGameSession, OldPlayer = apps.get_model('game', 'GameSession'), apps.get_model('game', 'Player')
+
+        def seated(nicknames, dummy_pins, enable_dummy=True, is_started=True):
+            game_session = OldGameSession.objects.create(
+                role_groups=[['assassin']], enable_dummy=enable_dummy, is_started=is_started)
+            pins = [make_password('1234')] * (len(nicknames) - len(dummy_pins)) + dummy_pins
+            return [OldPlayer.objects.create(game_session=game_session, nickname=nickname, pin=pin).pk
+                    for nickname, pin in zip(nicknames, pins)]
+
+        # 기준 코드의 더미: make_password(str(i)) - 사용 가능한 해시
+        baseline = seated(['player_0', 'player_1', 'player_2', 'dummy_0', 'dummy_1'],
+                          [make_password('0'), make_password('1')])
+        # 실제 플레이어 dummy_1 + 더미 dummy_0 (사용 불가 비밀번호)
+        mixed = seated(['player_0', 'player_1', 'player_2', 'dummy_1', 'dummy_0'], [make_password(None)])
+        # 더미를 끈 세션 / 5명이 넘는 세션의 dummy_N 닉네임은 실제 플레이어
+        disabled = seated(['player_0', 'player_1', 'player_2', 'player_3', 'dummy_0'], [], enable_dummy=False)
+        crowded = seated(['player_0', 'player_1', 'player_2', 'player_3', 'player_4', 'dummy_0'], [])
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        NewPlayer = executor.loader.project_state(self.migrate_to).apps.get_model('game', 'Player')
+        self.assertEqual(set(NewPlayer.objects.filter(is_dummy=True).values_list('pk', flat=True)),
+                         {*baseline[3:], mixed[4]})
+        self.assertFalse(NewPlayer.objects.filter(pk__in=disabled + crowded, is_dummy=True).exists())
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class EndedPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        archive_cache.clear()
+        self.game_session = create_session(7)
+        self.game_session.start([['assassin'], ['morgana'], ['percival']])
+        self.game_session.is_active = False
+        self.game_session.save(update_fields=['is_active'])
+        self.game_session.bump_state('ended')
+        self.url = reverse('ended', args=[self.game_session.session_id])
+        self.players = list(self.game_session.players.order_by('pk'))
+
+    def viewer(self, player):
+        client = Client()
+        client.cookies[token_cookie_name(self.game_session.session_id)] = issue_token(player)
+        return client
+
+    def test_cached_page_revalidates_with_etag(self):
+        client = self.viewer(self.players[0])
+        response = client.get(self.url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertIn('Cookie', response['Vary'])
+
+        with self.assertNumQueries(0):
+            again = client.get(self.url)
+            not_modified = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.content, response.content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_viewer_fragment_is_per_player(self):
+        pages = {}
+        for player in self.players[:2]:
+            response = self.viewer(player).get(self.url)
+            self.assertContains(response, f'<span class="info-value player-name">{player.nickname}</span>')
+            pages[player.nickname] = response
+        first, second = pages.values()
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        # 공개 카드는 둘이 같고 전원 포함
+        self.assertEqual(first.content.decode().count('class="role-reveal-item'), 7)
+
+        # 다른 세션 플레이어 pk로 위조된 토큰은 캐시를 타지 않고 정상 경로에서 거절
+        stranger = create_session(1).players.get()
+        stranger.game_session, stranger.nickname = self.game_session, self.players[1].nickname
+        response = self.viewer(stranger).get(self.url)
+        self.assertContains(response, '<span class="info-value player-name">알 수 없음</span>')
+
+    def test_active_session_is_not_cached_and_purge_invalidates(self):
+        active = create_session(5)
+        response = self.client.get(reverse('ended', args=[active.session_id]))
+        self.assertNotIn('ETag', response)
+        self.assertFalse(cache.get(ended_cache_key(active.session_id)))
+
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        GameSession.objects.filter(pk=self.game_session.pk).update(created_at=timezone.now() - timedelta(days=2))
+        purge_sessions(ended_max_age=86400)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+# 뷰별 (최대 쿼리 수, 최대 시간 ms) - 플레이어 수와 무관해야 하므로 5명/10명/더미 모두 같은 예산
+VIEW_BUDGETS = {
+    'home': (1, 250),
+    'join': (6, 250),          # 세션 + 닉네임 확인 + 플레이어 저장 + state_version 갱신
+    'lobby': (2, 250),         # 스냅샷 미스일 때만 조회
+    'get_state': (1, 250),     # 캐시된 버전이 없을 때만 한 번
+    'lobby_events': (1, 250),  # WSGI에서는 204
+    'kick_player': (5, 250),
+    'start_game': (13, 500),   # 역할 분배 + bulk_update + 구성 요약 저장 + 통계 증가
+    'role': (2, 250),
+    'end_game': (5, 250),
+    'ended': (2, 250),
+}
+# 설정하면 뷰별 쿼리 수/시간 보고서를 이 경로에 JSON으로 저장 (커밋 간 비교용)
+VIEW_REPORT_ENV = 'AVALON_VIEW_REPORT'
+# 느린 CI에서 시간 예산 배율
+VIEW_BUDGET_SCALE = float(os.environ.get('AVALON_VIEW_BUDGET_SCALE', 1))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ViewBudgetTests(TestCase):
+    """로비→시작→역할→종료 전체 흐름으로 game/urls.py의 모든 URL을 호출하며 쿼리 수/시간 예산 확인"""
+
+    report = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        path = os.environ.get(VIEW_REPORT_ENV)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(cls.report, f, indent=2, sort_keys=True)
+        super().tearDownClass()
+
+    def request(self, client, method, name, session_id=None, **kwargs):
+        url = reverse(name, args=[session_id] if session_id else [])
+        # 요청마다 커밋된 것처럼 on_commit 콜백(상태 버전 캐시 기록, 이벤트 발행) 실행
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+        self.calls.append((name, len(queries), elapsed))
+        return response
+
+    def run_lifecycle(self, player_count, enable_dummy):
+        cache.clear()
+        self.calls = []
+        host = Client()
+        self.request(host, 'get', 'home')
+        response = self.request(host, 'post', 'home', data={'enable_dummy': 'true' if enable_dummy else 'false'})
+        session_id = resolve(response['Location']).kwargs['session_id']
+
+        clients = [host] + [Client() for _ in range(player_count - 1)]
+        for i, client in enumerate(clients):
+            self.request(client, 'get', 'join', session_id)
+            response = self.request(client, 'post', 'join', session_id, data={'nickname': f'player_{i}', 'pin': '1234'})
+            self.assertEqual(response.status_code, 302)
+
+        # 늦게 들어온 플레이어를 호스트가 추방
+        latecomer = Client()
+        self.request(latecomer, 'post', 'join', session_id, data={'nickname': 'latecomer', 'pin': '1234'})
+        self.request(host, 'post', 'kick_player', session_id, data={'target_nickname': 'latecomer'})
+
+        for client in clients:
+            self.assertEqual(self.request(client, 'get', 'lobby', session_id).status_code, 200)
+            response = self.request(client, 'get', 'get_state', session_id)
+            self.assertEqual(len(response.json()['players']), player_count)
+            response = self.request(client, 'get', 'get_state', session_id, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(self.request(client, 'get', 'lobby_events', session_id).status_code, 204)
+
+        response = self.request(host, 'post', 'start_game', session_id, data={
+            'active_roles': json.dumps([['assassin'], ['morgana']]),
+            'enable_percival': 'true',
+        })
+        self.assertRedirects(response, reverse('role', args=[session_id]), fetch_redirect_response=False)
+
+        for client in clients:
+            response = self.request(client, 'get', 'role', session_id)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context['player'].role_messages)
+        self.request(host, 'get', 'get_state', session_id)
+
+        self.request(host, 'post', 'end_game', session_id)
+        for client in clients:
+            response = self.request(client, 'get', 'ended', session_id)
+            # 첫 요청 뒤로는 캐시된 역할 공개 HTML이 나가므로 context 대신 본문으로 확인
+            self.assertEqual(response.content.decode().count('class="role-reveal-item'), max(player_count, 5))
+        return self.calls
+
+    def test_lifecycle_budgets(self):
+        scenarios = {'5_players': (5, False), '10_players': (10, False), 'dummy_filled': (3, True)}
+        for scenario, (player_count, enable_dummy) in scenarios.items():
+            calls = self.run_lifecycle(player_count, enable_dummy)
+
+            views = {}
+            for name, queries, elapsed in calls:
+                view = views.setdefault(name, {'calls': 0, 'max_queries': 0, 'max_ms': 0.0, 'total_ms': 0.0})
+                view['calls'] += 1
+                view['max_queries'] = max(view['max_queries'], queries)
+                view['max_ms'] = max(view['max_ms'], elapsed)
+                view['total_ms'] += elapsed
+            for view in views.values():
+                view['mean_ms'] = round(view.pop('total_ms') / view['calls'], 3)
+                view['max_ms'] = round(view['max_ms'], 3)
+            self.report[scenario] = views
+
+            self.assertEqual(set(views), {pattern.name for pattern in game_urls.urlpatterns})
+            for name, view in views.items():
+                max_queries, max_ms = VIEW_BUDGETS[name]
+                with self.subTest(scenario=scenario, view=name):
+                    self.assertLessEqual(view['max_queries'], max_queries)
+                    self.assertLessEqual(view['max_ms'], max_ms * VIEW_BUDGET_SCALE)
@@ -8,6 +8,7 @@ urlpatterns = [
     
     path('lobby/<uuid:session_id>/', views.lobby, name='lobby'),
     path('players/<uuid:session_id>/', views.get_state, name='get_state'),
+    path('events/<uuid:session_id>/', views.lobby_events, name='lobby_events'),
     path('kick/<uuid:session_id>/', views.kick_player, name='kick_player'),
     
     path('start_game/<uuid:session_id>/', views.start_game, name='start_game'),
@@ -1,75 +1,153 @@
 import json
+import asyncio
 import hashlib
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.hashers import make_password, check_password
-from django.http import HttpResponseRedirect, HttpResponseNotAllowed, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, HttpResponseNotAllowed, JsonResponse,
+    StreamingHttpResponse,
+)
+from django.core.cache import cache
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import parse_etags, quote_etag
+from django.utils.safestring import mark_safe
 from urllib.parse import urlencode
-from .models import GameSession, Player
+from ftn.catalog import get_role_catalog
+from ftn.roles import composition_summary
+from . import events
+from .auth import aauthenticate_player, authenticate_player, legacy_credentials, read_token, set_token_cookie
+from .metrics import check_password, export as export_metrics, make_password
+from .models import GameSession, Player, ended_cache_key
+from .snapshot import (
+    acurrent_state_version, aget_snapshot, aget_snapshot_or_404, current_state_version, get_snapshot,
+    get_snapshot_or_404,
+)
+
+# SSE 재연결 대기(ms)와 프록시 유휴 타임아웃 방지용 keepalive 간격(초)
+SSE_RETRY_MS = 3000
+SSE_KEEPALIVE_INTERVAL = 15
+
+# 종료 화면 캐시 - 종료된 세션은 다시 바뀌지 않으므로 길게 (보존 기간 정리 때 ended_cache_key 삭제)
+ENDED_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+ENDED_MESSAGE = '호스트에 의해 게임이 종료되었습니다. 고생하셨습니다!'
 
 # 공통 함수들
-def get_role_data():
-    """역할 데이터 로드"""
-    import os
-    from django.conf import settings
-    
-    # 여러 경로 시도
-    possible_paths = [
-        os.path.join(os.path.dirname(__file__), '..', 'ftn', 'role_messages.json'),
-        os.path.join(settings.BASE_DIR, 'ftn', 'role_messages.json'),
-        os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ftn', 'role_messages.json'),
-    ]
-    
-    for path in possible_paths:
-        try:
-            if os.path.exists(path):
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            continue
-    
-    # 모든 경로가 실패한 경우 에러 정보와 함께 예외 발생
-    raise FileNotFoundError(f"role_messages.json을 찾을 수 없습니다. 시도한 경로들: {possible_paths}")
-
-def sort_players_for_reveal(players, role_data):
-    """역할 공개용 정렬: 악인→선인, 우선순위 순"""
-    def get_priority(player):
-        if not player.roles or not player.faction:
-            return (2, 999)
-        primary_role = player.roles[0]
-        priority = role_data.get(primary_role, {}).get('priority', 999)
-        faction_order = 0 if player.faction == 'evil' else 1
-        return (faction_order, priority)
-    
-    return sorted(players, key=get_priority)
-
-def render_ended_page(request, game_session, message, player_nickname=None):
-    """종료 페이지 공통 렌더링"""
-    role_data = get_role_data()
-    sorted_players = sort_players_for_reveal(game_session.players.all(), role_data)
-    return render(request, 'game/ended.html', {
+def session_composition(snapshot, catalog):
+    """분배 때 저장한 역할 구성 요약 (저장 전에 분배된 세션은 여기서 계산)"""
+    if snapshot.session.composition:
+        return snapshot.session.composition
+    return composition_summary(
+        [(player.nickname, player.roles, player.faction) for player in snapshot.players], catalog)
+
+def composition_display(entries, catalog):
+    """[역할 패키지, 인원] 목록 → {표시 이름: 인원} (저장된 순서 유지)"""
+    return {' + '.join(catalog.display(role) for role in roles): count for roles, count in entries}
+
+def players_in_reveal_order(snapshot, catalog):
+    """역할 공개용 정렬: 악인→선인, 우선순위 순 (분배 때 정한 순서)"""
+    order = {nickname: index for index, nickname in enumerate(session_composition(snapshot, catalog)['reveal_order'])}
+    return sorted(snapshot.players, key=lambda player: order.get(player.nickname, len(order)))
+
+def ended_page_cache_key(session_id, player_nickname, message):
+    """시청자/메시지별 종료 화면 (ETag, HTML) 캐시"""
+    digest = hashlib.sha1(json.dumps([player_nickname, message]).encode()).hexdigest()[:16]
+    return f'avalon:ended_page:{session_id}:{digest}'
+
+def ended_entry(snapshot):
+    """종료 화면에서 시청자와 무관한 부분 - 역할 공개 HTML + 닉네임별 [pk, 역할] (역할 메시지는 미리 채워 둔 상태)"""
+    catalog = get_role_catalog()
+    return {
+        'reveal': render_to_string('game/includes/reveal.html', {
+            'game_session': snapshot.session,
+            'players_in_session': players_in_reveal_order(snapshot, catalog),
+        }),
+        'players': {player.nickname: [player.pk, player.roles] for player in snapshot.players},
+    }
+
+def ended_page(request, session_id, entry, message, player_nickname=None):
+    """역할 공개 HTML에 메시지/시청자 부분을 붙여 종료 화면 렌더링 - (강한 ETag, HTML)"""
+    html = render_to_string('game/ended.html', {
         'message': message,
-        'game_session': game_session,
-        'players_in_session': sorted_players,
+        'session_id': session_id,
         'player_nickname': player_nickname,
-        'role_data': role_data,
-    })
-
-def get_player_or_redirect(request, game_session, redirect_to='join'):
-    """플레이어 인증 및 검증"""
-    nickname = request.GET.get('nickname') or request.POST.get('nickname')
-    pin = request.GET.get('pin') or request.POST.get('pin')
-    
-    if not nickname or not pin:
-        return None, redirect(redirect_to, session_id=game_session.session_id)
-    
-    try:
-        player = Player.objects.get(game_session=game_session, nickname=nickname)
-        if not check_password(pin, player.pin):
-            return None, redirect(redirect_to, session_id=game_session.session_id)
-        return player, None
-    except Player.DoesNotExist:
-        return None, redirect(redirect_to, session_id=game_session.session_id)
+        'viewer_roles': entry['players'].get(player_nickname, [None, []])[1],
+        'reveal_html': mark_safe(entry['reveal']),
+    }, request)
+    return quote_etag(hashlib.sha1(html.encode()).hexdigest()), html
+
+def ended_response(request, page, cacheable):
+    """종료 화면 응답 - 종료된 세션이면 ETag를 붙이고 브라우저가 매번 재검증(304)하도록"""
+    etag, html = page
+    if not cacheable:
+        return HttpResponse(html)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(html)
+    response['ETag'] = etag
+    # 토큰 쿠키마다 "나의 역할"이 다르므로 공유 캐시에는 두지 않음
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+def cached_ended_page(cached, session_id, message, player_nickname=None, player_pk=None):
+    """cache.get_many 결과에서 종료 화면 (ETag, HTML) - 역할 공개 캐시가 없거나 토큰 pk가 다르면 None"""
+    entry = cached.get(ended_cache_key(session_id))
+    if entry is None:
+        return None
+    if player_pk is not None and entry['players'].get(player_nickname, [None])[0] != player_pk:
+        return None
+    return cached.get(ended_page_cache_key(session_id, player_nickname, message))
+
+def render_ended_page(request, snapshot, message, player_nickname=None):
+    """종료 화면 - 종료된 세션은 역할 공개와 시청자별 페이지를 캐시해서 다시 렌더링하지 않음"""
+    session_id = snapshot.session.session_id
+    cacheable = not snapshot.session.is_active
+    keys = [ended_cache_key(session_id), ended_page_cache_key(session_id, player_nickname, message)]
+    cached = cache.get_many(keys) if cacheable else {}
+    page = cached_ended_page(cached, session_id, message, player_nickname)
+    if page is None:
+        entry = cached.get(keys[0])
+        if entry is None:
+            snapshot.session.attach_role_messages(snapshot.players, snapshot.players)
+            entry = ended_entry(snapshot)
+        page = ended_page(request, session_id, entry, message, player_nickname)
+        if cacheable:
+            cache.set_many(dict(zip(keys, (entry, page))), ENDED_PAGE_CACHE_TIMEOUT)
+    return ended_response(request, page, cacheable)
+
+async def arender_ended_page(request, snapshot, message, player_nickname=None):
+    """render_ended_page의 async 버전"""
+    session_id = snapshot.session.session_id
+    cacheable = not snapshot.session.is_active
+    keys = [ended_cache_key(session_id), ended_page_cache_key(session_id, player_nickname, message)]
+    cached = await cache.aget_many(keys) if cacheable else {}
+    page = cached_ended_page(cached, session_id, message, player_nickname)
+    if page is None:
+        entry = cached.get(keys[0])
+        if entry is None:
+            await snapshot.session.aattach_role_messages(snapshot.players, snapshot.players)
+            entry = ended_entry(snapshot)
+        page = ended_page(request, session_id, entry, message, player_nickname)
+        if cacheable:
+            await cache.aset_many(dict(zip(keys, (entry, page))), ENDED_PAGE_CACHE_TIMEOUT)
+    return ended_response(request, page, cacheable)
+
+async def get_player_or_redirect(request, snapshot, redirect_to='join'):
+    """플레이어 인증 및 검증 (서명 토큰, 없으면 닉네임 + PIN)"""
+    player = await aauthenticate_player(request, snapshot.session, snapshot)
+    if player is None:
+        return None, redirect(redirect_to, session_id=snapshot.session.session_id)
+    return player, None
+
+async def viewer_nickname(request, snapshot):
+    """종료 페이지용: 인증된 플레이어 닉네임 (없으면 None)"""
+    player = await aauthenticate_player(request, snapshot.session, snapshot)
+    return player.nickname if player else None
 
 # 간소화된 뷰 함수들
 def home(request):
@@ -91,11 +169,12 @@ def home(request):
     return render(request, 'game/home.html')
 
 def join(request, session_id):
-    game_session = get_object_or_404(GameSession, session_id=session_id)
+    # hot 테이블에 없으면 보관된 세션일 수 있음 (종료 화면은 보관본에서, 둘 다 없으면 404)
+    game_session = GameSession.objects.filter(session_id=session_id).first()
 
-    if not game_session.is_active:
+    if game_session is None or not game_session.is_active:
         player_nickname = request.POST.get('nickname') if request.method == 'POST' else None
-        return render_ended_page(request, game_session, 
+        return render_ended_page(request, get_snapshot_or_404(session_id), 
             '🎭 이 아발론 세션은 이미 막을 내렸습니다. 새로운 모험을 시작해보세요!', player_nickname)
     
     if request.method == 'POST':
@@ -125,7 +204,7 @@ def join(request, session_id):
                     'message_level': 'error',
                 })
             
-            Player.objects.create(
+            player = Player.objects.create(
                 game_session=game_session,
                 nickname=nickname,
                 pin=make_password(pin)
@@ -133,36 +212,38 @@ def join(request, session_id):
 
             if not game_session.host_nickname:
                 game_session.host_nickname = nickname
-                game_session.save()
+                game_session.save(update_fields=['host_nickname'])
+            game_session.bump_state('players')
 
-        query = urlencode({'nickname': nickname, 'pin': pin})
-        return HttpResponseRedirect(f"{reverse('lobby', args=[session_id])}?{query}")
+        # PIN은 여기서 한 번만 확인하고 이후에는 서명 토큰으로 인증
+        response = redirect('lobby', session_id=session_id)
+        return set_token_cookie(response, request, player)
 
     return render(request, 'game/join.html', {'game_session': game_session})
 
-def lobby(request, session_id):
+async def lobby(request, session_id):
     if request.method != 'GET':
         return HttpResponseNotAllowed(['GET'])
 
-    game_session = get_object_or_404(GameSession, session_id=session_id)
+    snapshot = await aget_snapshot_or_404(session_id)
+    game_session = snapshot.session
 
     if not game_session.is_active:
-        player_nickname = request.GET.get('nickname')
-        return render_ended_page(request, game_session, 
-            '🏰 원탁의 기사들이 이미 해산했습니다. 로비 입장이 불가능해요.', player_nickname)
+        return await arender_ended_page(request, snapshot, 
+            '🏰 원탁의 기사들이 이미 해산했습니다. 로비 입장이 불가능해요.', await viewer_nickname(request, snapshot))
 
-    player, redirect_response = get_player_or_redirect(request, game_session)
+    player, redirect_response = await get_player_or_redirect(request, snapshot)
     if redirect_response:
         return redirect_response
 
     return render(request, 'game/lobby.html', {
         'game_session': game_session,
         'player_nickname': player.nickname,
-        'player_pin': request.GET.get('pin'),
-        'players_in_session': game_session.players.all(),
+        'players_in_session': snapshot.players,
         'session_link': request.build_absolute_uri(reverse('join', args=[session_id])),
         'host_nickname': game_session.host_nickname,
         'error_message': request.GET.get('error_message'),
+        'forbidden_combinations': sorted(sorted(pair) for pair in get_role_catalog().forbidden_pairs),
     })
 
 def start_game(request, session_id):
@@ -170,21 +251,20 @@ def start_game(request, session_id):
         return HttpResponseNotAllowed(['POST'])
 
     game_session = get_object_or_404(GameSession, session_id=session_id)
-    nickname = request.POST.get('nickname')
-    pin = request.POST.get('pin')
 
-    if nickname != game_session.host_nickname:
+    host_player = authenticate_player(request, game_session)
+    if host_player is None:
+        return JsonResponse({'status': 'error', 'message': '인증 실패.'}, status=401)
+
+    if host_player.nickname != game_session.host_nickname:
         return JsonResponse({'status': 'error', 'message': '게임 시작 권한이 없습니다.'}, status=403)
 
-    try:
-        host_player = Player.objects.get(game_session=game_session, nickname=nickname)
-        if not check_password(pin, host_player.pin):
-            return JsonResponse({'status': 'error', 'message': '인증 실패.'}, status=401)
-    except Player.DoesNotExist:
-        return JsonResponse({'status': 'error', 'message': '호스트 정보를 찾을 수 없습니다.'}, status=404)
+    # 이미 시작됨 (중복 요청) - 기존 분배 그대로
+    if game_session.is_started:
+        return redirect('role', session_id=session_id)
 
     if not game_session.enable_dummy and len(game_session.players.all()) < 5:
-        query = urlencode({'nickname': nickname, 'pin': pin, 'error_message': '5명 이상이어야 게임을 시작할 수 있습니다!'})
+        query = urlencode({'error_message': '5명 이상이어야 게임을 시작할 수 있습니다!'})
         return HttpResponseRedirect(f"{reverse('lobby', args=[session_id])}?{query}")
 
     # 로비에서 설정한 옵션 적용
@@ -192,78 +272,44 @@ def start_game(request, session_id):
     if request.POST.get('enable_percival') == 'true':
         role_groups.append(['percival'])
 
-    # 게임 세션에 역할 구성 업데이트
-    game_session.role_groups = role_groups
-    game_session.distribute_roles()
-    game_session.is_started = True
-    game_session.save()
+    # 역할 구성 저장 + 분배 (동시에 온 요청 중 하나만, 나머지는 그 분배 결과로)
+    game_session.start(role_groups)
 
-    query = urlencode({'nickname': nickname, 'pin': pin})
-    return HttpResponseRedirect(f"{reverse('role', args=[session_id])}?{query}")
+    return redirect('role', session_id=session_id)
 
-def role(request, session_id):
-    game_session = get_object_or_404(GameSession, session_id=session_id)
+async def role(request, session_id):
+    snapshot = await aget_snapshot_or_404(session_id)
+    game_session = snapshot.session
     
     if not game_session.is_active:
-        player_nickname = request.GET.get('nickname')
-        return render_ended_page(request, game_session, '호스트에 의해 게임이 종료되었습니다.', player_nickname)
+        return await arender_ended_page(request, snapshot, '호스트에 의해 게임이 종료되었습니다.', await viewer_nickname(request, snapshot))
 
     if not game_session.is_started:
         return redirect('lobby', session_id=session_id)
 
-    player, redirect_response = get_player_or_redirect(request, game_session)
+    player, redirect_response = await get_player_or_redirect(request, snapshot)
     if redirect_response:
         return redirect_response
 
-    # 간단한 역할 구성 분석
-    role_data = get_role_data()
-    good_comp, evil_comp = {}, {}
-    
-    for p in game_session.players.all():
-        if not p.roles or not p.faction:
-            continue
-        
-        # 다중 역할 처리
-        if len(p.roles) > 1:
-            # 여러 역할을 가진 경우 모든 역할을 표시
-            role_parts = []
-            for role in p.roles:
-                emoji = role_data.get(role, {}).get('emoji', '')
-                name = role_data.get(role, {}).get('name', role)
-                role_parts.append(f"{emoji} {name}")
-            role_display = " + ".join(role_parts)
-        else:
-            # 단일 역할인 경우 기존 방식
-            role_display = f"{role_data.get(p.primary_role, {}).get('emoji', '')} {role_data.get(p.primary_role, {}).get('name', '')}"
-        
-        if p.faction == 'good':
-            good_comp[role_display] = good_comp.get(role_display, 0) + 1
-        elif p.faction == 'evil':
-            evil_comp[role_display] = evil_comp.get(role_display, 0) + 1
-
-    # 우선순위 순으로 정렬
-    def sort_by_priority(item):
-        role_display, count = item
-        # 역할 이름에서 실제 역할 키 찾기
-        for role_key, role_info in role_data.items():
-            if role_info.get('name', '') in role_display:
-                return role_info.get('priority', 999)
-        return 999
-    
-    good_comp = dict(sorted(good_comp.items(), key=sort_by_priority))
-    evil_comp = dict(sorted(evil_comp.items(), key=sort_by_priority))
+    players = snapshot.players
+    await game_session.aattach_role_messages([player], players)
+
+    # 역할 구성은 분배 때 계산해 둔 요약을 표시용으로만 변환
+    catalog = get_role_catalog()
+    composition = session_composition(snapshot, catalog)
+    good_comp = composition_display(composition['good'], catalog)
+    evil_comp = composition_display(composition['evil'], catalog)
 
     return render(request, 'game/role.html', {
         'game_session': game_session,
         'player_nickname': player.nickname,
-        'player_pin': request.GET.get('pin'),
-        'players_in_session': game_session.players.all(),
+        'players_in_session': players,
         'player': player,
         'good_composition': good_comp,
         'evil_composition': evil_comp,
-        'good_total': sum(good_comp.values()),
-        'evil_total': sum(evil_comp.values()),
-        'role_data': role_data,
+        'good_total': composition['good_total'],
+        'evil_total': composition['evil_total'],
+        'role_data': catalog,
     })
 
 def end_game(request, session_id):
@@ -271,63 +317,135 @@ def end_game(request, session_id):
         return HttpResponseNotAllowed(['POST'])
 
     game_session = get_object_or_404(GameSession, session_id=session_id)
-    nickname = request.POST.get('nickname')
-    pin = request.POST.get('pin')
 
     if not game_session.is_active:
         return JsonResponse({'status': 'error', 'message': '이미 종료된 게임입니다.'}, status=400)
 
-    if nickname != game_session.host_nickname:
-        return JsonResponse({'status': 'error', 'message': '게임 종료 권한이 없습니다.'}, status=403)
-    
-    try:
-        host_player = Player.objects.get(game_session=game_session, nickname=nickname)
-        if not check_password(pin, host_player.pin):
-            return JsonResponse({'status': 'error', 'message': '인증 실패.'}, status=401)
-    except Player.DoesNotExist:
-        return JsonResponse({'status': 'error', 'message': '호스트 정보를 찾을 수 없습니다.'}, status=404)
-
-    game_session.is_active = False  
-    game_session.save()
+    host_player = authenticate_player(request, game_session)
+    if host_player is None:
+        return JsonResponse({'status': 'error', 'message': '인증 실패.'}, status=401)
 
-    query = urlencode({'nickname': nickname, 'pin': pin})
-    return HttpResponseRedirect(f"{reverse('ended', args=[session_id])}?{query}")
-
-def ended(request, session_id):
-    game_session = get_object_or_404(GameSession, session_id=session_id)
-    player_nickname = request.GET.get('nickname')
-    
-    # 간단한 플레이어 검증
-    if player_nickname and request.GET.get('pin'):
-        try:
-            player = Player.objects.get(game_session=game_session, nickname=player_nickname)
-            if not check_password(request.GET.get('pin'), player.pin):
-                player_nickname = None
-        except Player.DoesNotExist:
-            player_nickname = None
-    
-    return render_ended_page(request, game_session, '호스트에 의해 게임이 종료되었습니다. 고생하셨습니다!', player_nickname)
-
-def get_state(request, session_id):
-    game_session = get_object_or_404(GameSession, session_id=session_id)
-
-    if not game_session.is_active:
-        return JsonResponse({'players': []})
-
-    player_names = list(game_session.players.all().values_list('nickname', flat=True))
-    data_to_hash = {'players': player_names, 'is_started': game_session.is_started}
-    state_hash = hashlib.md5(json.dumps(data_to_hash).encode()).hexdigest()
-    
-    if request.GET.get('hash') == state_hash and not game_session.is_started:
-        return JsonResponse({}, status=204)
+    if host_player.nickname != game_session.host_nickname:
+        return JsonResponse({'status': 'error', 'message': '게임 종료 권한이 없습니다.'}, status=403)
 
-    return JsonResponse({
-        'players': player_names,
+    game_session.is_active = False
+    game_session.save(update_fields=['is_active'])
+    game_session.bump_state('ended')
+
+    return redirect('ended', session_id=session_id)
+
+async def ended(request, session_id):
+    # 캐시 적중이면 스냅샷/DB 없이 - 시청자는 서명 토큰만 확인 (토큰 없는 예전 PIN 링크는 아래에서 인증)
+    claims = read_token(request, session_id)
+    if claims or legacy_credentials(request) is None:
+        player_nickname, player_pk = claims or (None, None)
+        cached = await cache.aget_many([
+            ended_cache_key(session_id), ended_page_cache_key(session_id, player_nickname, ENDED_MESSAGE)])
+        page = cached_ended_page(cached, session_id, ENDED_MESSAGE, player_nickname, player_pk)
+        if page is not None:
+            return ended_response(request, page, cacheable=True)
+
+    snapshot = await aget_snapshot_or_404(session_id)
+    return await arender_ended_page(request, snapshot, ENDED_MESSAGE, await viewer_nickname(request, snapshot))
+
+def lobby_state(snapshot):
+    """로비 상태 payload - 세션 스냅샷에서 만듦 (세션이 없으면 None)"""
+    if snapshot is None:
+        return None
+    game_session = snapshot.session
+    return {
+        'players': [player.nickname for player in snapshot.players] if game_session.is_active else [],
         'host_nickname': game_session.host_nickname,
-        'hash': state_hash,
         'is_active': game_session.is_active,
         'is_started': game_session.is_started,
-    })
+        'version': snapshot.version,
+    }
+
+def get_state(request, session_id):
+    """로비 폴링 - state_version ETag로 변경 없으면 304 (캐시 적중 시 DB 조회 없음)
+
+    폴링은 SSE를 못 쓰는 WSGI 배포의 경로라서 sync 뷰 (async 뷰는 WSGI에서 요청마다 이벤트 루프를 거쳐 느림)
+    """
+    version = current_state_version(session_id)
+    if version is None:
+        raise Http404('세션을 찾을 수 없습니다.')
+
+    etag = quote_etag(f'{session_id}-{version}')
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        state = lobby_state(get_snapshot(session_id))
+        if state is None:
+            raise Http404('세션을 찾을 수 없습니다.')
+        etag = quote_etag(f'{session_id}-{state["version"]}')
+        response = JsonResponse(state)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+def sse_event(event, data, event_id=None):
+    """Server-Sent Events 한 건을 문자열로"""
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+async def lobby_event_stream(session_id, last_event_id=None):
+    """세션 이벤트가 발행될 때마다 로비 상태를 보내는 SSE 스트림"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.AVALON_SSE_MAX_AGE
+    yield f'retry: {SSE_RETRY_MS}\n\n'
+
+    # 먼저 구독한 뒤 현재 버전을 읽어야 그 사이의 변경을 놓치지 않음
+    async with events.subscribe(session_id) as subscription:
+        version = await acurrent_state_version(session_id)
+        sent = last_event_id
+        while True:
+            if version is None:
+                yield sse_event('gone', {})
+                return
+            if str(version) != sent:
+                state = lobby_state(await aget_snapshot(session_id))
+                if state is None:
+                    yield sse_event('gone', {})
+                    return
+                sent = str(state['version'])
+                yield sse_event('state', state, event_id=sent)
+                # 시작/종료되면 클라이언트가 페이지를 옮기므로 스트림도 끝냄
+                if state['is_started'] or not state['is_active']:
+                    return
+
+            # 연결을 주기적으로 끊어 EventSource가 Last-Event-ID로 다시 붙게 함
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await subscription.get(timeout=min(remaining, SSE_KEEPALIVE_INTERVAL))
+            except events.SubscriptionDropped:
+                # 너무 느린 클라이언트 - 재연결하면 최신 상태부터 다시 받음
+                return
+            if event is None:
+                yield ': keepalive\n\n'
+            elif event['version'] > int(sent):
+                version = event['version']
+
+async def lobby_events(request, session_id):
+    """로비 상태 SSE 엔드포인트 (ASGI 전용)"""
+    if not isinstance(request, ASGIRequest):
+        # WSGI에서는 연결 하나가 워커 스레드를 계속 붙잡으므로 거절 - 클라이언트는 폴링으로 전환
+        return HttpResponse(status=204)
+
+    if await acurrent_state_version(session_id) is None:
+        raise Http404('세션을 찾을 수 없습니다.')
+
+    response = StreamingHttpResponse(
+        lobby_event_stream(session_id, request.headers.get('Last-Event-ID')),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 def kick_player(request, session_id):
     if request.method != 'POST':
@@ -335,10 +453,11 @@ def kick_player(request, session_id):
 
     game_session = get_object_or_404(GameSession, session_id=session_id)
     target_nickname = request.POST.get('target_nickname')
-    kicker_nickname = request.POST.get('nickname')
+    kicker = authenticate_player(request, game_session)
+    kicker_nickname = kicker.nickname if kicker else None
 
     if not game_session.is_active:
-        return render_ended_page(request, game_session, '🎭 이미 막을 내린 아발론 세션입니다.')
+        return render_ended_page(request, get_snapshot_or_404(session_id), '🎭 이미 막을 내린 아발론 세션입니다.')
 
     if game_session.is_started:
         return JsonResponse({'status': 'error', 'message': '게임이 시작되어 참가자를 추방할 수 없습니다.'}, status=400)
@@ -354,10 +473,16 @@ def kick_player(request, session_id):
             'message': '👑 오직 원탁의 주인만이 다른 기사들의 운명을 결정할 수 있습니다.',
         })
 
-    try:
-        Player.objects.get(game_session=game_session, nickname=target_nickname).delete()
-    except Player.DoesNotExist:
-        pass
+    if Player.objects.filter(game_session=game_session, nickname=target_nickname).delete()[0]:
+        game_session.bump_state('players')
+
+    return redirect('lobby', session_id=session_id)
 
-    query = urlencode({'nickname': kicker_nickname, 'pin': request.POST.get('pin')})
-    return redirect(f"{reverse('lobby', args=[session_id])}?{query}")
\ No newline at end of file
+def metrics(request):
+    """Prometheus 텍스트 metrics - AVALON_METRICS_ENABLED일 때만, 토큰이 설정돼 있으면 Bearer 토큰 필요"""
+    if not settings.AVALON_METRICS_ENABLED:
+        raise Http404
+    token = settings.AVALON_METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(export_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,30 @@
+# gunicorn 설정 - 기본은 WSGI 앱 + gthread 워커, AVALON_ASGI=True면 uvicorn 워커로 ASGI 앱(로비 SSE) 구동
+#   gunicorn -c gunicorn.conf.py
+#   AVALON_ASGI=True gunicorn -c gunicorn.conf.py
+#
+# 프로세스 하나의 처리량은 WSGI가 더 높음 (benchmarks/bench_async_views.py) - ASGI에서는 Django 미들웨어 훅과
+# request_started/request_finished 신호가 요청마다 스레드를 오감 -> ASGI는 로비 SSE가 필요할 때만 켤 것
+import os
+
+ASGI = os.environ.get('AVALON_ASGI', 'False') == 'True'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# 2개 이상이면 캐시(CACHE_BACKEND)와 이벤트 브로커(AVALON_EVENT_BROKER)를 워커끼리 공유하는 백엔드로 설정해야 함
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+if ASGI:
+    wsgi_app = 'avalon_role_distributor.asgi:application'
+    # 워커 하나가 이벤트 루프 하나로 수천 개의 연결을 처리하므로 CPU 코어 수 정도면 충분
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # SSE 연결은 오래 열려 있으므로 워커 재시작 때 기다리는 시간은 짧게 (클라이언트가 알아서 재연결)
+    graceful_timeout = 10
+else:
+    wsgi_app = 'avalon_role_distributor.wsgi:application'
+    # 로비는 SSE 대신 1초 폴링 - 요청이 짧으므로 워커당 스레드 몇 개면 충분
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+keepalive = 5
+
+accesslog = '-'